@@ -26,12 +26,14 @@ except Exception:
     pass
 
 # 導入自定義模組（此時環境變數已設置）
-from utils.scraper import scrape_products
+from utils.job_queue import get_job_queue
 from utils.data_cleaner import DataCleaner
 from utils.nlp_analyzer import analyze_products, GeminiAnalyzer
 from utils.cp_calculator import CPCalculator
 from utils.similar_finder import SimilarProductFinder
-from config.settings import GEMINI_API_KEY
+from utils.url_utils import canonicalize_url
+from utils.price_history import get_price_history
+from config.settings import GEMINI_API_KEY, SCRAPE_JOB_POLL_INTERVAL
 
 # 自定義 CSS - 購物車風格
 st.markdown("""
@@ -247,6 +249,34 @@ def initialize_session_state():
         st.session_state.nlp_analysis = None
     if 'comparison_list' not in st.session_state:
         st.session_state.comparison_list = []  # 比較清單
+    if 'scrape_job_id' not in st.session_state:
+        st.session_state.scrape_job_id = None  # 背景爬取工作 ID
+    if 'refresh_job_id' not in st.session_state:
+        st.session_state.refresh_job_id = None  # 背景更新價格工作 ID
+    if 'scrape_is_dynamic' not in st.session_state:
+        st.session_state.scrape_is_dynamic = False  # 爬取時是否使用動態模式（更新價格沿用）
+
+
+def render_scrape_job_progress(job, title: str = "🕷️ 正在爬取商品資訊..."):
+    """顯示背景爬取工作的進度與已完成的商品卡片"""
+    status = "排隊中" if job.status == 'queued' else f"已完成 {job.completed}/{job.total}"
+    st.markdown(f"**{title}** ({status})")
+    st.progress(job.completed / job.total if job.total else 1.0)
+    
+    results = dict(job.results)
+    for col, (index, url) in zip(st.columns(job.total), enumerate(job.urls)):
+        with col:
+            if index not in results:
+                st.caption(f"⏳ 等待中：{url[:40]}...")
+            elif results[index]:
+                product = results[index]
+                st.metric(
+                    label=product['name'][:20],
+                    value=f"${product['price']:,.0f}",
+                    delta=f"{job.elapsed.get(index, 0):.1f}s"
+                )
+            else:
+                st.caption(f"❌ 爬取失敗：{url[:40]}...")
 
 
 def render_header():
@@ -457,6 +487,7 @@ def render_comparison_results(feature_weights: Dict):
     with st.spinner("🔄 計算 CP 值中..."):
         cp_values = CPCalculator.calculate_all_cp_values(products, feature_weights)
         st.session_state.cp_values = cp_values
+        get_price_history().record_cp_values(cp_values)
     
     # 建立比較表格
     comparison_df = CPCalculator.create_comparison_dataframe(
@@ -1093,14 +1124,29 @@ def main():
             if len(urls) < 2:
                 st.error("❌ 至少需要 2 個商品連結")
             else:
-                # 爬取商品
-                with st.spinner("🕷️ 正在爬取商品資訊..."):
-                    start_time = time.time()
-                    products = scrape_products(urls, is_dynamic=is_dynamic)
-                    scrape_time = time.time() - start_time
+                # 提交到背景工作佇列，腳本重新執行時不會中斷或重複爬取
+                st.session_state.scrape_job_id = get_job_queue().submit(urls, is_dynamic=is_dynamic)
+                st.session_state.scrape_is_dynamic = is_dynamic
+                st.session_state.refresh_job_id = None
+                st.session_state.scraping_complete = False
+        
+        # 輪詢背景爬取工作：每完成一個就先顯示卡片
+        if st.session_state.scrape_job_id:
+            job = get_job_queue().get(st.session_state.scrape_job_id)
+            if job is None:
+                st.session_state.scrape_job_id = None
+                st.warning("⚠️ 爬取工作已過期，請重新提交")
+            else:
+                render_scrape_job_progress(job)
+                if not job.finished:
+                    time.sleep(SCRAPE_JOB_POLL_INTERVAL)
+                    st.rerun()
+                
+                st.session_state.scrape_job_id = None
+                products = job.products()
                 
                 if not products:
-                    st.error("❌ 爬取失敗，請檢查連結是否有效")
+                    st.error(f"❌ 爬取失敗，請檢查連結是否有效{f'（{job.error}）' if job.error else ''}")
                 else:
                     # 保存爬蟲結果
                     st.session_state.products = products
@@ -1111,7 +1157,7 @@ def main():
                         cleaned_products = DataCleaner.clean_products(products)
                         st.session_state.cleaned_products = cleaned_products
                     
-                    st.success(f"✅ 成功爬取 {len(products)} 個商品 (耗時 {scrape_time:.2f}s)")
+                    st.success(f"✅ 成功爬取 {len(products)} 個商品 (耗時 {job.duration:.2f}s)")
                     st.balloons()
         
         # ====== STEP 2：顯示商品內容（持久顯示）======
@@ -1119,6 +1165,39 @@ def main():
             st.markdown("---")
             st.markdown("### 📦 步驟 2：爬取的商品內容")
             
+            # 只重新取得價格（沿用規格與評論），同樣提交到背景工作佇列，完成後以新價格重算 CP 值
+            if st.button("🔄 更新價格", key="refresh_prices_btn", disabled=bool(st.session_state.refresh_job_id)):
+                known = {product['url']: product for product in st.session_state.products}
+                st.session_state.refresh_job_id = get_job_queue().submit(
+                    list(known), is_dynamic=st.session_state.scrape_is_dynamic, known=known
+                )
+            
+            if st.session_state.refresh_job_id:
+                job = get_job_queue().get(st.session_state.refresh_job_id)
+                if job is None:
+                    st.session_state.refresh_job_id = None
+                    st.warning("⚠️ 更新價格工作已過期，請重新更新")
+                else:
+                    render_scrape_job_progress(job, title="💰 更新價格中...")
+                    if not job.finished:
+                        time.sleep(SCRAPE_JOB_POLL_INTERVAL)
+                        st.rerun()
+                    
+                    st.session_state.refresh_job_id = None
+                    refreshed = job.products()
+                    if job.status == 'failed' or not refreshed:
+                        st.error(f"❌ 更新價格失敗{f'（{job.error}）' if job.error else ''}，保留原資料")
+                    else:
+                        st.session_state.products = refreshed
+                        st.session_state.cleaned_products = DataCleaner.clean_products(refreshed)
+                        if st.session_state.feature_weights:
+                            st.session_state.cp_values = CPCalculator.calculate_all_cp_values(
+                                st.session_state.cleaned_products,
+                                st.session_state.feature_weights
+                            )
+                        updated = sum(1 for product in job.results.values() if product)
+                        st.success(f"✅ 已更新 {updated}/{job.total} 個商品的價格 (耗時 {job.duration:.2f}s)")
+            
             products = st.session_state.products
             
             # 商品概覽卡片
@@ -1410,8 +1489,9 @@ def main():
                     
                     with col1:
                         if st.button("➕ 加入比較清單", key=f"add_to_compare_{len(st.session_state.comparison_list)}", use_container_width=True):
-                            # 檢查是否已經在清單中
-                            if product_info['url'] not in [p['url'] for p in st.session_state.comparison_list]:
+                            # 檢查是否已經在清單中（以標準化網址比較，同一商品的不同追蹤參數不會重複加入）
+                            listed = {canonicalize_url(p['url']) for p in st.session_state.comparison_list}
+                            if canonicalize_url(product_info['url']) not in listed:
                                 st.session_state.comparison_list.append(product_info)
                                 st.success(f"✅ 已加入比較清單！目前有 {len(st.session_state.comparison_list)} 個商品")
                             else:
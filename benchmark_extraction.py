@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+欄位擷取效能比較 - 逐一選擇器 select_one（舊做法）vs 單次走訪擷取引擎
+
+用法:
+    python benchmark_extraction.py saved_pages/*.html
+    python benchmark_extraction.py            # 未指定檔案時產生 200 個合成商品頁
+"""
+import sys
+import os
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.html_parser import make_soup
+from utils.extraction import (
+    PRODUCT_PLAN,
+    SPEC_CONTAINER_KEYWORDS,
+    SPEC_DIV_KEYWORDS,
+    MAX_REVIEWS,
+    extract_fields,
+)
+
+PAGE_COUNT = 200
+
+
+def synthetic_pages(count: int):
+    """產生不同結構的商品頁（部分頁面缺少 Momo 專用元素，迫使選擇器往後嘗試）"""
+    pages = []
+    for i in range(count):
+        rng = random.Random(i)
+        filler = ''.join(
+            f'<div class="box{j}"><span class="label">項目 {j}</span><a href="/p/{j}">連結</a></div>'
+            for j in range(rng.randint(300, 800))
+        )
+        price = (f'<span class="seoPrice">${rng.randint(500, 50000):,}</span>' if rng.random() < 0.5
+                 else f'<div class="product-price">NT${rng.randint(500, 50000):,}</div>')
+        title = (f'<h1 class="title">商品 {i} 旗艦款</h1>' if rng.random() < 0.5
+                 else f'<div class="product-title">商品 {i} 標準款</div>')
+        specs = ''.join(f'<dt>規格{j}</dt><dd>數值{j}</dd>' for j in range(rng.randint(5, 30)))
+        reviews = ''.join(f'<li class="review-item">評論 {j}</li>' for j in range(rng.randint(0, 20)))
+        pages.append((f'synthetic-{i}', f"""<html><body>{filler}
+            <div class="breadcrumb"><a>首頁</a><a>分類{i % 7}</a><a>子分類</a></div>
+            {title}{price}<div class="rate">{rng.randint(30, 50) / 10}</div>
+            <dl class="spec-list">{specs}</dl><ul>{reviews}</ul>{filler}</body></html>""".encode('utf-8')))
+    return pages
+
+
+def cascade_extract(soup):
+    """舊做法：每個選擇器各自走訪一次 DOM，回傳 (結果, 走訪次數)"""
+    walks = 0
+    values = {}
+    for field in PRODUCT_PLAN.fields:
+        values[field.name] = field.default
+        for selector in field.selectors:
+            walks += 1
+            elem = soup.select_one(selector.selector)
+            if elem is not None:
+                parsed = field.parse(elem)
+                if parsed is not None:
+                    values[field.name] = parsed
+                    break
+
+    review_elements = soup.find_all(['div', 'li'], class_=lambda x: x and 'review' in x.lower())
+    soup.find_all(['dl', 'table', 'div'], class_=lambda x: x and any(kw in x.lower() for kw in SPEC_CONTAINER_KEYWORDS))
+    soup.find_all('table')
+    soup.find_all('div', class_=lambda x: x and any(kw in x.lower() for kw in SPEC_DIV_KEYWORDS))
+    soup.find_all('dl')
+    walks += 5
+
+    reviews = [e.get_text(strip=True) for e in review_elements[:MAX_REVIEWS] if e.get_text(strip=True)]
+    return values, reviews, walks
+
+
+def main():
+    paths = sys.argv[1:]
+    pages = [(os.path.basename(p), open(p, 'rb').read()) for p in paths] or synthetic_pages(PAGE_COUNT)
+    soups = [make_soup(html, fast=False) for _, html in pages]
+
+    print("=" * 70)
+    print(f"🧪 欄位擷取效能比較（{len(soups)} 頁，完整 DOM）")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    cascade_results = []
+    total_walks = 0
+    for soup in soups:
+        values, reviews, walks = cascade_extract(soup)
+        cascade_results.append((values, reviews))
+        total_walks += walks
+    cascade_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine_results = []
+    for soup in soups:
+        result = extract_fields(soup)
+        engine_results.append((result.values, result.reviews))
+    engine_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(cascade_results, engine_results) if a != b)
+
+    print(f"   逐一選擇器   {cascade_time * 1000:9.1f} ms  平均 {cascade_time / len(soups) * 1000:6.2f} ms/頁  "
+          f"DOM 走訪 {total_walks / len(soups):.0f} 次/頁")
+    print(f"   單次走訪引擎 {engine_time * 1000:9.1f} ms  平均 {engine_time / len(soups) * 1000:6.2f} ms/頁  "
+          f"DOM 走訪 1 次/頁")
+    print(f"   加速 {cascade_time / (engine_time or 1e-9):.1f}x，結果不一致 {mismatches} 頁")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+HTML 解析效能比較 - html.parser 完整解析 vs lxml vs lxml + SoupStrainer
+
+用法:
+    python benchmark_parsing.py saved_pages/*.html
+    python benchmark_parsing.py            # 未指定檔案時使用合成的 Momo 風格頁面
+"""
+import sys
+import os
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bs4 import BeautifulSoup
+from utils.html_parser import make_soup, FAST_PARSER
+from utils.scraper import ProductScraper
+
+ROUNDS = 5
+
+
+def synthetic_page() -> bytes:
+    """產生接近 Momo 商品頁大小的測試頁面（大量導覽、推薦與腳本）"""
+    filler = ''.join(
+        f'<li class="menu-item"><a href="/c/{i}">分類 {i}</a><img src="//img.momoshop.com.tw/ad{i}.jpg"></li>'
+        for i in range(3000)
+    )
+    scripts = ''.join(f'<script>var tracking{i} = {{"id": {i}, "v": "{"x" * 200}"}};</script>' for i in range(200))
+    specs = ''.join(f'<dt>規格{i}</dt><dd>數值{i}</dd>' for i in range(30))
+    reviews = ''.join(f'<li class="reviewItem">評論內容 {i} 很好用</li>' for i in range(50))
+    html = f"""<html><head><title>測試商品</title>{scripts}</head><body>
+    <nav><ul>{filler}</ul></nav>
+    <div class="breadcrumb"><a>首頁</a><a>3C</a><a>耳機</a></div>
+    <div class="prdwrap"><h1 class="title">Sony WH-1000XM5 無線降噪耳機</h1>
+    <p class="current-price"><span class="seoPrice">$10,990</span></p>
+    <div class="specArea"><dl>{specs}</dl><img src="//img.momoshop.com.tw/spec.jpg" alt="spec"></div></div>
+    <ul class="reviewList">{reviews}</ul>
+    <footer><ul>{filler}</ul></footer></body></html>"""
+    return html.encode('utf-8')
+
+
+def measure(label, parse, html):
+    """回傳 (平均秒數, 峰值記憶體 MB, soup)"""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        soup = parse(html)
+    elapsed = (time.perf_counter() - start) / ROUNDS
+
+    tracemalloc.start()
+    soup = parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024, soup
+
+
+def main():
+    paths = sys.argv[1:]
+    pages = [(os.path.basename(p), open(p, 'rb').read()) for p in paths] or [('synthetic', synthetic_page())]
+
+    modes = [
+        ('html.parser 完整', lambda h: BeautifulSoup(h, 'html.parser')),
+        (f'{FAST_PARSER} 完整', lambda h: BeautifulSoup(h, FAST_PARSER)),
+        (f'{FAST_PARSER} + Strainer', lambda h: make_soup(h, fast=True)),
+    ]
+    scraper = ProductScraper()
+
+    print("=" * 78)
+    print(f"🧪 HTML 解析效能比較（每種模式 {ROUNDS} 次取平均）")
+    print("=" * 78)
+
+    totals = {label: [0.0, 0.0] for label, _ in modes}
+    for name, html in pages:
+        print(f"\n📄 {name} ({len(html) / 1024:.0f} KB)")
+        for label, parse in modes:
+            elapsed, peak, soup = measure(label, parse, html)
+            totals[label][0] += elapsed
+            totals[label][1] = max(totals[label][1], peak)
+            print(f"   {label:<22} {elapsed * 1000:8.1f} ms  峰值 {peak:7.1f} MB  "
+                  f"| 名稱: {scraper._extract_name(soup)[:20]}  價格: {scraper._extract_price(soup):,.0f}")
+
+    print("\n" + "-" * 78)
+    base = totals[modes[0][0]][0] or 1
+    for label, (elapsed, peak) in totals.items():
+        print(f"   {label:<22} 總計 {elapsed * 1000:8.1f} ms ({base / (elapsed or 1):4.1f}x)  峰值 {peak:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
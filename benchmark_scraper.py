@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+爬蟲效能測試 - 以重播資料集（不連網）測量擷取速度、延遲分佈與記憶體
+
+用法:
+    python benchmark_scraper.py                          # 使用 SCRAPE_REPLAY_DIR；資料集為空時產生合成頁面
+    python benchmark_scraper.py -d fixtures/pages -c 1 2 4 8 -o bench.json
+    python benchmark_scraper.py --compare bench_old.json # 與先前結果比較
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SYNTHETIC_PAGES = 50
+
+
+def percentile(values, pct):
+    """線性內插百分位數"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * pct / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def latency_stats(samples):
+    """回傳毫秒為單位的延遲統計"""
+    ms = [s * 1000 for s in samples]
+    return {
+        'count': len(ms),
+        'mean_ms': round(sum(ms) / len(ms), 3) if ms else 0.0,
+        'p50_ms': round(percentile(ms, 50), 3),
+        'p95_ms': round(percentile(ms, 95), 3),
+        'p99_ms': round(percentile(ms, 99), 3),
+    }
+
+
+def peak_rss_mb():
+    """行程目前為止的峰值常駐記憶體（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 單位為 KB，macOS 為 bytes
+    return round(peak / 1024 / (1024 if sys.platform == 'darwin' else 1), 1)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def build_synthetic_corpus(root):
+    """資料集為空時，以合成商品頁建立暫時資料集"""
+    from benchmark_extraction import synthetic_pages
+    from utils.replay import ReplayCorpus
+
+    corpus = ReplayCorpus(root, mode='record')
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, (_, html) in enumerate(synthetic_pages(SYNTHETIC_PAGES)):
+            corpus.save(f"https://bench.example.com/product/{i}", html, 'static')
+
+
+def bench_stages(scraper, corpus, urls, quiet):
+    """單執行緒逐頁測量：讀取（fetch）、解析、欄位擷取、規格擷取與完整 extract_product_info"""
+    from utils.extraction import extract_fields
+    from utils.html_parser import make_soup
+    from utils.site_adapters import get_adapter
+
+    fetch, parse, price, specs, full = [], [], [], [], []
+    with quiet():
+        for url in urls:
+            kind = 'static' if corpus.has(url, 'static') else 'dynamic'
+            html, elapsed = timed(corpus.load, url, kind)
+            fetch.append(elapsed)
+
+            soup, elapsed = timed(make_soup, html)
+            parse.append(elapsed)
+
+            _, elapsed = timed(scraper._extract_price, soup)
+            price.append(elapsed)
+
+            extraction = extract_fields(soup, get_adapter(url).plan)
+            _, elapsed = timed(scraper._extract_specs, soup, extraction)
+            specs.append(elapsed)
+
+            _, elapsed = timed(scraper.extract_product_info, url, kind == 'dynamic')
+            full.append(elapsed)
+
+    total_fetch, total_parse = sum(fetch), sum(parse)
+    return {
+        'fetch': latency_stats(fetch),
+        'parse': latency_stats(parse),
+        'fetch_vs_parse': {
+            'fetch_share': round(total_fetch / ((total_fetch + total_parse) or 1), 4),
+            'parse_share': round(total_parse / ((total_fetch + total_parse) or 1), 4),
+        },
+        '_extract_price': latency_stats(price),
+        '_extract_specs': latency_stats(specs),
+        'extract_product_info': latency_stats(full),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def bench_batch(urls, workers, quiet):
+    """以指定並行數執行完整的 scrape_products 批次"""
+    from utils.scraper import iter_scrape_products
+
+    latencies = []
+    succeeded = 0
+    with quiet():
+        start = time.perf_counter()
+        for _, _, product, elapsed in iter_scrape_products(urls, max_workers=workers):
+            latencies.append(elapsed)
+            succeeded += 1 if product else 0
+        wall = time.perf_counter() - start
+
+    return {
+        'workers': workers,
+        'pages': len(urls),
+        'succeeded': succeeded,
+        'wall_s': round(wall, 3),
+        'pages_per_sec': round(len(urls) / wall, 2) if wall else 0.0,
+        'latency': latency_stats(latencies),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def print_comparison(current, previous):
+    print("\n" + "-" * 70)
+    print(f"📈 與 {previous.get('commit') or '先前結果'} 比較（負值表示變快）")
+    for stage in ('parse', '_extract_price', '_extract_specs', 'extract_product_info'):
+        old = previous.get('stages', {}).get(stage, {}).get('p50_ms')
+        new = current['stages'][stage]['p50_ms']
+        if old:
+            print(f"   {stage:<22} p50 {old:8.2f} → {new:8.2f} ms ({(new - old) / old:+.1%})")
+    old_batches = {b['workers']: b for b in previous.get('batches', [])}
+    for batch in current['batches']:
+        old = old_batches.get(batch['workers'])
+        if old and old['pages_per_sec']:
+            print(f"   並行 {batch['workers']:<2} 批次            {old['pages_per_sec']:8.2f} → "
+                  f"{batch['pages_per_sec']:8.2f} 頁/秒 ({(batch['pages_per_sec'] - old['pages_per_sec']) / old['pages_per_sec']:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬蟲效能測試（重播資料集）")
+    parser.add_argument('-d', '--dir', help="重播資料集目錄（預設 SCRAPE_REPLAY_DIR）")
+    parser.add_argument('-c', '--concurrency', type=int, nargs='+', default=[1, 2, 4, 8], help="測試的並行數")
+    parser.add_argument('-o', '--output', help="結果 JSON 路徑（預設 bench_results/<commit>.json）")
+    parser.add_argument('--compare', help="與先前的結果 JSON 比較")
+    parser.add_argument('-v', '--verbose', action='store_true', help="顯示爬蟲輸出")
+    args = parser.parse_args()
+
+    # 設定需在匯入爬蟲模組前決定
+    root = args.dir or os.getenv('SCRAPE_REPLAY_DIR') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+    synthetic = not os.path.exists(os.path.join(root, 'index.json'))
+    if synthetic:
+        root = tempfile.mkdtemp(prefix='cp-bench-')
+    os.environ['SCRAPE_REPLAY_MODE'] = 'replay'
+    os.environ['SCRAPE_REPLAY_DIR'] = root
+
+    quiet = (lambda: contextlib.nullcontext()) if args.verbose else (lambda: contextlib.redirect_stdout(io.StringIO()))
+    with quiet():
+        if synthetic:
+            build_synthetic_corpus(root)
+        from utils.replay import get_replay_corpus
+        from utils.scraper import ProductScraper
+        corpus = get_replay_corpus()
+        scraper = ProductScraper()
+    urls = corpus.urls()
+
+    print("=" * 70)
+    print(f"🧪 爬蟲效能測試：{len(urls)} 頁{'（合成資料集）' if synthetic else ''}  {root}")
+    print("=" * 70)
+
+    stages = bench_stages(scraper, corpus, urls, quiet)
+    for name in ('fetch', 'parse', '_extract_price', '_extract_specs', 'extract_product_info'):
+        s = stages[name]
+        print(f"   {name:<22} p50 {s['p50_ms']:8.2f}  p95 {s['p95_ms']:8.2f}  p99 {s['p99_ms']:8.2f} ms")
+    print(f"   讀取 / 解析時間占比    {stages['fetch_vs_parse']['fetch_share']:.0%} / "
+          f"{stages['fetch_vs_parse']['parse_share']:.0%}")
+
+    batches = []
+    print()
+    for workers in args.concurrency:
+        batch = bench_batch(urls, workers, quiet)
+        batches.append(batch)
+        lat = batch['latency']
+        print(f"   並行 {workers:<2} {batch['pages_per_sec']:8.2f} 頁/秒  p50 {lat['p50_ms']:8.2f}  "
+              f"p95 {lat['p95_ms']:8.2f}  p99 {lat['p99_ms']:8.2f} ms  峰值 RSS {batch['peak_rss_mb']:.1f} MB")
+
+    result = {
+        'commit': git_commit(),
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'corpus': {'dir': None if synthetic else root, 'synthetic': synthetic, 'pages': len(urls)},
+        'stages': stages,
+        'batches': batches,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+    output = args.output or os.path.join('bench_results', f"{result['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 結果已儲存: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print_comparison(result, json.load(f))
+
+    if synthetic:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
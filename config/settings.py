@@ -6,6 +6,15 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# 專案根目錄與本地快取目錄
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.getenv("CP_CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+
+# 錄製 / 重播模式：record 會把抓到的頁面（含瀏覽器渲染後的 DOM）存成測試資料集，
+# replay 則完全由資料集提供頁面，不連網（用於離線效能測試與回歸比對）
+SCRAPE_REPLAY_MODE = os.getenv("SCRAPE_REPLAY_MODE", "off")  # off / record / replay
+SCRAPE_REPLAY_DIR = os.getenv("SCRAPE_REPLAY_DIR", os.path.join(BASE_DIR, "fixtures", "pages"))
+
 # Gemini API 設定 - 支援 Streamlit Secrets 和 .env 文件
 GEMINI_API_KEY = ""
 
@@ -31,6 +40,75 @@ HEADERS = {
 }
 REQUEST_TIMEOUT = 10
 SELENIUM_WAIT_TIME = 10
+IMAGE_DOWNLOAD_TIMEOUT = 15
+
+# HTTP 連線池設定（靜態頁面與圖片下載共用）
+HTTP_POOL_CONNECTIONS = 10   # 保留連線池的主機數
+HTTP_POOL_MAXSIZE = 10       # 每個主機的最大連線數
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5    # 重試間隔：0.5s、1s、2s...
+# 只重試暫時性的伺服器錯誤；限流（THROTTLE_STATUS）不在連線層重試，交由斷路器退避
+HTTP_RETRY_STATUS = (500, 502, 504)
+
+# HTML 解析設定：快速模式使用 lxml 並只保留商品相關區塊（標題、價格、規格、評論、麵包屑）
+FAST_PARSE = os.getenv("FAST_PARSE", "1") != "0"
+
+# 需要 JS 渲染的頁面（如 Momo）先嘗試內嵌的 JSON-LD / 腳本狀態，資料完整時不啟動瀏覽器
+STRUCTURED_DATA_FAST_PATH = os.getenv("STRUCTURED_DATA_FAST_PATH", "1") != "0"
+
+# Selenium 瀏覽器池設定
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "2"))        # 同時存在的瀏覽器上限
+DRIVER_MAX_PAGES = int(os.getenv("DRIVER_MAX_PAGES", "50"))       # 單一瀏覽器載入頁數上限，超過即回收重建
+DRIVER_IDLE_TIMEOUT = int(os.getenv("DRIVER_IDLE_TIMEOUT", "300"))  # 閒置秒數超過即關閉
+DRIVER_ACQUIRE_TIMEOUT = 60  # 等待可用瀏覽器的最長秒數
+
+# 頁面快取設定（壓縮 HTML + ETag/Last-Modified）
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "1") != "0"
+PAGE_CACHE_DIR = os.path.join(CACHE_DIR, "pages")
+PAGE_CACHE_TTL = {  # 各網站快取有效秒數，過期後靜態頁面會以 If-None-Match 重新驗證
+    "momo": 900,
+    "pchome": 900,
+    "yahoo": 900,
+    "shopee": 600,
+    "ruten": 1800,
+}
+DEFAULT_PAGE_CACHE_TTL = 600
+PAGE_CACHE_MAX_AGE = 24 * 3600      # 超過此秒數的頁面（過期後仍保留供重新驗證）才刪除
+PAGE_CACHE_PURGE_INTERVAL = 3600    # 寫入時最多每隔此秒數清理一次
+
+# 商品解析結果快取設定（SQLite）
+# 錄製與重播時停用，確保每個網址都實際經過抓取與解析
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1") != "0" and SCRAPE_REPLAY_MODE == "off"
+RESULT_CACHE_PATH = os.path.join(CACHE_DIR, "products.sqlite3")
+RESULT_CACHE_PRICE_TTL = 900            # 價格、評分等易變欄位（秒）
+RESULT_CACHE_SPECS_TTL = 7 * 24 * 3600  # 名稱、規格（含圖像識別）、評論等穩定欄位（秒）
+
+# 規格圖像識別結果快取（SQLite）：以圖片網址與圖片內容 SHA-256 為鍵，超過上限時淘汰最久未使用的項目
+VISION_CACHE_ENABLED = os.getenv("VISION_CACHE_ENABLED", "1") != "0"
+VISION_CACHE_PATH = os.path.join(CACHE_DIR, "vision.sqlite3")
+VISION_CACHE_MAX_ENTRIES = int(os.getenv("VISION_CACHE_MAX_ENTRIES", "5000"))
+
+# 價格歷史（SQLite WAL，記錄每次爬取的價格、評分與 CP 值；不屬於快取，不放在 CACHE_DIR）
+PRICE_HISTORY_ENABLED = os.getenv("PRICE_HISTORY_ENABLED", "1") != "0" and SCRAPE_REPLAY_MODE != "replay"
+PRICE_HISTORY_PATH = os.getenv("PRICE_HISTORY_PATH", os.path.join(BASE_DIR, "data", "price_history.sqlite3"))
+PRICE_DROP_THRESHOLD = 0.05  # 降價偵測：比期間最高價低 5% 以上
+
+# 精簡瀏覽器設定：擷取資料時不下載圖片、字型與追蹤腳本（img 的 src 屬性仍保留在 DOM 中）
+LEAN_BROWSER_PROFILE = os.getenv("LEAN_BROWSER_PROFILE", "1") != "0"
+BLOCKED_RESOURCE_EXTENSIONS = ("jpg", "jpeg", "png", "gif", "webp", "svg", "ico", "woff", "woff2", "ttf", "otf")
+BLOCKED_URL_PATTERNS = [
+    # 圖片與字型（CDN 網址常帶查詢字串，如 a.jpg?t=123，需另外比對；不用 *.jpg* 以免誤擋 .gift 等網域）
+    *(pattern for ext in BLOCKED_RESOURCE_EXTENSIONS for pattern in (f"*.{ext}", f"*.{ext}?*")),
+    # 廣告與分析
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*facebook.net*", "*facebook.com/tr*",
+    "*hotjar.com*", "*criteo.com*", "*scorecardresearch.com*",
+]
+
+# 動態頁面就緒判斷設定
+READINESS_MIN_TIMEOUT = 3       # 自適應逾時下限（秒），上限為 SELENIUM_WAIT_TIME
+READINESS_POLL_INTERVAL = 0.2   # 檢查就緒條件的間隔（秒）
+NETWORK_IDLE_WINDOW = 0.5       # 資源請求數維持不變多久視為網路閒置（秒）
 
 # 支援的特徵清單（可擴展）
 COMMON_FEATURES = [
@@ -50,3 +128,62 @@ SUPPORTED_SITES = {
     "shopee": "shopee.tw",
     "ruten": "www.ruten.com.tw",
 }
+
+# 批次爬取並行設定
+SCRAPE_MAX_WORKERS = int(os.getenv("SCRAPE_MAX_WORKERS", "4"))  # 同時爬取的商品數
+
+# 各網站請求速率限制：(每秒請求數, 突發容量)，鍵值對應 SUPPORTED_SITES
+SITE_RATE_LIMITS = {
+    "momo": (0.5, 1),
+    "pchome": (1.0, 2),
+    "yahoo": (1.0, 2),
+    "shopee": (0.5, 1),
+    "ruten": (1.0, 2),
+}
+DEFAULT_RATE_LIMIT = (1.0, 1)  # 未列入清單的網站
+
+# 規格圖像識別：圖片並行下載，Vision API 呼叫受全域速率與並行數限制（所有商品共用）
+IMAGE_DOWNLOAD_WORKERS = int(os.getenv("IMAGE_DOWNLOAD_WORKERS", "5"))
+VISION_MAX_CONCURRENCY = int(os.getenv("VISION_MAX_CONCURRENCY", "3"))  # 同時進行的 Vision 呼叫上限
+VISION_RATE_LIMIT = (1.0, 3)  # (每秒請求數, 突發容量)
+
+# 規格圖像送出前的前處理：裁切文字區域（OpenCV）、縮小、灰階並以 JPEG 上傳（取代無損 WebP）
+VISION_PREPROCESS = os.getenv("VISION_PREPROCESS", "1") != "0"
+VISION_MAX_SIDE = int(os.getenv("VISION_MAX_SIDE", "2048"))  # 長邊上限（像素），長條規格圖仍保留可讀字級
+VISION_JPEG_QUALITY = 85
+VISION_GRAYSCALE = True
+VISION_TEXT_CROP = True
+
+# 規格圖像本機 OCR（Tesseract）：信心足夠時直接採用，否則才送 Gemini Vision
+LOCAL_OCR_ENABLED = os.getenv("LOCAL_OCR_ENABLED", "1") != "0"
+OCR_LANG = os.getenv("OCR_LANG", "chi_tra+eng")
+OCR_MIN_CONFIDENCE = 75.0  # 規格行的平均字詞信心（0–100）低於此值即改用 Vision
+OCR_MIN_SPECS = 2          # 至少解析出幾個規格才採用 OCR 結果
+
+# 規格圖像感知雜湊去重：近乎相同的圖像（不同網址或尺寸的同一張圖）只送一張給 Vision
+PHASH_DEDUP_ENABLED = os.getenv("PHASH_DEDUP_ENABLED", "1") != "0"
+PHASH_SIZE = 16              # aHash / dHash 邊長，共 16 x 16 = 256 位元
+PHASH_MAX_DISTANCE = 10      # 兩種雜湊各自容許的相異位元數
+PHASH_MAX_BLOCK_DIFF = 6.0   # 縮圖各區塊平均亮度差上限（0–255），排除版型相同但文字不同的規格圖
+PHASH_INDEX_SIZE = 512       # 跨商品保留的近期圖像數
+
+# 背景爬取工作佇列
+SCRAPE_JOB_WORKERS = int(os.getenv("SCRAPE_JOB_WORKERS", "2"))  # 同時執行的爬取工作數（所有使用者共用）
+SCRAPE_JOB_RESULT_TTL = 600   # 完成的工作保留秒數（期間相同網址集合直接沿用結果）
+SCRAPE_JOB_POLL_INTERVAL = 1.0  # 介面輪詢工作狀態的間隔秒數
+
+# 網站健康狀態：斷路器與退避（被限流時快速失敗，不再對同一網站重試）
+THROTTLE_STATUS = (429, 503)        # 視為被限流的 HTTP 狀態碼
+CIRCUIT_FAILURE_THRESHOLD = 5       # 連續失敗幾次後暫停該網站（限流回應計 2 次）
+CIRCUIT_RESET_TIMEOUT = 60          # 暫停秒數，之後放行一次試探請求
+BACKOFF_BASE = 1.0                  # 失敗後退避秒數：BACKOFF_BASE * 2^(失敗次數-1)，加上隨機抖動
+BACKOFF_MAX = 30.0
+
+# 背景監控（monitor.py）：定期重新爬取追蹤清單並發出降價 / CP 排名變動通知
+MONITOR_WATCHLISTS_PATH = os.getenv("MONITOR_WATCHLISTS_PATH", os.path.join(BASE_DIR, "watchlists.json"))
+MONITOR_DEFAULT_INTERVAL = 3600   # 清單預設檢查間隔（秒）
+MONITOR_JITTER = 0.1              # 間隔隨機抖動比例（±10%），避免固定時間集中請求
+MONITOR_DROP_WINDOW = 7 * 24 * 3600  # 降價比較的期間（秒）
+MONITOR_ALERTS_PATH = os.getenv("MONITOR_ALERTS_PATH", os.path.join(BASE_DIR, "data", "alerts.jsonl"))
+MONITOR_STATUS_PATH = os.path.join(CACHE_DIR, "monitor_status.json")  # 佇列深度與延遲
+MONITOR_WEBHOOK_URL = os.getenv("MONITOR_WEBHOOK_URL", "")  # 選填：通知以 JSON POST 至此網址
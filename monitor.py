@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+價格監控 - 不開啟介面，定期重新爬取追蹤清單，降價或 CP 排名變動時通知
+
+用法:
+    python monitor.py                          # 讀取 watchlists.json 持續監控
+    python monitor.py -w my_lists.json --once  # 只檢查一次
+    python monitor.py --status                 # 查看執行中監控的佇列深度與延遲
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import MONITOR_WATCHLISTS_PATH
+from utils.monitor import PriceMonitor, load_watchlists, read_status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="價格監控")
+    parser.add_argument('-w', '--watchlists', default=MONITOR_WATCHLISTS_PATH, help="追蹤清單 JSON 檔")
+    parser.add_argument('--once', action='store_true', help="只檢查一次後結束")
+    parser.add_argument('--status', action='store_true', help="顯示執行中監控的狀態後結束")
+    args = parser.parse_args()
+
+    if args.status:
+        status = read_status()
+        print(json.dumps(status, ensure_ascii=False, indent=2) if status else "⚠️  找不到監控狀態（監控未執行？）")
+        return
+
+    if not os.path.exists(args.watchlists):
+        print(f"❌ 找不到追蹤清單: {args.watchlists}（可參考 watchlists.example.json）")
+        sys.exit(1)
+
+    monitor = PriceMonitor(load_watchlists(args.watchlists))
+    if args.once:
+        monitor.run_once()
+        print(json.dumps(monitor.status(), ensure_ascii=False, indent=2))
+        return
+
+    try:
+        monitor.run()
+    except KeyboardInterrupt:
+        print("\n👋 停止監控")
+        monitor.stop()
+
+
+if __name__ == "__main__":
+    main()
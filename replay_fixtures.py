@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+測試資料集工具 - 錄製商品頁面，之後在無網路環境重播並比對擷取結果
+
+用法:
+    python replay_fixtures.py record URL [URL ...]      # 錄製頁面並保存目前的擷取結果
+    python replay_fixtures.py record -f urls.txt --dynamic
+    python replay_fixtures.py check                     # 重播資料集，與保存的結果比對（不連網）
+    python replay_fixtures.py list
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+VOLATILE_FIELDS = ('scrape_time', 'fetched_at')
+
+
+def _comparable(product):
+    return {k: v for k, v in product.items() if k not in VOLATILE_FIELDS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="錄製 / 重播商品頁面資料集")
+    parser.add_argument('command', choices=['record', 'check', 'list'])
+    parser.add_argument('urls', nargs='*', help="要錄製的商品網址")
+    parser.add_argument('-f', '--file', help="網址清單檔（每行一個）")
+    parser.add_argument('-d', '--dir', help="資料集目錄（預設 SCRAPE_REPLAY_DIR）")
+    parser.add_argument('--dynamic', action='store_true', help="以動態頁面爬取（錄製瀏覽器渲染後的 DOM）")
+    args = parser.parse_intermixed_args()
+
+    # 設定需在匯入爬蟲模組前決定
+    os.environ['SCRAPE_REPLAY_MODE'] = {'record': 'record', 'check': 'replay', 'list': 'replay'}[args.command]
+    if args.dir:
+        os.environ['SCRAPE_REPLAY_DIR'] = args.dir
+
+    from utils.replay import get_replay_corpus
+    from utils.scraper import scrape_products
+
+    corpus = get_replay_corpus()
+    expected_path = os.path.join(corpus.root, 'expected.json')
+    try:
+        with open(expected_path, 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+    except (OSError, ValueError):
+        expected = {}
+
+    if args.command == 'list':
+        for url in corpus.urls():
+            kinds = [k for k in ('static', 'dynamic') if corpus.has(url, k)]
+            print(f"{'+'.join(kinds):<15} {url}")
+        return
+
+    if args.command == 'record':
+        urls = list(args.urls)
+        if args.file:
+            with open(args.file, 'r', encoding='utf-8') as f:
+                urls += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        if not urls:
+            parser.error("請提供要錄製的網址")
+
+        products = scrape_products(urls, is_dynamic=args.dynamic)
+        for product in products:
+            expected[product['url']] = {'is_dynamic': args.dynamic, 'product': _comparable(product)}
+        with open(expected_path, 'w', encoding='utf-8') as f:
+            json.dump(expected, f, ensure_ascii=False, indent=1)
+        print(f"\n✅ 已錄製 {len(products)}/{len(urls)} 個商品至 {corpus.root}")
+        return
+
+    # check：重播並比對
+    if not expected:
+        print("❌ 資料集沒有保存的擷取結果，請先執行 record")
+        sys.exit(1)
+
+    failures = 0
+    for is_dynamic in (False, True):
+        urls = [url for url, item in expected.items() if item['is_dynamic'] == is_dynamic]
+        if not urls:
+            continue
+        actual = {p['url']: _comparable(p) for p in scrape_products(urls, is_dynamic=is_dynamic)}
+        for url in urls:
+            want = expected[url]['product']
+            got = actual.get(url)
+            if got == want:
+                continue
+            failures += 1
+            print(f"\n❌ 結果不一致: {url}")
+            for field in sorted(set(want) | set(got or {})):
+                if got is None or want.get(field) != got.get(field):
+                    print(f"   {field}: 預期 {str(want.get(field))[:80]} / 實際 {str((got or {}).get(field))[:80]}")
+
+    print(f"\n{'✅' if not failures else '❌'} {len(expected) - failures}/{len(expected)} 個商品結果一致")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""
+離線單元測試共用設定 - 快取與價格紀錄寫到暫存目錄，不連網、不影響本機資料
+
+執行: python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+
+_tmp_dir = tempfile.mkdtemp(prefix='cp_compare_tests_')
+os.environ.setdefault('CP_CACHE_DIR', _tmp_dir)
+os.environ.setdefault('PRICE_HISTORY_PATH', os.path.join(_tmp_dir, 'price_history.sqlite3'))
+os.environ['SCRAPE_REPLAY_MODE'] = 'off'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,29 @@
+"""精簡瀏覽器設定的封鎖清單（Chrome 的 Network.setBlockedURLs 只有 * 是萬用字元）"""
+import re
+
+import pytest
+
+from config.settings import BLOCKED_URL_PATTERNS
+
+
+def _blocked(url):
+    return any(re.fullmatch('.*'.join(map(re.escape, pattern.split('*'))), url) for pattern in BLOCKED_URL_PATTERNS)
+
+
+@pytest.mark.parametrize('url', [
+    'https://img.momoshop.com.tw/goodsimg/0001/a.jpg',
+    'https://img.momoshop.com.tw/goodsimg/0001/a.jpg?t=1700000000',
+    'https://cdn.example.com/fonts/icons.woff2?v=3',
+    'https://www.google-analytics.com/analytics.js',
+])
+def test_resources_are_blocked(url):
+    assert _blocked(url)
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=123',
+    'https://static.gift.example.com/app.js',
+    'https://cdn.example.com/app.js?img=a.jpgx',
+])
+def test_pages_and_scripts_are_not_blocked(url):
+    assert not _blocked(url)
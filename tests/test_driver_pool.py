@@ -0,0 +1,102 @@
+"""瀏覽器池：數量上限、達頁數上限回收、出錯時不放回池中（以假瀏覽器測試，不需 Chrome）"""
+import threading
+import time
+
+import pytest
+
+from utils.driver_pool import DriverPool, DriverPoolError
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+        self.healthy = True
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("renderer hung")
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def created():
+    return []
+
+
+@pytest.fixture
+def pool(created):
+    def factory():
+        driver = FakeDriver()
+        created.append(driver)
+        return driver
+    pool = DriverPool(max_size=2, max_pages=3, idle_timeout=0, driver_factory=factory)
+    yield pool
+    pool.shutdown()
+
+
+def test_reuses_idle_driver(pool, created):
+    with pool.borrow() as first:
+        pass
+    with pool.borrow() as second:
+        pass
+    assert first is second and len(created) == 1
+
+
+def test_pool_is_bounded(pool, created):
+    a, b = pool.acquire(), pool.acquire()
+    with pytest.raises(DriverPoolError):
+        pool.acquire(timeout=0.05)
+    assert pool.stats()['total'] == 2
+
+    # 歸還後等待中的借用者可取得
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire(timeout=2)))
+    waiter.start()
+    time.sleep(0.05)
+    pool.release(a)
+    waiter.join()
+    assert got[0] is a
+    pool.release(b)
+    pool.release(got[0])
+    assert len(created) == 2
+
+
+def test_recycled_after_max_pages(pool, created):
+    for _ in range(3):
+        with pool.borrow():
+            pass
+    assert created[0].quit_called
+    with pool.borrow() as driver:
+        pass
+    assert driver is created[1]
+
+
+def test_discarded_on_error(pool, created):
+    with pytest.raises(RuntimeError):
+        with pool.borrow():
+            raise RuntimeError("page load timeout")
+    assert created[0].quit_called
+    assert pool.stats() == {'total': 0, 'idle': 0, 'in_use': 0, 'max_size': 2}
+
+    with pool.borrow() as driver:
+        pass
+    assert driver is created[1]
+
+
+def test_unhealthy_idle_driver_is_replaced(pool, created):
+    with pool.borrow():
+        pass
+    created[0].healthy = False
+    with pool.borrow() as driver:
+        pass
+    assert driver is created[1] and created[0].quit_called
+
+
+def test_factory_failure_frees_slot(created):
+    pool = DriverPool(max_size=1, idle_timeout=0, driver_factory=lambda: 1 / 0)
+    with pytest.raises(DriverPoolError):
+        pool.acquire()
+    assert pool.stats()['total'] == 0
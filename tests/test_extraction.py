@@ -0,0 +1,93 @@
+"""單次走訪擷取引擎須與逐一 select_one 的結果完全相同"""
+import random
+
+import pytest
+from bs4 import BeautifulSoup
+
+from benchmark_extraction import cascade_extract, synthetic_pages
+from utils.extraction import CompiledSelector, extract_fields
+from utils.html_parser import make_soup
+from utils.site_adapters import ADAPTERS, DEFAULT_ADAPTER
+
+ADAPTER_SELECTORS = sorted({
+    selector.selector
+    for adapter in [*ADAPTERS.values(), DEFAULT_ADAPTER]
+    for field in adapter.plan.fields
+    for selector in field.selectors
+})
+
+
+def _selector_tokens():
+    """從所有選擇器收集標籤、class 與屬性值，隨機頁面以這些字組成才會命中"""
+    tags, classes, attrs = {'div', 'span', 'p', 'li', 'a'}, set(), set()
+    for text in ADAPTER_SELECTORS:
+        for chain in CompiledSelector(text).alternatives:
+            for compound in chain:
+                if compound.tag:
+                    tags.add(compound.tag)
+                classes.update(compound.classes)
+                for name, _, value in compound.attrs:
+                    attrs.add((name, value or 'x'))
+    return sorted(tags), sorted(classes), sorted(attrs)
+
+
+TAGS, CLASSES, ATTRS = _selector_tokens()
+
+
+def _random_class(rng):
+    token = rng.choice(CLASSES + [a[1] for a in ATTRS if a[0] == 'class'])
+    # 前後加字，測試 *= / ^= / $= 的部分比對
+    return rng.choice(['', 'pre-', 'x']) + token + rng.choice(['', '-post', '2'])
+
+
+def _random_element(rng, depth):
+    tag = rng.choice(TAGS)
+    attrs = []
+    if rng.random() < 0.6:
+        attrs.append(f'class="{" ".join(_random_class(rng) for _ in range(rng.randint(1, 3)))}"')
+    if rng.random() < 0.3:
+        name, value = rng.choice(ATTRS)
+        if name != 'class':
+            attrs.append(f'{name}="{value if rng.random() < 0.7 else value + "-x"}"')
+    text = f'{rng.choice(["NT$", "", "★"])}{rng.randint(0, 9999)} 商品名稱{rng.randint(0, 99)}'
+    children = ''.join(_random_element(rng, depth - 1) for _ in range(rng.randint(0, 3))) if depth else ''
+    return f'<{tag} {" ".join(attrs)}>{text}{children}</{tag}>'
+
+
+def _random_page(seed):
+    rng = random.Random(seed)
+    return '<html><body>' + ''.join(_random_element(rng, 4) for _ in range(rng.randint(5, 25))) + '</body></html>'
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_compiled_selectors_match_select_one(seed):
+    soup = BeautifulSoup(_random_page(seed), 'html.parser')
+    for adapter in [*ADAPTERS.values(), DEFAULT_ADAPTER]:
+        first = adapter.plan.run(soup).first_matches
+        for field in adapter.plan.fields:
+            for selector in field.selectors:
+                assert first.get(selector.selector) is soup.select_one(selector.selector), selector.selector
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_compiled_selector_matches_tag_like_soupsieve(seed):
+    soup = BeautifulSoup(_random_page(seed), 'html.parser')
+    for text in ADAPTER_SELECTORS:
+        selector = CompiledSelector(text)
+        expected = {id(tag) for tag in soup.select(text)}
+        actual = {id(tag) for tag in soup.find_all(True) if selector.matches(tag)}
+        assert actual == expected, text
+
+
+def test_engine_matches_cascade_on_synthetic_pages():
+    for _, html in synthetic_pages(10):
+        soup = make_soup(html, fast=False)
+        values, reviews, _ = cascade_extract(soup)
+        result = extract_fields(soup)
+        assert (result.values, result.reviews) == (values, reviews)
+
+
+@pytest.mark.parametrize('text', ['div > span', 'a:hover', 'div[data-x~="y"]', '#id'])
+def test_unsupported_selectors_are_rejected(text):
+    with pytest.raises(ValueError):
+        CompiledSelector(text)
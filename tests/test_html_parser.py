@@ -0,0 +1,48 @@
+"""快速解析模式（SoupStrainer）不可丟掉擷取與圖片搜尋會讀取的元素"""
+import pytest
+
+from utils.extraction import _Compound
+from utils.html_parser import is_product_region, make_soup
+from utils.image_recognizer import MomoImageExtractor
+from utils.site_adapters import ADAPTERS, DEFAULT_ADAPTER
+
+
+def _compound_attrs(compound: _Compound) -> dict:
+    attrs = {}
+    if compound.classes:
+        attrs['class'] = list(compound.classes)
+    for name, _, value in compound.attrs:
+        attrs[name] = value or ''
+    return attrs
+
+
+def _adapter_selectors():
+    for adapter in [*ADAPTERS.values(), DEFAULT_ADAPTER]:
+        for field in adapter.plan.fields:
+            for selector in field.selectors:
+                yield adapter.key, selector
+
+
+@pytest.mark.parametrize('key,selector', list(_adapter_selectors()),
+                         ids=lambda v: v if isinstance(v, str) else v.selector)
+def test_adapter_selectors_survive_strainer(key, selector):
+    # 後代組合中只要有一層被保留，整個子樹就會保留
+    for chain in selector.alternatives:
+        assert any(is_product_region(c.tag or 'div', _compound_attrs(c)) for c in chain), \
+            f"{key}: {selector.selector} 會被快速解析丟棄"
+
+
+def test_pchome_nick_container_is_kept():
+    html = '<html><body><div id="NickContainer">Apple iPhone 15 128G</div></body></html>'
+    soup = make_soup(html, fast=True)
+    assert soup.find(id='NickContainer').get_text() == 'Apple iPhone 15 128G'
+
+
+def test_images_outside_product_regions_are_kept():
+    html = ('<html><body><div class="wrapper">'
+            '<img src="https://img.momoshop.com.tw/goodsimg/a.jpg">'
+            '</div></body></html>')
+    soup = make_soup(html, fast=True)
+    assert MomoImageExtractor.extract_spec_images_from_soup(soup) == [
+        'https://img.momoshop.com.tw/goodsimg/a.jpg'
+    ]
@@ -0,0 +1,85 @@
+"""感知雜湊：同一張圖的不同尺寸 / 壓縮視為重複，文字不同的橫幅不可誤判"""
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from utils.image_hash import PerceptualIndex, fingerprint, hamming_distance, is_near_duplicate
+
+
+def _banner(rows, size=(600, 300), fmt='PNG', quality=90):
+    image = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(image)
+    for top, width in rows:
+        draw.rectangle((20, top, 20 + width, top + 20), fill='black')
+    image = image.resize(size)
+    output = BytesIO()
+    image.save(output, format=fmt, quality=quality)
+    return output.getvalue()
+
+
+ROWS = [(30, 400), (90, 250), (150, 500), (210, 320)]
+
+
+def _resized(data, size, fmt='JPEG'):
+    with Image.open(BytesIO(data)) as image:
+        output = BytesIO()
+        image.convert('RGB').resize(size, Image.LANCZOS).save(output, format=fmt, quality=70)
+    return output.getvalue()
+
+
+def test_hamming_distance():
+    assert hamming_distance(0b1011, 0b0001) == 2
+
+
+def test_resized_recompressed_copy_is_duplicate():
+    original = fingerprint(_banner(ROWS))
+    copy = fingerprint(_resized(_banner(ROWS), (450, 225)))
+    assert is_near_duplicate(original, copy)
+
+
+def test_different_text_is_not_duplicate():
+    other = [(30, 400), (90, 250), (150, 180), (210, 320)]
+    assert not is_near_duplicate(fingerprint(_banner(ROWS)), fingerprint(_banner(other)))
+
+
+def test_different_aspect_is_not_duplicate():
+    assert not is_near_duplicate(fingerprint(_banner(ROWS)), fingerprint(_resized(_banner(ROWS), (600, 200))))
+
+
+def test_undecodable_image():
+    assert fingerprint(b'not an image') is None
+
+
+def test_index_shares_result_with_near_duplicates():
+    index = PerceptualIndex(max_entries=4)
+    first = fingerprint(_banner(ROWS))
+    future, owner = index.claim(first)
+    assert owner
+    waiter, waiter_owner = index.claim(fingerprint(_resized(_banner(ROWS), (450, 225))))
+    assert not waiter_owner and waiter is future
+
+    with ThreadPoolExecutor(1) as pool:
+        pending = pool.submit(waiter.result, 5)
+        index.resolve(first, future, {'重量': '1kg'})
+        assert pending.result() == {'重量': '1kg'}
+
+
+def test_failed_recognition_is_not_shared_later():
+    index = PerceptualIndex()
+    image = fingerprint(_banner(ROWS))
+    future, _ = index.claim(image)
+    index.resolve(image, future, {})
+    assert future.result() == {}
+    _, owner = index.claim(image)
+    assert owner
+
+
+def test_index_evicts_oldest():
+    index = PerceptualIndex(max_entries=1)
+    a = fingerprint(_banner(ROWS))
+    b = fingerprint(_banner([(30, 100)], size=(300, 600)))
+    index.claim(a)
+    index.claim(b)
+    _, owner = index.claim(a)
+    assert owner
@@ -0,0 +1,102 @@
+"""本機 OCR 規格識別與信心不足時改用 Vision（以假的 pytesseract / Gemini 模型測試，不需 Tesseract 與 API）"""
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image, ImageDraw
+
+from utils import image_recognizer
+from utils.image_recognizer import ImageRecognizer
+from utils.vision_cache import VisionCache
+
+
+def _ocr_data(lines, conf):
+    """組出 pytesseract.image_to_data(output_type=DICT) 格式的結果，每行的字詞以空白分隔"""
+    data = {'text': [], 'conf': [], 'block_num': [], 'par_num': [], 'line_num': []}
+    for line_num, line in enumerate(lines, 1):
+        for word in line.split():
+            data['text'].append(word)
+            data['conf'].append(conf)
+            data['block_num'].append(1)
+            data['par_num'].append(1)
+            data['line_num'].append(line_num)
+    return data
+
+
+class FakeModel:
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def generate_content(self, parts):
+        self.calls += 1
+        return SimpleNamespace(text=self.text)
+
+
+@pytest.fixture
+def image_data():
+    image = Image.new('RGB', (400, 120), 'white')
+    ImageDraw.Draw(image).rectangle((20, 40, 380, 80), fill='black')
+    output = BytesIO()
+    image.save(output, format='PNG')
+    return output.getvalue()
+
+
+@pytest.fixture
+def recognizer(monkeypatch):
+    def install(ocr_lines, conf, vision_text='處理器: Vision 結果\n重量: 1.2kg'):
+        fake_tesseract = SimpleNamespace(
+            Output=SimpleNamespace(DICT='dict'),
+            image_to_data=lambda *args, **kwargs: _ocr_data(ocr_lines, conf),
+        )
+        monkeypatch.setattr(image_recognizer, 'pytesseract', fake_tesseract)
+        monkeypatch.setattr(image_recognizer, 'local_ocr_available', lambda: True)
+        monkeypatch.setattr(image_recognizer, 'get_vision_cache', lambda: VisionCache(enabled=False))
+
+        rec = ImageRecognizer(local_ocr=True)
+        rec.model = FakeModel(vision_text)
+        return rec
+    return install
+
+
+def test_ocr_parses_spec_lines(recognizer, image_data):
+    rec = recognizer(['處 理 器 ： Intel i5', '記 憶 體 : 16GB', '產品特色'], conf=92)
+    assert rec.extract_specs_with_ocr(image_data) == {'處理器': 'Intel i5', '記憶體': '16GB'}
+
+
+def test_ocr_low_confidence_returns_none(recognizer, image_data):
+    rec = recognizer(['處理器: Intel i5', '記憶體: 16GB'], conf=40)
+    assert rec.extract_specs_with_ocr(image_data) is None
+
+
+def test_ocr_too_few_specs_returns_none(recognizer, image_data):
+    rec = recognizer(['處理器: Intel i5'], conf=95)
+    assert rec.extract_specs_with_ocr(image_data) is None
+
+
+def test_ocr_disabled_returns_none(recognizer, image_data):
+    rec = recognizer(['處理器: Intel i5', '記憶體: 16GB'], conf=95)
+    rec.local_ocr = False
+    assert rec.extract_specs_with_ocr(image_data) is None
+
+
+def test_confident_ocr_skips_vision(recognizer, image_data):
+    rec = recognizer(['處理器: Intel i5', '記憶體: 16GB'], conf=95)
+    specs = rec.extract_specs_from_image_data(image_data)
+    assert specs == {'處理器': 'Intel i5', '記憶體': '16GB'}
+    assert rec.model.calls == 0
+
+
+def test_low_confidence_ocr_escalates_to_vision(recognizer, image_data):
+    rec = recognizer(['處理器: Intel i5', '記憶體: 16GB'], conf=40)
+    specs = rec.extract_specs_from_image_data(image_data)
+    assert specs == {'處理器': 'Vision 結果', '重量': '1.2kg'}
+    assert rec.model.calls == 1
+
+
+def test_ocr_probe_skipped_when_disabled(monkeypatch):
+    # 停用本機 OCR 時不檢查 Tesseract，也不會印出無法使用的警告
+    def probe():
+        raise AssertionError("不應檢查 Tesseract")
+    monkeypatch.setattr(image_recognizer, 'local_ocr_available', probe)
+    assert ImageRecognizer(local_ocr=False).local_ocr is False
@@ -0,0 +1,50 @@
+"""規格圖前處理：透明背景須補白，否則轉灰階後黑字消失"""
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageStat
+
+from utils.image_hash import fingerprint
+from utils.image_preprocess import flatten_alpha, prepare_for_ocr, prepare_for_vision
+
+
+def _transparent_png() -> bytes:
+    image = Image.new('RGBA', (400, 200), (0, 0, 0, 0))
+    ImageDraw.Draw(image).rectangle((40, 80, 360, 120), fill=(0, 0, 0, 255))
+    output = BytesIO()
+    image.save(output, format='PNG')
+    return output.getvalue()
+
+
+def test_flatten_alpha_uses_white_background():
+    with Image.open(BytesIO(_transparent_png())) as image:
+        flat = flatten_alpha(image)
+    assert flat.mode == 'RGB'
+    assert flat.getpixel((0, 0)) == (255, 255, 255)
+    assert flat.getpixel((200, 100)) == (0, 0, 0)
+
+
+def test_flatten_alpha_keeps_opaque_images():
+    image = Image.new('RGB', (10, 10), (10, 20, 30))
+    assert flatten_alpha(image) is image
+
+
+def test_prepare_for_vision_transparent_png_is_mostly_white():
+    data = prepare_for_vision(_transparent_png(), crop=False)
+    with Image.open(BytesIO(data)) as image:
+        assert ImageStat.Stat(image.convert('L')).mean[0] > 128
+
+
+def test_prepare_for_ocr_transparent_png_keeps_text():
+    image = prepare_for_ocr(_transparent_png())
+    # 黑字白底：多數為白色，但仍有黑色筆畫
+    assert ImageStat.Stat(image).mean[0] > 128
+    assert image.getextrema()[0] == 0
+
+
+def test_fingerprint_transparent_matches_white_background():
+    white = Image.new('RGB', (400, 200), (255, 255, 255))
+    ImageDraw.Draw(white).rectangle((40, 80, 360, 120), fill=(0, 0, 0))
+    output = BytesIO()
+    white.save(output, format='PNG')
+    a, b = fingerprint(_transparent_png()), fingerprint(output.getvalue())
+    assert a.ahash == b.ahash and a.max_block_diff(b) == 0
@@ -0,0 +1,53 @@
+"""背景爬取工作：更新價格的工作須帶入已知商品與動態模式，失敗的商品保留原資料"""
+import time
+
+from utils import job_queue
+from utils.job_queue import DONE, ScrapeJobQueue
+
+
+def _wait(queue, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("工作未完成")
+
+
+def test_refresh_job_passes_known_and_keeps_failed_products(monkeypatch):
+    calls = []
+
+    def fake_iter(urls, is_dynamic=False, max_workers=None, known=None):
+        calls.append((list(urls), is_dynamic, known))
+        yield 0, urls[0], {'url': urls[0], 'name': 'A', 'price': 90}, 0.1
+        yield 1, urls[1], None, 0.1
+
+    monkeypatch.setattr(job_queue, 'iter_scrape_products', fake_iter)
+    known = {'https://a/': {'url': 'https://a/', 'name': 'A', 'price': 100},
+             'https://b/': {'url': 'https://b/', 'name': 'B', 'price': 200}}
+    queue = ScrapeJobQueue(max_workers=1)
+
+    job = _wait(queue, queue.submit(list(known), is_dynamic=True, known=known))
+
+    assert job.status == DONE
+    assert calls == [(list(known), True, known)]
+    assert [p['price'] for p in job.products()] == [90, 200]
+
+
+def test_finished_refresh_is_not_reused_but_scrape_is(monkeypatch):
+    def fake_iter(urls, is_dynamic=False, max_workers=None, known=None):
+        for index, url in enumerate(urls):
+            yield index, url, {'url': url, 'name': url, 'price': 1}, 0.0
+
+    monkeypatch.setattr(job_queue, 'iter_scrape_products', fake_iter)
+    queue = ScrapeJobQueue(max_workers=1)
+    urls = ['https://a/', 'https://b/']
+    known = {url: {'url': url, 'name': url, 'price': 1} for url in urls}
+
+    scrape_id = _wait(queue, queue.submit(urls)).id
+    assert queue.submit(urls) == scrape_id
+
+    refresh_id = _wait(queue, queue.submit(urls, known=known)).id
+    assert refresh_id != scrape_id
+    assert queue.submit(urls, known=known) != refresh_id
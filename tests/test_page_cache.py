@@ -0,0 +1,115 @@
+"""頁面快取：TTL、304 重新驗證與過期清理"""
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from utils import page_cache
+from utils.page_cache import PageCache, fetch_html
+
+URL = 'https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=1'
+HTML = b'<html><body>cached</body></html>'
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = PageCache(cache_dir=str(tmp_path), enabled=True)
+    monkeypatch.setattr(page_cache, 'get_page_cache', lambda: cache)
+    return cache
+
+
+def _age(cache, url, seconds, kind='static'):
+    """把快取的抓取時間往前調 seconds 秒"""
+    _, meta_path = cache._paths(url, kind)
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    meta['fetched_at'] -= seconds
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(headers or {})
+        return self.responses.pop(0)
+
+
+def _response(status, content=b'', headers=None):
+    return SimpleNamespace(status_code=status, content=content, headers=headers or {})
+
+
+def test_ttl_and_kinds(cache):
+    cache.put(URL, HTML, etag='"v1"')
+    assert cache.get(URL).html == HTML
+    assert cache.get(URL, kind='dynamic') is None
+
+    _age(cache, URL, cache.ttl_for(URL) + 1)
+    assert cache.get(URL) is None
+    assert cache.load(URL).etag == '"v1"'  # 過期後仍保留供重新驗證
+
+
+def test_fresh_cache_skips_network(cache, monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(page_cache, 'get_session', lambda: session)
+    cache.put(URL, HTML)
+    assert fetch_html(URL) == HTML
+    assert session.requests == []
+
+
+def test_304_revalidation_reuses_and_refreshes_cache(cache, monkeypatch):
+    session = FakeSession(_response(304))
+    monkeypatch.setattr(page_cache, 'get_session', lambda: session)
+    cache.put(URL, HTML, etag='"v1"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT')
+    _age(cache, URL, cache.ttl_for(URL) + 1)
+
+    assert fetch_html(URL) == HTML
+    assert session.requests[0]['If-None-Match'] == '"v1"'
+    assert session.requests[0]['If-Modified-Since'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+    assert cache.get(URL) is not None  # 抓取時間已更新
+
+
+def test_changed_page_replaces_cache(cache, monkeypatch):
+    session = FakeSession(_response(200, b'<html>new</html>', {'ETag': '"v2"'}))
+    monkeypatch.setattr(page_cache, 'get_session', lambda: session)
+    cache.put(URL, HTML, etag='"v1"')
+    _age(cache, URL, cache.ttl_for(URL) + 1)
+
+    assert fetch_html(URL) == b'<html>new</html>'
+    assert cache.get(URL).etag == '"v2"'
+
+
+def test_error_status_raises_and_is_not_cached(cache, monkeypatch):
+    monkeypatch.setattr(page_cache, 'get_session', lambda: FakeSession(_response(503)))
+    with pytest.raises(requests.HTTPError):
+        fetch_html(URL)
+    assert cache.load(URL) is None
+
+
+def test_put_purges_pages_older_than_max_age(tmp_path):
+    cache = PageCache(cache_dir=str(tmp_path), enabled=True, max_age=100, purge_interval=0)
+    cache.put(URL, HTML)
+    _age(cache, URL, 101)
+    cache.put('https://example.com/other', HTML)
+
+    assert cache.load(URL) is None
+    assert cache.load('https://example.com/other') is not None
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_purge_is_rate_limited(tmp_path):
+    cache = PageCache(cache_dir=str(tmp_path), enabled=True, max_age=100, purge_interval=3600)
+    cache.put(URL, HTML)  # 第一次寫入即清理並開始計時
+    _age(cache, URL, 101)
+    cache.put('https://example.com/other', HTML)
+    assert cache.load(URL) is not None
+
+    cache._last_purge = time.time() - 3601
+    cache.put('https://example.com/third', HTML)
+    assert cache.load(URL) is None
@@ -0,0 +1,51 @@
+"""價格歷史：同一次取得的價格只記錄一次（快取命中不算新的觀測值）"""
+import pytest
+
+from utils import scraper
+from utils.html_parser import make_soup
+from utils.price_history import PriceHistory
+from utils.result_cache import ResultCache
+
+URL = 'https://shop.example.com/item?id=1'
+PAGE = '<html><body><h1>測試商品旗艦款</h1><span class="price">NT$1,990</span></body></html>'
+
+
+@pytest.fixture
+def history(tmp_path):
+    return PriceHistory(path=str(tmp_path / 'history.sqlite3'), enabled=True)
+
+
+def test_same_fetch_is_recorded_once(history):
+    product = {'url': URL, 'name': 'A', 'price': 100, 'fetched_at': 1000.0}
+    history.record(product)
+    history.record(dict(product))
+    history.record(dict(product, price=90, fetched_at=2000.0))
+    assert [row['price'] for row in history.history(URL)] == [100, 90]
+
+
+def test_products_without_fetch_time_are_recorded_each_time(history):
+    history.record({'url': URL, 'price': 100}, recorded_at=1.0)
+    history.record({'url': URL, 'price': 100}, recorded_at=2.0)
+    assert len(history.history(URL)) == 2
+
+
+def test_cached_result_is_not_recorded_again(history, tmp_path, monkeypatch):
+    cache = ResultCache(path=str(tmp_path / 'results.sqlite3'), enabled=True)
+    loads = []
+
+    def load_page(self, url, is_dynamic=False):
+        loads.append(url)
+        return make_soup(PAGE), {}
+
+    monkeypatch.setattr(scraper, 'get_result_cache', lambda: cache)
+    monkeypatch.setattr(scraper, 'get_price_history', lambda: history)
+    monkeypatch.setattr(scraper.ProductScraper, 'load_page', load_page)
+
+    product_scraper = scraper.ProductScraper()
+    first, _ = scraper._scrape_one(product_scraper, URL, False)
+    second, _ = scraper._scrape_one(product_scraper, URL, False)
+
+    assert len(loads) == 1
+    assert first['price'] == second['price'] == 1990
+    assert second['fetched_at'] == first['fetched_at']
+    assert len(history.history(URL)) == 1
@@ -0,0 +1,35 @@
+"""Token Bucket 限流與網站鍵值"""
+import time
+
+from utils.rate_limiter import DomainRateLimiter, TokenBucket, get_site_key
+
+
+def test_burst_then_wait():
+    bucket = TokenBucket(rate=20.0, capacity=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    start = time.monotonic()
+    waited = bucket.acquire()
+    assert waited > 0
+    assert time.monotonic() - start >= 0.04
+
+
+def test_tokens_refill_over_time():
+    bucket = TokenBucket(rate=50.0, capacity=1)
+    bucket.acquire()
+    time.sleep(0.05)
+    assert bucket.acquire() == 0.0
+
+
+def test_site_key():
+    assert get_site_key('https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=1') == 'momo'
+    assert get_site_key('https://m.momoshop.com.tw/goods.momo') == 'momo'
+    assert get_site_key('https://Shop.Example.com/x') == 'shop.example.com'
+
+
+def test_domain_limiter_shares_bucket_per_site():
+    limiter = DomainRateLimiter(limits={'momo': (1.0, 1)}, default=(2.0, 2))
+    a = limiter.bucket_for('https://www.momoshop.com.tw/a')
+    b = limiter.bucket_for('https://m.momoshop.com.tw/b')
+    other = limiter.bucket_for('https://example.com/')
+    assert a is b
+    assert other is not a and (other.rate, other.capacity) == (2.0, 2)
@@ -0,0 +1,61 @@
+"""解析結果快取：價格與規格分別判斷是否過期"""
+import time
+
+import pytest
+
+from utils.result_cache import ResultCache
+
+URL = 'https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=1&Area=search'
+PRODUCT = {'url': URL, 'name': '商品', 'price': 100, 'specs': {'重量': '1kg'}}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(path=str(tmp_path / 'results.sqlite3'), enabled=True, price_ttl=60, specs_ttl=3600)
+
+
+def _set_times(cache, price_age, specs_age):
+    now = time.time()
+    conn = cache._connect()
+    conn.execute("UPDATE product_results SET price_fetched_at = ?, specs_fetched_at = ?",
+                 (now - price_age, now - specs_age))
+    conn.commit()
+
+
+def test_fresh_result(cache):
+    cache.put(URL, 'v1', PRODUCT)
+    cached = cache.get(URL, 'v1')
+    assert cached.fresh and cached.product['specs'] == {'重量': '1kg'}
+
+
+def test_stale_price_with_fresh_specs(cache):
+    cache.put(URL, 'v1', PRODUCT)
+    _set_times(cache, price_age=120, specs_age=120)
+    cached = cache.get(URL, 'v1')
+    assert not cached.price_fresh and cached.specs_fresh and not cached.fresh
+
+
+def test_stale_specs(cache):
+    cache.put(URL, 'v1', PRODUCT)
+    _set_times(cache, price_age=0, specs_age=7200)
+    cached = cache.get(URL, 'v1')
+    assert cached.price_fresh and not cached.specs_fresh
+
+
+def test_price_update_keeps_specs_time(cache):
+    cache.put(URL, 'v1', PRODUCT)
+    _set_times(cache, price_age=120, specs_age=3000)
+    old = cache.get(URL, 'v1')
+    cache.put(URL, 'v1', dict(PRODUCT, price=90), old.specs_fetched_at)
+
+    cached = cache.get(URL, 'v1')
+    assert cached.price_fresh and cached.product['price'] == 90
+    assert cached.specs_fetched_at == old.specs_fetched_at
+
+
+def test_key_uses_canonical_url_and_version(cache):
+    cache.put(URL, 'v1', PRODUCT)
+    other = 'https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=1'
+    cached = cache.get(other, 'v1')
+    assert cached is not None and cached.product['url'] == other
+    assert cache.get(URL, 'v2') is None
@@ -0,0 +1,71 @@
+"""批次爬取：快取命中不連網，也不等待網站限流與名額"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils import page_cache, scraper
+from utils.page_cache import PageCache
+from utils.price_history import PriceHistory
+from utils.rate_limiter import DomainRateLimiter
+from utils.result_cache import ResultCache
+from utils.site_health import SiteHealthRegistry
+
+URLS = [f'https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code={i}' for i in range(6)]
+
+
+@pytest.fixture
+def isolated(tmp_path, monkeypatch):
+    cache = ResultCache(path=str(tmp_path / 'results.sqlite3'), enabled=True)
+    limiter = DomainRateLimiter()  # 使用實際設定：momo 每 2 秒 1 個請求
+    monkeypatch.setattr(scraper, 'get_result_cache', lambda: cache)
+    monkeypatch.setattr(scraper, 'get_rate_limiter', lambda: limiter)
+    monkeypatch.setattr(scraper, 'get_site_health', lambda: SiteHealthRegistry())
+    monkeypatch.setattr(scraper, 'get_price_history',
+                        lambda: PriceHistory(path=str(tmp_path / 'history.sqlite3'), enabled=True))
+    return cache, limiter
+
+
+def _fail_load_page(self, url, is_dynamic=False):
+    raise AssertionError(f"快取命中不應連網: {url}")
+
+
+def test_cached_batch_does_not_wait_for_rate_limiter(isolated, monkeypatch):
+    cache, _ = isolated
+    for i, url in enumerate(URLS):
+        cache.put(url, scraper.ProductScraper.EXTRACTOR_VERSION,
+                  {'url': url, 'name': f'商品 {i}', 'price': 100 + i, 'specs': {}, 'reviews': [], 'rating': 0})
+    monkeypatch.setattr(scraper.ProductScraper, 'load_page', _fail_load_page)
+
+    start = time.monotonic()
+    products = scraper.scrape_products(URLS)
+    assert time.monotonic() - start < 1.0
+    assert [p['price'] for p in products] == [100 + i for i in range(6)]
+
+
+def test_fresh_cached_price_refresh_does_not_wait(isolated, monkeypatch):
+    cache, _ = isolated
+    known = []
+    for i, url in enumerate(URLS):
+        product = {'url': url, 'name': f'商品 {i}', 'price': 100 + i, 'specs': {}, 'reviews': [], 'rating': 0}
+        cache.put(url, scraper.ProductScraper.EXTRACTOR_VERSION, product)
+        known.append(product)
+    monkeypatch.setattr(scraper.ProductScraper, 'load_page', _fail_load_page)
+
+    start = time.monotonic()
+    products = scraper.refresh_prices(known)
+    assert time.monotonic() - start < 1.0
+    assert len(products) == 6
+
+
+def test_network_fetches_still_rate_limited(isolated, monkeypatch):
+    _, limiter = isolated
+    waits = []
+    monkeypatch.setattr(limiter, 'acquire', lambda url: waits.append(url) or 0.0)
+
+    response = SimpleNamespace(status_code=200, headers={}, content=b'<html><body><h1>a</h1></body></html>')
+    monkeypatch.setattr(page_cache, 'get_session', lambda: SimpleNamespace(get=lambda *a, **k: response))
+    monkeypatch.setattr(page_cache, 'get_page_cache', lambda: PageCache(enabled=False))
+
+    assert scraper.ProductScraper()._fetch_static_html(URLS[0]) == response.content
+    assert waits == [URLS[0]]
@@ -0,0 +1,70 @@
+"""single-flight：同一鍵值的並行呼叫只執行一次"""
+import threading
+import time
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def work():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return 'result'
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do('k', work)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do('k', work))) for _ in range(4)]
+    for t in followers:
+        t.start()
+    for t in [leader, *followers]:
+        t.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [('result', False)] + [('result', True)] * 4
+    assert flight.in_flight() == 0
+
+
+def test_error_is_raised_to_waiters_and_not_cached():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError('boom')
+
+    errors = []
+
+    def run():
+        try:
+            flight.do('k', fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=run)]
+    threads[0].start()
+    started.wait()
+    threads.append(threading.Thread(target=run))
+    threads[1].start()
+    for t in threads:
+        t.join()
+
+    assert errors == ['boom', 'boom']
+    assert flight.do('k', lambda: 'ok') == ('ok', False)
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == (1, False)
+    assert flight.do('b', lambda: 2) == (2, False)
+    with pytest.raises(ValueError):
+        flight.do('c', lambda: int('x'))
@@ -0,0 +1,77 @@
+"""網站斷路器：連續失敗開啟、冷卻後只放行一次試探、成功後恢復"""
+import time
+
+import pytest
+import requests
+
+from utils.site_health import (
+    CLOSED, HALF_OPEN, OPEN, CircuitOpenError, HostHealth, is_site_error, is_throttle_error,
+)
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(response=response)
+
+
+def test_opens_after_threshold_and_halves_concurrency():
+    health = HostHealth(max_concurrency=4, failure_threshold=3, reset_timeout=60)
+    assert health.record_failure() is False
+    assert health.concurrency == 2
+    assert health.record_failure() is False
+    assert health.record_failure() is True
+    assert health.state == OPEN and health.concurrency == 1
+    with pytest.raises(CircuitOpenError):
+        health.check()
+
+
+def test_throttle_counts_double():
+    health = HostHealth(max_concurrency=4, failure_threshold=4, reset_timeout=60)
+    health.record_failure(throttled=True)
+    assert health.record_failure(throttled=True) is True
+
+
+def test_half_open_allows_single_trial():
+    health = HostHealth(max_concurrency=2, failure_threshold=1, reset_timeout=0.05)
+    health.record_failure()
+    time.sleep(0.06)
+    health.check()
+    assert health.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        health.check()
+
+
+def test_failed_trial_reopens_and_success_closes():
+    health = HostHealth(max_concurrency=2, failure_threshold=1, reset_timeout=0.05)
+    health.record_failure()
+    time.sleep(0.06)
+    health.check()
+    assert health.record_failure() is True
+    assert health.state == OPEN
+
+    time.sleep(0.06)
+    health.check()
+    health.record_success()
+    assert health.state == CLOSED and health.failures == 0
+    assert health.concurrency == 2
+    assert health.backoff() == 0.0
+
+
+def test_trial_released_without_result_lets_next_request_try():
+    health = HostHealth(max_concurrency=1, failure_threshold=1, reset_timeout=0.05)
+    health.record_failure()
+    time.sleep(0.06)
+    health.check()
+    health.acquire()
+    health.release()
+    health.check()  # 上一個試探未碰到網路（例如命中快取），不應拋出
+
+
+def test_error_classification():
+    assert is_throttle_error(_http_error(429))
+    assert not is_throttle_error(_http_error(500))
+    assert is_site_error(_http_error(500))
+    assert is_site_error(requests.ConnectionError())
+    assert not is_site_error(_http_error(404))
+    assert not is_site_error(_http_error(410))
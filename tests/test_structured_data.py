@@ -0,0 +1,89 @@
+"""內嵌結構化資料：只採用本頁主商品，不可誤用推薦或相關商品的價格"""
+import json
+
+from utils.structured_data import extract_structured_data, is_complete
+
+
+def _page(title, *json_ld, canonical=None, extra=''):
+    head = f'<title>{title} | 購物網</title>'
+    if canonical:
+        head += f'<link rel="canonical" href="{canonical}">'
+    scripts = ''.join(f'<script type="application/ld+json">{json.dumps(data, ensure_ascii=False)}</script>'
+                      for data in json_ld)
+    return f'<html><head>{head}{scripts}</head><body><h1>{title}</h1>{extra}</body></html>'
+
+
+def _product(name, price, url=None):
+    node = {'@type': 'Product', 'name': name, 'offers': {'@type': 'Offer', 'price': price}}
+    if url:
+        node['url'] = url
+    return node
+
+
+def test_single_product():
+    data = extract_structured_data(_page('Apple iPhone 15 128GB', _product('Apple iPhone 15 128GB', '24900')))
+    assert data['name'] == 'Apple iPhone 15 128GB' and data['price'] == 24900.0
+    assert data['source'] == 'json-ld' and is_complete(data)
+
+
+def test_graph_and_list_input():
+    graph = {'@context': 'https://schema.org', '@graph': [
+        {'@type': 'BreadcrumbList', 'itemListElement': []},
+        _product('Sony WH-1000XM5 耳機', 9990),
+    ]}
+    assert extract_structured_data(_page('Sony WH-1000XM5 耳機', graph))['price'] == 9990.0
+
+    as_list = [{'@type': 'Organization', 'name': '購物網'}, _product('Sony WH-1000XM5 耳機', 9990)]
+    assert extract_structured_data(_page('Sony WH-1000XM5 耳機', as_list))['price'] == 9990.0
+
+
+def test_related_item_that_is_substring_of_title_is_not_used():
+    html = _page('Apple iPhone 15 Pro Max 256GB',
+                 _product('iPhone 15', 24900), _product('Apple iPhone 15 Pro Max 256GB', 44900))
+    data = extract_structured_data(html)
+    assert data['name'] == 'Apple iPhone 15 Pro Max 256GB'
+    assert data['price'] == 44900.0
+
+
+def test_url_match_wins_over_name():
+    url = 'https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=2'
+    html = _page('iPhone 15 Pro Max 256GB',
+                 _product('iPhone 15 Pro Max 256GB', 43900, 'https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=1'),
+                 _product('iPhone 15 Pro Max 256GB 鈦金屬', 44900, url + '&Area=search'),
+                 canonical=url)
+    assert extract_structured_data(html)['price'] == 44900.0
+
+
+def test_best_partial_match_by_coverage():
+    html = _page('Apple iPhone 15 Pro Max 256GB 原色鈦金屬',
+                 _product('iPhone 15', 24900), _product('iPhone 15 Pro Max 256GB 原色鈦金屬', 44900))
+    assert extract_structured_data(html)['price'] == 44900.0
+
+
+def test_ambiguous_candidates_are_rejected():
+    # 兩個候選都只有部分相符且同分時無法判斷，不採用 JSON-LD
+    html = _page('Apple iPhone 15 Pro',
+                 _product('iPhone 15 Pro 黑', 36900), _product('iPhone 15 Pro 白', 35900))
+    data = extract_structured_data(html)
+    assert 'price' not in data
+
+
+def test_unrelated_candidates_only_are_rejected():
+    html = _page('Apple iPhone 15 Pro Max 256GB', _product('AirPods Pro 2', 7490), _product('iPhone 15', 24900))
+    assert not is_complete(extract_structured_data(html))
+
+
+def test_duplicate_main_product_is_not_a_tie():
+    html = _page('Apple iPhone 15 128GB',
+                 _product('Apple iPhone 15 128GB', 24900), _product('Apple iPhone 15 128GB', 24900),
+                 _product('iPhone 15 保護殼', 390))
+    assert extract_structured_data(html)['price'] == 24900.0
+
+
+def test_embedded_state_chooses_main_product():
+    state = {'product': {'goodsName': 'Dyson V15 Detect 吸塵器', 'salePrice': 23900},
+             'recommend': [{'goodsName': 'Dyson V15', 'salePrice': 19900}]}
+    html = _page('Dyson V15 Detect 吸塵器',
+                 extra=f'<script>window.__INITIAL_STATE__ = {json.dumps(state, ensure_ascii=False)};</script>')
+    data = extract_structured_data(html)
+    assert data['price'] == 23900.0 and data['source'] == 'inline-state'
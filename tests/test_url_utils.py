@@ -0,0 +1,34 @@
+"""網址標準化：同一商品的不同寫法須得到相同鍵值"""
+from utils.url_utils import canonicalize_url
+
+
+def test_momo_keeps_only_product_code():
+    a = canonicalize_url('https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=123&Area=search&mdiv=1')
+    b = canonicalize_url('HTTPS://WWW.MOMOSHOP.COM.TW/goods/GoodsDetail.jsp?mdiv=2&i_code=123#top')
+    assert a == b == 'https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=123'
+
+
+def test_different_products_stay_distinct():
+    assert (canonicalize_url('https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=1')
+            != canonicalize_url('https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=2'))
+
+
+def test_unknown_site_drops_tracking_params_and_sorts_query():
+    url = 'https://shop.example.com/item?b=2&utm_source=x&a=1&fbclid=abc'
+    assert canonicalize_url(url) == 'https://shop.example.com/item?a=1&b=2'
+
+
+def test_default_ports_and_empty_path():
+    assert canonicalize_url('http://Example.com:80') == 'http://example.com/'
+    assert canonicalize_url('https://example.com:8443/p') == 'https://example.com:8443/p'
+
+
+def test_supported_sites_normalize_scheme_to_https():
+    assert (canonicalize_url('http://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=123')
+            == canonicalize_url('https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=123'))
+    assert canonicalize_url('http://24h.pchome.com.tw/prod/DYAJ-A900').startswith('https://')
+    assert canonicalize_url('http://www.ruten.com.tw/item/show?123').startswith('https://')
+
+
+def test_unknown_sites_keep_scheme():
+    assert canonicalize_url('http://shop.example.com/item') == 'http://shop.example.com/item'
@@ -0,0 +1,237 @@
+"""
+瀏覽器池模組 - 重複使用已啟動的 headless Chrome
+"""
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from selenium import webdriver
+from config.settings import (
+    DRIVER_POOL_SIZE,
+    DRIVER_MAX_PAGES,
+    DRIVER_IDLE_TIMEOUT,
+    DRIVER_ACQUIRE_TIMEOUT,
+    LEAN_BROWSER_PROFILE,
+    BLOCKED_URL_PATTERNS,
+)
+
+
+def create_chrome_driver(lean: bool = LEAN_BROWSER_PROFILE):
+    """
+    建立 headless Chrome（池中每個瀏覽器都由此建立）
+
+    Args:
+        lean: 精簡模式，不載入圖片、字型與追蹤腳本；只影響下載，DOM 中的圖片網址不變
+    """
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    if lean:
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--disable-background-networking')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2,
+        })
+
+    driver = webdriver.Chrome(options=options)
+
+    # 添加 User-Agent
+    driver.execute_cdp_cmd('Network.setUserAgentOverride', {
+        "userAgent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    })
+
+    if lean:
+        # 在網路層直接攔截不需要的資源
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+    return driver
+
+
+class DriverPoolError(RuntimeError):
+    """無法取得瀏覽器（池已關閉、等待逾時或建立失敗），屬於本機資源問題而非網站異常"""
+
+
+class PooledDriver:
+    """池中的瀏覽器與其使用紀錄"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.time()
+        self.last_used = self.created_at
+
+
+class DriverPool:
+    """有上限、執行緒安全的瀏覽器池"""
+
+    def __init__(self,
+                 max_size: int = DRIVER_POOL_SIZE,
+                 max_pages: int = DRIVER_MAX_PAGES,
+                 idle_timeout: float = DRIVER_IDLE_TIMEOUT,
+                 driver_factory: Optional[Callable] = None):
+        self.max_size = max(1, max_size)
+        self.max_pages = max_pages
+        self.idle_timeout = idle_timeout
+        self.driver_factory = driver_factory or create_chrome_driver
+
+        self._idle: List[PooledDriver] = []
+        self._total = 0  # 已建立（含借出中）的瀏覽器數
+        self._cond = threading.Condition()
+        self._closed = False
+        self._reaper = None
+
+    # ---------- 借出 / 歸還 ----------
+
+    def acquire(self, timeout: float = DRIVER_ACQUIRE_TIMEOUT) -> PooledDriver:
+        """借出一個健康的瀏覽器，必要時建立新的"""
+        deadline = time.time() + timeout
+
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise DriverPoolError("瀏覽器池已關閉")
+
+                pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    if self._total < self.max_size:
+                        self._total += 1  # 先佔位，建立瀏覽器時不持有鎖
+                    else:
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            raise DriverPoolError("等待可用瀏覽器逾時")
+                        self._cond.wait(remaining)
+                        continue
+
+            if pooled is not None:
+                if self._is_healthy(pooled.driver):
+                    return pooled
+                print("⚠️  瀏覽器已失效，重新建立...")
+                self._discard(pooled)
+                continue
+
+            try:
+                self._ensure_reaper()
+                return PooledDriver(self.driver_factory())
+            except Exception as e:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise DriverPoolError(f"無法建立瀏覽器: {e}") from e
+
+    def release(self, pooled: PooledDriver, discard: bool = False):
+        """歸還瀏覽器；出錯或達到頁數上限時直接回收"""
+        pooled.pages += 1
+        pooled.last_used = time.time()
+
+        if discard or self._closed or pooled.pages >= self.max_pages:
+            self._discard(pooled)
+            return
+
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def borrow(self):
+        """
+        以 with 語法借用瀏覽器，離開區塊自動歸還
+
+        區塊內拋出例外（如頁面逾時、渲染程序無回應）時直接回收該瀏覽器，
+        不放回池中，避免下次借出時健康檢查卡到指令逾時
+        """
+        pooled = self.acquire()
+        try:
+            yield pooled.driver
+        except BaseException:
+            self.release(pooled, discard=True)
+            raise
+        self.release(pooled)
+
+    # ---------- 維護 ----------
+
+    @staticmethod
+    def _is_healthy(driver) -> bool:
+        """健康檢查：瀏覽器仍能回應指令"""
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, pooled: PooledDriver):
+        """關閉瀏覽器並釋放名額"""
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def evict_idle(self):
+        """關閉閒置過久的瀏覽器"""
+        now = time.time()
+        with self._cond:
+            expired = [p for p in self._idle if now - p.last_used > self.idle_timeout]
+            self._idle = [p for p in self._idle if p not in expired]
+        for pooled in expired:
+            self._discard(pooled)
+        if expired:
+            print(f"🧹 已關閉 {len(expired)} 個閒置瀏覽器")
+
+    def _ensure_reaper(self):
+        """啟動背景執行緒定期清理閒置瀏覽器"""
+        with self._cond:
+            if self._reaper is not None or self.idle_timeout <= 0:
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, name="driver-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        interval = max(1.0, self.idle_timeout / 2)
+        while not self._closed:
+            time.sleep(interval)
+            self.evict_idle()
+
+    def shutdown(self):
+        """關閉池中所有瀏覽器"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def stats(self) -> dict:
+        """目前池狀態"""
+        with self._cond:
+            return {
+                'total': self._total,
+                'idle': len(self._idle),
+                'in_use': self._total - len(self._idle),
+                'max_size': self.max_size,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool() -> DriverPool:
+    """取得全域共用的瀏覽器池"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.shutdown)
+        return _pool
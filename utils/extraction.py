@@ -0,0 +1,345 @@
+"""
+商品欄位擷取引擎 - 將各欄位的選擇器編譯成擷取計畫，只走訪 DOM 一次
+"""
+import re
+from typing import Callable, Dict, List, Optional
+
+from bs4.element import Tag
+
+
+# ========== 欄位選擇器（依優先順序） ==========
+
+# 通用選擇器：各網站專用選擇器都找不到時的備用
+GENERIC_NAME_SELECTORS = ['h1', '.product-title', '[data-name]', '.title', 'h2']
+GENERIC_PRICE_SELECTORS = [
+    '.price', '[data-price]', '.product-price', '.sale-price',
+    '.final-price', '.current-price', '.priceText',
+]
+GENERIC_RATING_SELECTORS = ['.rating', '[data-rating]', '.star', '.score', '.rate']
+
+NAME_SELECTORS = [
+    # Momo 特定選擇器
+    'h1.title',
+    'h1[class*="title"]',
+    'div.goods-name',
+    'span.goods-title',
+    'div[data-testid*="name"]',
+    # 通用選擇器
+    *GENERIC_NAME_SELECTORS,
+]
+
+PRICE_SELECTORS = [
+    # Momo 特定邏輯：優先使用促銷價（紅色），否則使用市售價（刪除線）
+    'span.seoPrice',
+    'del.seoPrice',
+    # 備用選擇器（其他平台或結構）
+    'span.money',                      # Momo 主要價格
+    'p.current-price span.money',      # Momo 完整路徑
+    'span[class*="money"]',            # Momo 模糊匹配
+    'div.goods-price',
+    'strong.price',
+    'em.price',
+    'span[class*="salesprice"]',
+    'span[class*="sale-price"]',
+    # 通用選擇器（備用）
+    *GENERIC_PRICE_SELECTORS,
+]
+
+RATING_SELECTORS = [
+    # Momo 特定選擇器
+    'span.rating-score',
+    'div[class*="rating"]',
+    'span[class*="score"]',
+    'div.star-score',
+    'span[class*="mrate"]',        # Momo 評分
+    'div[data-testid*="rating"]',
+    # 通用選擇器
+    *GENERIC_RATING_SELECTORS,
+]
+
+BREADCRUMB_SELECTORS = ['.breadcrumb, .breadcrumbs']
+
+MAX_REVIEWS = 5
+SPEC_CONTAINER_KEYWORDS = ['spec', 'attribute', 'property', 'info', 'detail', '規格']
+SPEC_DIV_KEYWORDS = ['spec', 'detail', 'property', 'info']
+
+
+# ========== 簡易選擇器編譯 ==========
+
+_COMPOUND_RE = re.compile(
+    r'(?P<tag>[a-zA-Z][\w-]*)|'
+    r'\.(?P<cls>[\w-]+)|'
+    r'\[(?P<attr>[\w-]+)(?:(?P<op>[*^$]?=)"(?P<val>[^"]*)")?\]'
+)
+
+
+class _Compound:
+    """單一複合選擇器，例如 span.money 或 div[class*="rating"]"""
+
+    def __init__(self, text: str):
+        self.tag = None
+        self.classes = []
+        self.attrs = []  # (name, op, value)
+
+        pos = 0
+        for m in _COMPOUND_RE.finditer(text):
+            if m.start() != pos:
+                raise ValueError(f"不支援的選擇器: {text}")
+            pos = m.end()
+            if m.group('tag'):
+                self.tag = m.group('tag').lower()
+            elif m.group('cls'):
+                self.classes.append(m.group('cls'))
+            else:
+                self.attrs.append((m.group('attr'), m.group('op'), m.group('val')))
+        if pos != len(text):
+            raise ValueError(f"不支援的選擇器: {text}")
+
+    def matches(self, tag: Tag) -> bool:
+        if self.tag and tag.name != self.tag:
+            return False
+        if self.classes:
+            tag_classes = tag.get('class') or []
+            if not all(c in tag_classes for c in self.classes):
+                return False
+        for name, op, value in self.attrs:
+            actual = tag.get(name)
+            if actual is None:
+                return False
+            if op is None:
+                continue
+            if isinstance(actual, list):
+                actual = ' '.join(actual)
+            if op == '=' and actual != value:
+                return False
+            if op == '*=' and (not value or value not in actual):
+                return False
+            if op == '^=' and (not value or not actual.startswith(value)):
+                return False
+            if op == '$=' and (not value or not actual.endswith(value)):
+                return False
+        return True
+
+
+class CompiledSelector:
+    """
+    編譯後的 CSS 選擇器（支援標籤、class、屬性條件、後代組合與逗號分隔）
+
+    與 soup.select_one 語意相同，但可對單一標籤判斷是否符合，供單次走訪使用
+    """
+
+    def __init__(self, selector: str):
+        self.selector = selector
+        self.alternatives = [
+            [_Compound(part) for part in alternative.split()]
+            for alternative in selector.split(',')
+        ]
+        # 所有分支都指定標籤名稱時，只需檢查該名稱的標籤
+        tags = {chain[-1].tag for chain in self.alternatives}
+        self.tag_names = None if None in tags else tags
+
+    def matches(self, tag: Tag) -> bool:
+        for chain in self.alternatives:
+            if not chain[-1].matches(tag):
+                continue
+            # 後代組合：由近到遠依序在祖先中尋找
+            ancestor = tag.parent
+            ok = True
+            for compound in reversed(chain[:-1]):
+                while ancestor is not None and not (isinstance(ancestor, Tag) and compound.matches(ancestor)):
+                    ancestor = ancestor.parent
+                if ancestor is None:
+                    ok = False
+                    break
+                ancestor = ancestor.parent
+            if ok:
+                return True
+        return False
+
+
+# ========== 欄位值驗證 ==========
+
+def parse_price(elem: Tag) -> Optional[float]:
+    """從價格元素取得數值，無效時回傳 None"""
+    # 嘗試從 data 屬性中獲取
+    if elem.get('data-price'):
+        try:
+            return float(elem.get('data-price'))
+        except (TypeError, ValueError):
+            pass
+
+    # 從文本內容中提取
+    text = elem.get_text(strip=True)
+    if not text:
+        return None
+
+    # 移除非數字字元（保留小數點和逗號），再移除千位分隔符
+    price_str = ''.join(c for c in text if c.isdigit() or c in '.,').replace(',', '')
+
+    # 移除多個小數點，只保留最後一個
+    if price_str.count('.') > 1:
+        parts = price_str.split('.')
+        price_str = '.'.join([parts[0], parts[-1]])
+
+    if price_str and price_str != '.':
+        try:
+            price = float(price_str)
+            if price > 0:  # 確保價格有效
+                return price
+        except ValueError:
+            pass
+    return None
+
+
+def parse_name(elem: Tag) -> Optional[str]:
+    name = elem.get_text(strip=True)
+    if name and len(name) > 3:  # 確保不是太短的文本
+        return name
+    return None
+
+
+def parse_rating(elem: Tag) -> Optional[float]:
+    text = elem.get_text(strip=True)
+    # 提取數字部分
+    rating_str = ''.join(c for c in text if c.isdigit() or c == '.')
+    if not rating_str:
+        return None
+    try:
+        rating = float(rating_str)
+    except ValueError:
+        return None
+    if 0 <= rating <= 5.0:  # 確保評分在有效範圍
+        return rating
+    return None
+
+
+# ========== 擷取計畫 ==========
+
+class FieldPlan:
+    """單一欄位：依優先順序的選擇器、值解析函式與預設值"""
+
+    def __init__(self, name: str, selectors: List[str], parse: Callable, default):
+        self.name = name
+        self.selectors = [CompiledSelector(s) for s in selectors]
+        self.parse = parse
+        self.default = default
+
+
+def _class_text(tag: Tag) -> str:
+    classes = tag.get('class')
+    if not classes:
+        return ''
+    return ' '.join(classes).lower() if isinstance(classes, list) else str(classes).lower()
+
+
+class ExtractionResult:
+    """單次走訪後的結果：各欄位值與規格、評論相關的區塊"""
+
+    def __init__(self):
+        self.values: Dict[str, object] = {}
+        self.reviews: List[str] = []
+        self.spec_containers: List[Tag] = []  # class 含規格關鍵字的 dl/table/div
+        self.spec_divs: List[Tag] = []        # class 含規格關鍵字的 div（備用）
+        self.tables: List[Tag] = []
+        self.dls: List[Tag] = []
+        self.first_matches: Dict[str, Tag] = {}
+
+
+class ExtractionPlan:
+    """把所有欄位的選擇器編成一份計畫，對 DOM 只走訪一次"""
+
+    def __init__(self, fields: List[FieldPlan]):
+        self.fields = fields
+        self._by_tag: Dict[str, List[CompiledSelector]] = {}
+        self._any_tag: List[CompiledSelector] = []
+        seen = set()
+        for field in fields:
+            for selector in field.selectors:
+                if selector.selector in seen:
+                    continue
+                seen.add(selector.selector)
+                if selector.tag_names is None:
+                    self._any_tag.append(selector)
+                else:
+                    for name in selector.tag_names:
+                        self._by_tag.setdefault(name, []).append(selector)
+
+    def run(self, soup) -> ExtractionResult:
+        result = ExtractionResult()
+        first = result.first_matches
+        review_elements = []
+
+        for tag in soup.descendants:
+            if not isinstance(tag, Tag):
+                continue
+            name = tag.name
+
+            # 每個選擇器只需記錄文件順序中的第一個符合元素（等同 select_one）
+            for selector in self._by_tag.get(name, ()):
+                if selector.selector not in first and selector.matches(tag):
+                    first[selector.selector] = tag
+            if tag.attrs:  # 未指定標籤名稱的選擇器都需要 class 或屬性
+                for selector in self._any_tag:
+                    if selector.selector not in first and selector.matches(tag):
+                        first[selector.selector] = tag
+
+            # 規格與評論區塊
+            if name == 'table':
+                result.tables.append(tag)
+            elif name == 'dl':
+                result.dls.append(tag)
+            if name in ('dl', 'table', 'div', 'li'):
+                class_text = _class_text(tag)
+                if not class_text:
+                    continue
+                if name != 'li' and any(kw in class_text for kw in SPEC_CONTAINER_KEYWORDS):
+                    result.spec_containers.append(tag)
+                if name == 'div' and any(kw in class_text for kw in SPEC_DIV_KEYWORDS):
+                    result.spec_divs.append(tag)
+                if name in ('div', 'li') and 'review' in class_text and len(review_elements) < MAX_REVIEWS:
+                    review_elements.append(tag)
+
+        # 依優先順序取第一個有效值
+        for field in self.fields:
+            value = field.default
+            for selector in field.selectors:
+                elem = first.get(selector.selector)
+                if elem is None:
+                    continue
+                parsed = field.parse(elem)
+                if parsed is not None:
+                    value = parsed
+                    break
+            result.values[field.name] = value
+
+        for elem in review_elements:
+            review_text = elem.get_text(strip=True)
+            if review_text:
+                result.reviews.append(review_text)
+        return result
+
+
+def _breadcrumb_category(elem: Tag) -> Optional[str]:
+    items = elem.find_all(['li', 'a'])
+    if len(items) >= 2:
+        return items[-2].get_text(strip=True)
+    return None
+
+
+def build_product_plan(name_selectors: List[str], price_selectors: List[str],
+                       rating_selectors: List[str]) -> ExtractionPlan:
+    """依各欄位的選擇器建立商品擷取計畫（類別固定使用麵包屑）"""
+    return ExtractionPlan([
+        FieldPlan('name', name_selectors, parse_name, "未知商品"),
+        FieldPlan('price', price_selectors, parse_price, 0),
+        FieldPlan('rating', rating_selectors, parse_rating, 0),
+        FieldPlan('category', BREADCRUMB_SELECTORS, _breadcrumb_category, None),
+    ])
+
+
+PRODUCT_PLAN = build_product_plan(NAME_SELECTORS, PRICE_SELECTORS, RATING_SELECTORS)
+
+
+def extract_fields(soup, plan: ExtractionPlan = PRODUCT_PLAN) -> ExtractionResult:
+    """對 soup 執行擷取計畫（單次走訪）"""
+    return plan.run(soup)
@@ -0,0 +1,72 @@
+"""
+HTML 解析模組 - lxml 後端 + SoupStrainer 局部解析
+"""
+from bs4 import BeautifulSoup, SoupStrainer
+
+from config.settings import FAST_PARSE
+
+try:
+    import lxml  # noqa: F401
+    FAST_PARSER = 'lxml'
+except ImportError:
+    FAST_PARSER = 'html.parser'
+
+# 整個子樹都會保留的標籤（img 供規格圖片搜尋的最後備用方案使用）
+REGION_TAGS = {'title', 'h1', 'h2', 'dl', 'table', 'meta', 'img'}
+
+# class / id 含有這些字的標籤視為商品相關區塊
+# 新增網站轉接器的選擇器時，其 class / id 須包含其中之一（tests/test_html_parser.py 會檢查）
+REGION_KEYWORDS = (
+    'title', 'name', 'price', 'money', 'spec', 'attribute', 'property',
+    'info', 'detail', 'review', 'rating', 'score', 'star', 'rate',
+    'breadcrumb', 'goods', 'product', '規格',
+    'nickcontainer',  # PChome 商品名稱
+)
+
+# 帶有這些屬性的標籤直接保留
+REGION_ATTRS = ('data-price', 'data-name', 'data-rating', 'data-testid', 'data-specs')
+
+
+def _attr_text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return ' '.join(value)
+    return value or ''
+
+
+def is_product_region(name, attrs=None) -> bool:
+    """判斷標籤是否屬於商品資訊區塊"""
+    if name in REGION_TAGS:
+        return True
+    if not attrs:
+        return False
+    attrs = dict(attrs)
+
+    if any(attr in attrs for attr in REGION_ATTRS):
+        return True
+    marker = (_attr_text(attrs.get('class')) + ' ' + _attr_text(attrs.get('id'))).lower()
+    return any(keyword in marker for keyword in REGION_KEYWORDS)
+
+
+if hasattr(SoupStrainer, 'allow_tag_creation'):
+    # beautifulsoup4 >= 4.13：建立標籤前以名稱與屬性判斷
+    class _ProductRegionStrainer(SoupStrainer):
+        def allow_tag_creation(self, nsprefix, name, attrs):
+            return is_product_region(name, attrs)
+
+    PRODUCT_STRAINER = _ProductRegionStrainer()
+else:
+    # 舊版會以 (name, attrs) 呼叫函式
+    PRODUCT_STRAINER = SoupStrainer(is_product_region)
+
+
+def make_soup(html, fast: bool = FAST_PARSE) -> BeautifulSoup:
+    """
+    建立 BeautifulSoup
+
+    Args:
+        html: HTML 字串或位元組
+        fast: 快速模式（lxml + 只解析商品相關區塊）；False 時與原本一樣完整解析
+    """
+    if fast:
+        return BeautifulSoup(html, FAST_PARSER, parse_only=PRODUCT_STRAINER)
+    return BeautifulSoup(html, 'html.parser')
@@ -0,0 +1,62 @@
+"""
+HTTP 連線模組 - 共用 Session（連線池、壓縮、重試）
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.settings import (
+    HEADERS,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_FACTOR,
+    HTTP_RETRY_STATUS,
+)
+
+# 有安裝 brotli 才宣告支援 br 壓縮（urllib3 會自動解壓）
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+
+def create_session() -> requests.Session:
+    """建立具備連線池與重試機制的 Session"""
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=HTTP_RETRY_STATUS,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        # 帶 Retry-After 的 429/503 不在連線層等待重試，立即交由斷路器退避
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(HEADERS)
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """取得全域共用的 Session（同一主機的連線會被重複使用）"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
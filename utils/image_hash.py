@@ -0,0 +1,138 @@
+"""
+感知雜湊模組 - 以 aHash / dHash 找出近乎相同的圖像（不同 CDN 路徑、尺寸或壓縮率的同一張規格圖）
+
+以白底文字為主的規格圖在低解析度下雜湊幾乎相同，因此雜湊相近只作為候選，
+還需長寬比相同且縮圖逐區塊的亮度差異都在門檻內才視為同一張圖。
+僅相差一兩個字（如同版型不同重量）的圖像仍可能無法區分，可用 PHASH_DEDUP_ENABLED 關閉
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from io import BytesIO
+from typing import Optional, Tuple
+
+from PIL import Image, ImageChops
+
+from config.settings import PHASH_SIZE, PHASH_MAX_DISTANCE, PHASH_MAX_BLOCK_DIFF, PHASH_INDEX_SIZE
+from utils.image_preprocess import flatten_alpha
+
+THUMB_SIZE = 128      # 逐區塊比對用的灰階縮圖邊長
+THUMB_BLOCK = 8       # 區塊邊長
+ASPECT_TOLERANCE = 0.03
+
+
+def average_hash(image: Image.Image, size: int = PHASH_SIZE) -> int:
+    """aHash：縮成 size x size 灰階，每個像素與平均亮度比較"""
+    pixels = list(image.convert('L').resize((size, size), Image.LANCZOS).getdata())
+    avg = sum(pixels) / len(pixels)
+    bits = 0
+    for pixel in pixels:
+        bits = (bits << 1) | (pixel > avg)
+    return bits
+
+
+def difference_hash(image: Image.Image, size: int = PHASH_SIZE) -> int:
+    """dHash：縮成 (size + 1) x size 灰階，比較水平相鄰像素的亮度變化"""
+    gray = image.convert('L').resize((size + 1, size), Image.LANCZOS)
+    pixels = list(gray.getdata())
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+class ImageFingerprint:
+    """一張圖像的比對資料：感知雜湊、長寬比與灰階縮圖"""
+
+    __slots__ = ('ahash', 'dhash', 'aspect', 'thumb')
+
+    def __init__(self, image: Image.Image):
+        self.aspect = image.width / image.height
+        gray = flatten_alpha(image).convert('L')
+        self.ahash = average_hash(gray)
+        self.dhash = difference_hash(gray)
+        self.thumb = gray.resize((THUMB_SIZE, THUMB_SIZE), Image.BILINEAR)
+
+    def max_block_diff(self, other: 'ImageFingerprint') -> float:
+        """兩張縮圖各區塊平均亮度差的最大值（0–255），局部文字不同時會明顯升高"""
+        diff = ImageChops.difference(self.thumb, other.thumb).reduce(THUMB_BLOCK)
+        return max(diff.getdata())
+
+
+def fingerprint(image_data: bytes) -> Optional[ImageFingerprint]:
+    """計算圖像的比對資料，無法解碼時回傳 None"""
+    try:
+        with Image.open(BytesIO(image_data)) as image:
+            image.draft('L', (THUMB_SIZE * 2, THUMB_SIZE * 2))  # JPEG 直接以較低解析度解碼
+            return ImageFingerprint(image)
+    except Exception:
+        return None
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def is_near_duplicate(a: ImageFingerprint, b: ImageFingerprint, max_distance: int = PHASH_MAX_DISTANCE,
+                      max_block_diff: float = PHASH_MAX_BLOCK_DIFF) -> bool:
+    """雜湊相近、長寬比相同且縮圖各區塊差異都在門檻內"""
+    if abs(a.aspect - b.aspect) > ASPECT_TOLERANCE * max(a.aspect, b.aspect):
+        return False
+    if hamming_distance(a.ahash, b.ahash) > max_distance or hamming_distance(a.dhash, b.dhash) > max_distance:
+        return False
+    return a.max_block_diff(b) <= max_block_diff
+
+
+class PerceptualIndex:
+    """
+    近期識別過的圖像，跨商品共用識別結果
+
+    第一個遇到某張圖像的呼叫取得識別權，之後近乎相同的圖像等待並共用其結果
+    """
+
+    def __init__(self, max_distance: int = PHASH_MAX_DISTANCE, max_entries: int = PHASH_INDEX_SIZE):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[ImageFingerprint, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, image: ImageFingerprint) -> Tuple[Future, bool]:
+        """
+        查詢近乎相同的圖像
+
+        Returns:
+            tuple: (結果 Future, 是否由呼叫者負責識別並呼叫 resolve)
+        """
+        with self._lock:
+            for known, future in self._entries.items():
+                if is_near_duplicate(known, image, self.max_distance):
+                    self._entries.move_to_end(known)
+                    return future, False
+            future = Future()
+            self._entries[image] = future
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return future, True
+
+    def resolve(self, image: ImageFingerprint, future: Future, specs):
+        """公布識別結果；沒有結果（識別失敗）時移除，讓之後的相同圖像重新識別"""
+        if not specs:
+            with self._lock:
+                if self._entries.get(image) is future:
+                    del self._entries[image]
+        future.set_result(specs)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_perceptual_index() -> PerceptualIndex:
+    """取得全域共用的感知雜湊索引（同一批次的不同商品共用）"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = PerceptualIndex()
+        return _index
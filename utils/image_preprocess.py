@@ -0,0 +1,145 @@
+"""
+圖像前處理模組 - 規格圖送出 Vision 前先裁切文字區域、縮小並轉為灰階 JPEG，減少上傳量與識別延遲；
+本機 OCR 前則裁切、放大並二值化
+
+直接傳入 PIL 圖像時，Gemini SDK 會以無損 WebP 編碼整張原圖；這裡改為傳入處理後的 JPEG 位元組
+"""
+from io import BytesIO
+from typing import Optional, Tuple
+
+from PIL import Image, ImageOps, ImageStat
+
+from config.settings import VISION_MAX_SIDE, VISION_JPEG_QUALITY, VISION_GRAYSCALE, VISION_TEXT_CROP
+
+try:
+    import cv2
+    import numpy as np
+    OPENCV_AVAILABLE = True
+except ImportError:
+    OPENCV_AVAILABLE = False
+    print("⚠️  OpenCV 未安裝，規格圖像將不裁切文字區域")
+
+DETECT_SIDE = 1000        # 文字區域偵測時的縮圖長邊
+CROP_PADDING = 0.02       # 裁切範圍外擴比例
+MIN_CROP_GAIN = 0.15      # 裁切後至少減少 15% 面積才裁切
+OCR_MIN_WIDTH = 1600      # OCR 前放大至此寬度，小字才辨識得出來
+OCR_MAX_SIDE = 4000
+
+
+def flatten_alpha(image: Image.Image) -> Image.Image:
+    """
+    將透明背景合成到白底（RGB）；沒有透明度的圖像原樣回傳
+
+    透明 PNG 直接轉灰階時透明區域會變成黑色，黑字就看不見了
+    """
+    if image.mode not in ('RGBA', 'LA', 'PA') and not (image.mode == 'P' and 'transparency' in image.info):
+        return image
+    rgba = image.convert('RGBA')
+    background = Image.new('RGB', rgba.size, (255, 255, 255))
+    background.paste(rgba, mask=rgba.getchannel('A'))
+    return background
+
+
+def text_region(image: Image.Image) -> Optional[Tuple[int, int, int, int]]:
+    """
+    以形態學梯度找出文字密集區域，回傳涵蓋所有文字區塊的 (left, top, right, bottom)
+
+    找不到文字或裁切效益不大時回傳 None
+    """
+    if not OPENCV_AVAILABLE:
+        return None
+
+    gray = np.asarray(image.convert('L'))
+    height, width = gray.shape
+    scale = min(1.0, DETECT_SIDE / max(height, width))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else gray
+
+    # 文字筆畫邊緣梯度高，水平閉運算把同一行的字連成區塊
+    gradient = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    connected = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1)))
+    contours, _ = cv2.findContours(connected, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if w < 8 or h < 6:
+            continue
+        # 文字行內筆畫邊緣密度高；大片照片或色塊的邊框密度低
+        if cv2.countNonZero(binary[y:y + h, x:x + w]) / float(w * h) < 0.2:
+            continue
+        boxes.append((x, y, x + w, y + h))
+    if not boxes:
+        return None
+
+    pad_x, pad_y = CROP_PADDING * small.shape[1], CROP_PADDING * small.shape[0]
+    left = max(0, int((min(b[0] for b in boxes) - pad_x) / scale))
+    top = max(0, int((min(b[1] for b in boxes) - pad_y) / scale))
+    right = min(width, int((max(b[2] for b in boxes) + pad_x) / scale) + 1)
+    bottom = min(height, int((max(b[3] for b in boxes) + pad_y) / scale) + 1)
+
+    if (right - left) * (bottom - top) > (1 - MIN_CROP_GAIN) * width * height:
+        return None
+    return left, top, right, bottom
+
+
+def prepare_for_vision(image_data: bytes, max_side: int = VISION_MAX_SIDE, quality: int = VISION_JPEG_QUALITY,
+                       grayscale: bool = VISION_GRAYSCALE, crop: bool = VISION_TEXT_CROP) -> bytes:
+    """
+    規格圖前處理：透明背景補白 → 裁切文字區域 → 長邊縮至 max_side 以內 → 灰階 → JPEG
+
+    Returns:
+        bytes: JPEG 圖像
+    """
+    with Image.open(BytesIO(image_data)) as source:
+        image = flatten_alpha(source).convert('L' if grayscale else 'RGB')
+
+    original_size = image.size
+    box = text_region(image) if crop else None
+    if box:
+        image = image.crop(box)
+
+    if max(image.size) > max_side:
+        ratio = max_side / max(image.size)
+        image = image.resize((max(1, round(image.width * ratio)), max(1, round(image.height * ratio))),
+                             Image.LANCZOS)
+
+    output = BytesIO()
+    image.save(output, format='JPEG', quality=quality, optimize=True)
+    data = output.getvalue()
+    print(f"🗜️  圖像前處理: {original_size[0]}x{original_size[1]} → {image.width}x{image.height}"
+          f"{'（裁切文字區域）' if box else ''}，{len(image_data) / 1024:.0f}KB → {len(data) / 1024:.0f}KB")
+    return data
+
+
+def prepare_for_ocr(image_data: bytes) -> Image.Image:
+    """
+    OCR 前處理：透明背景補白 → 灰階 → 裁切文字區域 → 放大小圖 → 二值化（Otsu）
+
+    Returns:
+        Image.Image: 黑字白底的二值圖
+    """
+    with Image.open(BytesIO(image_data)) as source:
+        image = flatten_alpha(source).convert('L')
+
+    box = text_region(image)
+    if box:
+        image = image.crop(box)
+
+    ratio = min(OCR_MIN_WIDTH / image.width, OCR_MAX_SIDE / max(image.size))
+    if ratio > 1:
+        image = image.resize((round(image.width * ratio), round(image.height * ratio)), Image.LANCZOS)
+
+    if OPENCV_AVAILABLE:
+        gray = cv2.GaussianBlur(np.asarray(image), (3, 3), 0)
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        image = Image.fromarray(binary)
+    else:
+        image = ImageOps.autocontrast(image)
+        threshold = ImageStat.Stat(image).mean[0]
+        image = image.point(lambda p: 255 if p > threshold else 0)
+
+    # 深色底淺色字的橫幅反轉為黑字白底
+    if ImageStat.Stat(image).mean[0] < 128:
+        image = ImageOps.invert(image)
+    return image
@@ -1,32 +1,142 @@
 """
-圖像識別模組 - 使用 Gemini Vision API 識別商品規格圖像
+圖像識別模組 - 識別商品規格圖像：先以本機 Tesseract OCR 辨識，結果不佳時才使用 Gemini Vision API
 """
 import base64
-import requests
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from PIL import Image
 from typing import Dict, List, Optional
 import google.generativeai as genai
-from config.settings import GEMINI_API_KEY
-import time
+from config.settings import (
+    GEMINI_API_KEY,
+    IMAGE_DOWNLOAD_TIMEOUT,
+    IMAGE_DOWNLOAD_WORKERS,
+    LOCAL_OCR_ENABLED,
+    OCR_LANG,
+    OCR_MIN_CONFIDENCE,
+    OCR_MIN_SPECS,
+    PHASH_DEDUP_ENABLED,
+    VISION_MAX_CONCURRENCY,
+    VISION_PREPROCESS,
+    VISION_RATE_LIMIT,
+)
+from utils.http_session import get_session
+from utils.image_hash import fingerprint, get_perceptual_index, is_near_duplicate
+from utils.image_preprocess import prepare_for_ocr, prepare_for_vision
+from utils.rate_limiter import TokenBucket
+from utils.single_flight import get_single_flight
+from utils.vision_cache import get_vision_cache, image_digest
+
+# 本機 OCR：需安裝 Tesseract 執行檔與 OCR_LANG 指定的語言資料（首次使用時才檢查）
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+_ocr_available = None
+_ocr_lock = threading.Lock()
+
+
+def local_ocr_available() -> bool:
+    """檢查本機 OCR 是否可用（只檢查一次，結果共用）"""
+    global _ocr_available
+    with _ocr_lock:
+        if _ocr_available is None:
+            try:
+                if pytesseract is None:
+                    raise RuntimeError("pytesseract 未安裝")
+                missing = set(OCR_LANG.split('+')) - set(pytesseract.get_languages(config=''))
+                if missing:
+                    raise RuntimeError(f"缺少語言資料 {', '.join(sorted(missing))}")
+                _ocr_available = True
+            except Exception as e:
+                _ocr_available = False
+                print(f"⚠️  本機 OCR 無法使用，規格圖像一律使用 Gemini Vision ({e})")
+        return _ocr_available
+
+# OCR 將中文逐字以空白分隔，合併相鄰中文字之間的空白
+_CJK_SPACE_PATTERN = re.compile(r'(?<=[\u3000-\u9fff\uff00-\uffef])\s+(?=[\u3000-\u9fff\uff00-\uffef])')
+
+
+class VisionThrottle:
+    """Vision API 呼叫節流：速率（Token Bucket）加上同時呼叫數上限，所有商品共用"""
+
+    def __init__(self, rate_limit=VISION_RATE_LIMIT, max_concurrency: int = VISION_MAX_CONCURRENCY):
+        rate, capacity = rate_limit
+        self.bucket = TokenBucket(rate, capacity)
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrency))
+
+    def __enter__(self):
+        self._slots.acquire()
+        try:
+            self.bucket.acquire()
+        except BaseException:
+            self._slots.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+        return False
+
+
+_throttle = None
+_throttle_lock = threading.Lock()
+
+
+def get_vision_throttle() -> VisionThrottle:
+    """取得全域共用的 Vision 節流器"""
+    global _throttle
+    with _throttle_lock:
+        if _throttle is None:
+            _throttle = VisionThrottle()
+        return _throttle
+
+
+# 規格識別提示詞；修改提示詞或圖像前處理時需一併更新版本，使舊的識別結果快取失效
+SPEC_PROMPT_VERSION = "specs-3"
+SPEC_PROMPT = """你是商品規格識別專家。請分析這張圖像中的商品規格信息。
+
+**請務必提取以下信息（如果圖像中有的話）：**
+1. 材質/材料
+2. 尺寸/大小/長寬高
+3. 重量
+4. 顏色
+5. 功能/特性
+6. 型號
+7. 保修/保固期限
+8. 電源/電池
+9. 規格/參數
+10. 其他重要規格
+
+**返回格式要求：**
+- 每行一個規格，格式為「規格名稱: 規格值」
+- 只返回規格信息，不需要其他說明
+- 盡可能詳細準確"""
 
 
 class ImageRecognizer:
-    """圖像識別器 - 使用 Gemini Vision 識別規格圖像"""
+    """圖像識別器 - 本機 OCR 優先，信心不足時使用 Gemini Vision 識別規格圖像"""
     
-    def __init__(self):
+    def __init__(self, model_name: str = 'gemini-1.5-flash', local_ocr: bool = LOCAL_OCR_ENABLED):
         if GEMINI_API_KEY:
             genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self.local_ocr = local_ocr and local_ocr_available()
+
+    @property
+    def cache_model(self) -> str:
+        """識別結果快取的模型鍵值（啟用本機 OCR 時結果可能來自 OCR，與純 Vision 分開快取）"""
+        return f"tesseract-{OCR_LANG}+{self.model_name}" if self.local_ocr else self.model_name
     
     @staticmethod
     def download_image(url: str) -> Optional[bytes]:
         """下載圖像為位元組"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, timeout=15, headers=headers)
+            response = get_session().get(url, timeout=IMAGE_DOWNLOAD_TIMEOUT)
             if response.status_code == 200:
                 print(f"✅ 圖像下載成功: {url[:60]}...")
                 return response.content
@@ -37,47 +147,114 @@ class ImageRecognizer:
         return None
     
     def extract_specs_from_image_url(self, image_url: str) -> Dict[str, str]:
-        """從圖像 URL 中提取規格資訊"""
+        """從圖像 URL 中提取規格資訊（網址已識別過時不重新下載）"""
+        specs = get_vision_cache().get_by_url(image_url, self.cache_model, SPEC_PROMPT_VERSION)
+        if specs is not None:
+            print(f"💾 使用快取的圖像識別結果: {image_url[:60]}...")
+            return specs
+
+        image_data = self.download_image(image_url)
+        if not image_data:
+            return {}
+        return self.extract_specs_from_image_data(image_data, image_url)
+
+    def extract_specs_from_image_data(self, image_data: bytes, image_url: str = None) -> Dict[str, str]:
+        """
+        從已下載的圖像中提取規格資訊（受全域 Vision 節流限制）
+
+        相同內容的圖像（如不同網址的同一張規格圖）沿用快取結果，同時進行中的相同圖像只呼叫一次 Vision
+        """
+        cache = get_vision_cache()
+        digest = image_digest(image_data)
+        specs = cache.get(digest, self.cache_model, SPEC_PROMPT_VERSION, image_url)
+        if specs is not None:
+            print(f"💾 使用快取的圖像識別結果（相同圖像內容）")
+            return specs
+
+        key = ('vision', digest, self.cache_model, SPEC_PROMPT_VERSION)
+        specs, shared = get_single_flight().do(key, lambda: self._recognize(image_data, digest, image_url))
+        if shared and image_url:
+            # 記錄此網址對應的圖像內容，下次可略過下載
+            cache.get(digest, self.cache_model, SPEC_PROMPT_VERSION, image_url)
+        return specs
+
+    @staticmethod
+    def _vision_payload(image_data: bytes):
+        """送給 Gemini 的圖像：前處理後的 JPEG；前處理失敗時退回原圖"""
+        if VISION_PREPROCESS:
+            try:
+                return {'mime_type': 'image/jpeg', 'data': prepare_for_vision(image_data)}
+            except Exception as e:
+                print(f"⚠️  圖像前處理失敗，改送原圖: {e}")
+        return Image.open(BytesIO(image_data))
+
+    def extract_specs_with_ocr(self, image_data: bytes) -> Optional[Dict[str, str]]:
+        """
+        以本機 Tesseract OCR 識別規格（二值化後辨識，逐行以「規格名稱: 值」解析）
+
+        Returns:
+            dict: 規格；OCR 無法使用、規格行平均信心低於 OCR_MIN_CONFIDENCE
+                  或規格少於 OCR_MIN_SPECS 時回傳 None，由 Vision 接手
+        """
+        if not self.local_ocr:
+            return None
         try:
-            # 下載圖像
-            image_data = self.download_image(image_url)
-            if not image_data:
-                return {}
-            
-            print(f"🖼️ 正在用 Gemini Vision 識別圖像規格...")
-            
-            # 使用 Gemini Vision 識別圖像中的規格
-            prompt = """你是商品規格識別專家。請分析這張圖像中的商品規格信息。
+            data = pytesseract.image_to_data(prepare_for_ocr(image_data), lang=OCR_LANG, config='--psm 6',
+                                             output_type=pytesseract.Output.DICT)
+        except Exception as e:
+            print(f"⚠️  本機 OCR 失敗: {e}")
+            return None
 
-**請務必提取以下信息（如果圖像中有的話）：**
-1. 材質/材料
-2. 尺寸/大小/長寬高
-3. 重量
-4. 顏色
-5. 功能/特性
-6. 型號
-7. 保修/保固期限
-8. 電源/電池
-9. 規格/參數
-10. 其他重要規格
+        # 依 (區塊, 段落, 行) 組回文字行，並記錄各字詞信心
+        lines: Dict[tuple, List] = {}
+        for i, word in enumerate(data['text']):
+            conf = float(data['conf'][i])
+            if conf < 0 or not word.strip():
+                continue
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(key, []).append((word.strip(), conf))
 
-**返回格式要求：**
-- 每行一個規格，格式為「規格名稱: 規格值」
-- 只返回規格信息，不需要其他說明
-- 盡可能詳細準確"""
-            
-            # 將圖像發送給 Gemini Vision
-            response = self.model.generate_content([
-                prompt,
-                Image.open(BytesIO(image_data))
-            ])
+        spec_lines, confidences = [], []
+        for key in sorted(lines):
+            text = _CJK_SPACE_PATTERN.sub('', ' '.join(word for word, _ in lines[key])).replace('：', ':')
+            if ':' in text:
+                spec_lines.append(text)
+                confidences.extend(conf for _, conf in lines[key])
+
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        if confidence < OCR_MIN_CONFIDENCE:
+            print(f"🔎 本機 OCR 信心不足 ({confidence:.0f} < {OCR_MIN_CONFIDENCE:.0f})，改用 Gemini Vision")
+            return None
+
+        specs = self._parse_specs_response('\n'.join(spec_lines))
+        if len(specs) < OCR_MIN_SPECS:
+            print(f"🔎 本機 OCR 只解析出 {len(specs)} 個規格，改用 Gemini Vision")
+            return None
+        print(f"✅ 本機 OCR 識別到 {len(specs)} 個規格（信心 {confidence:.0f}）")
+        return specs
+
+    def _recognize(self, image_data: bytes, digest: str, image_url: str = None) -> Dict[str, str]:
+        """本機 OCR 優先，結果不佳時呼叫 Vision，並寫入快取（識別失敗不寫入快取）"""
+        specs = self.extract_specs_with_ocr(image_data)
+        if specs is not None:
+            get_vision_cache().put(digest, self.cache_model, SPEC_PROMPT_VERSION, specs, image_url)
+            return specs
+
+        try:
+            image = self._vision_payload(image_data)
+
+            # 將圖像發送給 Gemini Vision（取代固定等待，由共用節流器控制速率與並行數）
+            with get_vision_throttle():
+                print(f"🖼️ 正在用 Gemini Vision 識別圖像規格...")
+                response = self.model.generate_content([SPEC_PROMPT, image])
             
             print(f"📝 Gemini 响应内容: {response.text[:100]}...")
             
             # 解析響應
             specs = self._parse_specs_response(response.text)
             print(f"✅ 成功識別到 {len(specs)} 個規格")
-            
+
+            get_vision_cache().put(digest, self.cache_model, SPEC_PROMPT_VERSION, specs, image_url)
             return specs
             
         except Exception as e:
@@ -87,28 +264,92 @@ class ImageRecognizer:
             return {}
     
     def extract_specs_from_images(self, image_urls: List[str]) -> Dict[str, str]:
-        """從多張圖像中提取規格資訊（合併所有規格）"""
+        """
+        從多張圖像中提取規格資訊（合併所有規格）
+
+        1. 網址已識別過的圖像直接使用快取，其餘並行下載
+        2. 以感知雜湊將近乎相同的圖像（不同網址、尺寸）分為一組，每組只識別一張；
+           批次中其他商品識別過的相同圖像也直接共用結果
+        3. 並行識別，總耗時接近最慢的單張圖像
+
+        合併順序固定依輸入順序（同名規格以後面的圖像為準），與並行完成順序無關
+        """
         all_specs = {}
+        if not image_urls:
+            return all_specs
         
         print(f"📊 開始識別 {len(image_urls)} 張圖像...")
-        
-        for i, url in enumerate(image_urls, 1):
-            print(f"\n【圖像 {i}/{len(image_urls)}】 {url[:50]}...")
-            specs = self.extract_specs_from_image_url(url)
-            
+        cache = get_vision_cache()
+        results: List[Optional[Dict[str, str]]] = [
+            cache.get_by_url(url, self.cache_model, SPEC_PROMPT_VERSION) for url in image_urls
+        ]
+        pending = [i for i, specs in enumerate(results) if specs is None]
+
+        workers = max(1, min(IMAGE_DOWNLOAD_WORKERS, len(image_urls)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vision') as pool:
+            downloads = dict(zip(pending, pool.map(self.download_image, [image_urls[i] for i in pending])))
+
+            # 近乎相同的圖像分為一組：[(比對資料, 成員索引)]，第一個成員為代表
+            groups = []
+            for i in pending:
+                if not downloads[i]:
+                    results[i] = {}
+                    continue
+                image = fingerprint(downloads[i]) if PHASH_DEDUP_ENABLED else None
+                group = next((g for g in groups if image and g[0] and is_near_duplicate(g[0], image)), None)
+                if group:
+                    group[1].append(i)
+                else:
+                    groups.append((image, [i]))
+
+            futures = [
+                pool.submit(self._recognize_unique, downloads[members[0]], image, image_urls[members[0]])
+                for image, members in groups
+            ]
+            for (image, members), future in zip(groups, futures):
+                specs = future.result()
+                for i in members:
+                    results[i] = specs
+                    if i != members[0] and specs:
+                        # 記錄重複圖像的網址與內容，下次可略過下載與識別
+                        cache.put(image_digest(downloads[i]), self.cache_model, SPEC_PROMPT_VERSION,
+                                  specs, image_urls[i])
+
+        duplicates = sum(len(members) - 1 for _, members in groups)
+        if duplicates:
+            print(f"🔁 略過 {duplicates} 張近乎相同的圖像")
+
+        for i, (url, specs) in enumerate(zip(image_urls, results), 1):
             if specs:
                 all_specs.update(specs)
-                print(f"  → 本張圖像識別結果: {len(specs)} 個規格")
+                print(f"  → 圖像 {i}/{len(image_urls)} 識別結果: {len(specs)} 個規格 ({url[:50]}...)")
             else:
-                print(f"  → 本張圖像未識別到規格")
-            
-            # 避免 API 限流
-            if i < len(image_urls):
-                print("⏳ 等待中... (避免 API 限流)")
-                time.sleep(2)
+                print(f"  → 圖像 {i}/{len(image_urls)} 未識別到規格 ({url[:50]}...)")
         
         print(f"\n📊 所有圖像識別完成，共 {len(all_specs)} 個規格")
         return all_specs
+
+    def _recognize_unique(self, image_data: bytes, image, image_url: str) -> Dict[str, str]:
+        """識別一張圖像；其他商品已識別（或正在識別）近乎相同的圖像時共用其結果"""
+        if image is None:
+            return self.extract_specs_from_image_data(image_data, image_url)
+
+        index = get_perceptual_index()
+        future, owner = index.claim(image)
+        if not owner:
+            print(f"🔁 沿用近乎相同圖像的識別結果: {image_url[:60]}...")
+            specs = future.result()
+            if specs:
+                get_vision_cache().put(image_digest(image_data), self.cache_model, SPEC_PROMPT_VERSION,
+                                       specs, image_url)
+            return specs
+
+        specs = {}
+        try:
+            specs = self.extract_specs_from_image_data(image_data, image_url)
+        finally:
+            index.resolve(image, future, specs)
+        return specs
     
     @staticmethod
     def _parse_specs_response(response_text: str) -> Dict[str, str]:
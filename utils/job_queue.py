@@ -0,0 +1,159 @@
+"""
+爬取工作佇列模組 - 在背景執行緒執行 scrape 工作，介面以工作 ID 輪詢進度
+
+Streamlit 重新執行腳本時不會中斷或重複爬取；所有使用者共用同一組工作執行緒
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from config.settings import SCRAPE_JOB_WORKERS, SCRAPE_JOB_RESULT_TTL
+from utils.scraper import iter_scrape_products
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class ScrapeJob:
+    """單一爬取工作的狀態與（逐步累積的）結果"""
+
+    def __init__(self, urls: List[str], is_dynamic: bool, known: Optional[Dict[str, dict]] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.urls = list(urls)
+        self.is_dynamic = is_dynamic
+        self.known = dict(known or {})  # 更新價格的工作：{url: 先前的商品資訊}
+        self.status = QUEUED
+        self.error: Optional[str] = None
+        self.results: Dict[int, Optional[dict]] = {}  # 輸入序號 -> 商品資訊（失敗為 None）
+        self.elapsed: Dict[int, float] = {}
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def total(self) -> int:
+        return len(self.urls)
+
+    @property
+    def completed(self) -> int:
+        return len(self.results)
+
+    @property
+    def is_refresh(self) -> bool:
+        return bool(self.known)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def products(self) -> List[dict]:
+        """已成功的商品（依輸入順序；更新價格的工作中更新失敗的商品保留原資料）"""
+        results = dict(self.results)
+        products = [results.get(i) or self.known.get(url) for i, url in enumerate(self.urls)]
+        return [product for product in products if product]
+
+
+def _dedup_key(urls: List[str], is_dynamic: bool, refresh: bool = False) -> tuple:
+    return tuple(sorted(set(urls))), bool(is_dynamic), bool(refresh)
+
+
+class ScrapeJobQueue:
+    """行程內的爬取工作佇列（相同網址集合的工作只執行一次）"""
+
+    def __init__(self, max_workers: int = SCRAPE_JOB_WORKERS, result_ttl: float = SCRAPE_JOB_RESULT_TTL):
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="scrape-job")
+        self._jobs: Dict[str, ScrapeJob] = {}
+        self._by_key: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, urls: List[str], is_dynamic: bool = False, known: Optional[Dict[str, dict]] = None) -> str:
+        """
+        提交爬取工作
+
+        相同網址集合的工作尚在執行或剛完成時，直接回傳既有工作 ID
+        （更新價格的工作只沿用執行中的工作，已完成的不沿用）
+
+        Args:
+            known: {url: 先前的商品資訊}；提供時只更新價格（見 ProductScraper.refresh_price）
+
+        Returns:
+            str: 工作 ID
+        """
+        key = _dedup_key(urls, is_dynamic, bool(known))
+        with self._lock:
+            self._purge_expired()
+            existing = self._jobs.get(self._by_key.get(key))
+            if existing and existing.status != FAILED and not (existing.is_refresh and existing.finished):
+                print(f"♻️  沿用相同網址的爬取工作 {existing.id}")
+                return existing.id
+
+            job = ScrapeJob(urls, is_dynamic, known)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+
+        print(f"📥 已排入爬取工作 {job.id}（{job.total} 個商品）")
+        self._executor.submit(self._run, job)
+        return job.id
+
+    def get(self, job_id: str) -> Optional[ScrapeJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: ScrapeJob):
+        job.status = RUNNING
+        job.started_at = time.time()
+        # 先設定完成時間再改變狀態：其他執行緒看到完成狀態時 finished_at 必定已存在
+        try:
+            for index, _, product, elapsed in iter_scrape_products(job.urls, job.is_dynamic,
+                                                                   known=job.known or None):
+                job.elapsed[index] = elapsed
+                job.results[index] = product
+            job.finished_at = time.time()
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.finished_at = time.time()
+            job.status = FAILED
+            print(f"❌ 爬取工作 {job.id} 失敗: {e}")
+
+    def _purge_expired(self):
+        """移除過期的已完成工作（需持有鎖）"""
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.finished_at is not None and now - job.finished_at > self.result_ttl]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            key = _dedup_key(job.urls, job.is_dynamic, job.is_refresh)
+            if self._by_key.get(key) == job_id:
+                del self._by_key[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> ScrapeJobQueue:
+    """取得全域共用的爬取工作佇列（跨 Streamlit 工作階段共享）"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = ScrapeJobQueue()
+        return _queue
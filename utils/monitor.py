@@ -0,0 +1,257 @@
+"""
+價格監控模組 - 不需 Streamlit，定期重新爬取追蹤清單並在降價或 CP 排名變動時發出通知
+
+與介面共用頁面快取、解析結果快取與價格歷史（磁碟），同一行程內共用瀏覽器池
+"""
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config.settings import (
+    MONITOR_DEFAULT_INTERVAL,
+    MONITOR_JITTER,
+    MONITOR_DROP_WINDOW,
+    MONITOR_ALERTS_PATH,
+    MONITOR_STATUS_PATH,
+    MONITOR_WEBHOOK_URL,
+)
+from utils.cp_calculator import CPCalculator
+from utils.data_cleaner import DataCleaner
+from utils.http_session import get_session
+from utils.price_history import get_price_history
+from utils.scraper import iter_scrape_products
+from utils.url_utils import canonicalize_url
+
+
+class Watchlist:
+    """一份追蹤清單：商品網址、檢查間隔與（選填）特徵權重"""
+
+    def __init__(self, name: str, urls: List[str], interval: float = MONITOR_DEFAULT_INTERVAL,
+                 feature_weights: Dict[str, float] = None, is_dynamic: bool = False):
+        self.name = name
+        self.urls = list(urls)
+        self.interval = interval
+        self.feature_weights = feature_weights or {}
+        self.is_dynamic = is_dynamic
+        self.next_due = 0.0  # 0 表示啟動後立即檢查
+
+
+def load_watchlists(path: str) -> List[Watchlist]:
+    """
+    讀取追蹤清單設定檔（JSON）
+
+    格式: [{"name": "耳機", "urls": [...], "interval": 3600, "feature_weights": {...}}, ...]
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [
+        Watchlist(
+            item.get('name', f"清單 {i}"),
+            item['urls'],
+            item.get('interval', MONITOR_DEFAULT_INTERVAL),
+            item.get('feature_weights'),
+            item.get('is_dynamic', False),
+        )
+        for i, item in enumerate(data, 1)
+    ]
+
+
+class AlertSink:
+    """通知輸出：終端機、JSON Lines 檔案與選填的 webhook"""
+
+    def __init__(self, path: str = MONITOR_ALERTS_PATH, webhook_url: str = MONITOR_WEBHOOK_URL):
+        self.path = path
+        self.webhook_url = webhook_url
+        self._lock = threading.Lock()
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+    def emit(self, alert: Dict):
+        alert = dict(alert, time=time.time())
+        print(f"🔔 {alert['message']}")
+        if self.path:
+            with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(alert, ensure_ascii=False) + '\n')
+        if self.webhook_url:
+            try:
+                get_session().post(self.webhook_url, json=alert, timeout=10)
+            except Exception as e:
+                print(f"⚠️  通知傳送失敗: {e}")
+
+
+class PriceMonitor:
+    """依排程重新爬取追蹤清單（跨清單去重），並回報佇列深度與延遲"""
+
+    def __init__(self, watchlists: List[Watchlist], sink: AlertSink = None, jitter: float = MONITOR_JITTER,
+                 drop_window: float = MONITOR_DROP_WINDOW, status_path: str = MONITOR_STATUS_PATH):
+        self.watchlists = watchlists
+        self.sink = sink or AlertSink()
+        self.jitter = jitter
+        self.drop_window = drop_window
+        self.status_path = status_path
+
+        self._products: Dict[str, Dict] = {}      # 標準化網址 -> 最新商品資訊
+        self._pending: Dict[str, Dict] = {}       # 標準化網址 -> {url, due, is_dynamic}
+        self._in_progress: Dict[str, Dict] = {}
+        self._rankings: Dict[str, List[str]] = {}  # 清單名稱 -> 依 CP 值排序的網址
+        self._alerted = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.cycles = 0
+
+    # ========== 排程 ==========
+
+    def _next_interval(self, interval: float) -> float:
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _enqueue_due(self, now: float) -> List[Watchlist]:
+        """將到期清單的網址排入佇列（已在佇列或爬取中的網址不重複排入）"""
+        due_lists = [w for w in self.watchlists if w.next_due <= now]
+        with self._lock:
+            for watchlist in due_lists:
+                due = watchlist.next_due or now
+                watchlist.next_due = now + self._next_interval(watchlist.interval)
+                for url in watchlist.urls:
+                    key = canonicalize_url(url)
+                    if key in self._pending or key in self._in_progress:
+                        continue
+                    self._pending[key] = {'url': url, 'due': due, 'is_dynamic': watchlist.is_dynamic}
+        return due_lists
+
+    def status(self) -> Dict:
+        """佇列深度（待爬取 + 爬取中）與延遲（最久未處理項目距到期時間的秒數）"""
+        now = time.time()
+        with self._lock:
+            waiting = list(self._pending.values()) + list(self._in_progress.values())
+            lag = max((now - item['due'] for item in waiting), default=0.0)
+            return {
+                'queue_depth': len(waiting),
+                'pending': len(self._pending),
+                'in_progress': len(self._in_progress),
+                'lag_seconds': round(max(0.0, lag), 1),
+                'tracked_products': len(self._products),
+                'cycles': self.cycles,
+                'next_due_in': round(max(0.0, min((w.next_due for w in self.watchlists), default=now) - now), 1),
+                'updated_at': now,
+            }
+
+    def _write_status(self):
+        if not self.status_path:
+            return
+        os.makedirs(os.path.dirname(self.status_path) or '.', exist_ok=True)
+        tmp_path = self.status_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.status(), f)
+        os.replace(tmp_path, self.status_path)
+
+    # ========== 爬取與通知 ==========
+
+    def _process_pending(self):
+        """爬取佇列中的所有網址（已知商品只更新價格）"""
+        with self._lock:
+            batch = self._pending
+            self._pending = {}
+            self._in_progress.update(batch)
+
+        # 動態設定不同的網址分開批次
+        for is_dynamic in (False, True):
+            items = [(key, item) for key, item in batch.items() if item['is_dynamic'] == is_dynamic]
+            if not items:
+                continue
+            urls = [item['url'] for _, item in items]
+            known = {item['url']: self._products[key] for key, item in items if key in self._products}
+            for index, url, product, _ in iter_scrape_products(urls, is_dynamic, known=known):
+                key = items[index][0]
+                with self._lock:
+                    self._in_progress.pop(key, None)
+                if product:
+                    self._products[key] = product
+                    self._check_price_drop(product)
+                self._write_status()
+
+    def _check_price_drop(self, product: Dict):
+        drop = get_price_history().detect_price_drop(product['url'], self.drop_window)
+        if not drop:
+            return
+        alert_key = ('price_drop', canonicalize_url(product['url']), drop['current'])
+        if alert_key in self._alerted:
+            return
+        self._alerted.add(alert_key)
+        self.sink.emit({
+            'type': 'price_drop',
+            'url': product['url'],
+            'name': product.get('name'),
+            'price': drop['current'],
+            'previous_high': drop['previous_high'],
+            'drop_pct': round(drop['drop_pct'], 4),
+            'message': f"降價 {drop['drop_pct']:.0%}：{product.get('name', '')[:30]} "
+                       f"${drop['previous_high']:,.0f} → ${drop['current']:,.0f}",
+        })
+
+    def _check_rankings(self, watchlists: List[Watchlist]):
+        """重新計算清單內的 CP 值，排名變動時通知"""
+        for watchlist in watchlists:
+            products = [self._products[k] for k in map(canonicalize_url, watchlist.urls) if k in self._products]
+            if len(products) < 2:
+                continue
+            cleaned = DataCleaner.clean_products(products)
+            weights = watchlist.feature_weights or {
+                feature: 1.0 for feature in DataCleaner.extract_common_features(cleaned)
+            }
+            cp_values = CPCalculator.calculate_all_cp_values(cleaned, weights)
+            get_price_history().record_cp_values(cp_values)
+
+            ranking = sorted(cp_values, key=lambda url: (-cp_values[url], url))
+            previous = self._rankings.get(watchlist.name)
+            self._rankings[watchlist.name] = ranking
+            if previous is None or previous == ranking:
+                continue
+
+            best = next(p for p in cleaned if p['url'] == ranking[0])
+            self.sink.emit({
+                'type': 'cp_ranking',
+                'watchlist': watchlist.name,
+                'ranking': ranking,
+                'cp_values': cp_values,
+                'message': f"[{watchlist.name}] CP 排名變動，目前最佳：{best['name'][:30]} "
+                           f"(CP {cp_values[ranking[0]]:.2f}, ${best['price']:,.0f})",
+            })
+
+    # ========== 執行 ==========
+
+    def run_once(self):
+        """處理目前到期的清單一次"""
+        due_lists = self._enqueue_due(time.time())
+        self._write_status()
+        if due_lists:
+            self._process_pending()
+            self._check_rankings(due_lists)
+            self.cycles += 1
+            self._write_status()
+        return due_lists
+
+    def run(self, poll_interval: float = 1.0):
+        """持續執行直到 stop()"""
+        print(f"👀 開始監控 {len(self.watchlists)} 份清單，"
+              f"共 {len({canonicalize_url(u) for w in self.watchlists for u in w.urls})} 個商品")
+        while not self._stop.is_set():
+            if self.run_once():
+                status = self.status()
+                print(f"📊 第 {self.cycles} 輪完成，追蹤 {status['tracked_products']} 個商品，"
+                      f"下次檢查約 {status['next_due_in']:.0f}s 後")
+            self._stop.wait(poll_interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+def read_status(path: str = MONITOR_STATUS_PATH) -> Optional[Dict]:
+    """讀取監控行程最近一次回報的狀態（供其他行程查詢）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,212 @@
+"""
+頁面快取模組 - 以標準化網址為鍵，將 HTML 壓縮存到本地磁碟
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Dict, Optional
+
+import requests
+
+from config.settings import (
+    PAGE_CACHE_ENABLED,
+    PAGE_CACHE_DIR,
+    PAGE_CACHE_TTL,
+    DEFAULT_PAGE_CACHE_TTL,
+    PAGE_CACHE_MAX_AGE,
+    PAGE_CACHE_PURGE_INTERVAL,
+)
+from utils.http_session import get_session
+from utils.rate_limiter import get_site_key
+from utils.url_utils import canonicalize_url
+
+
+class CachedPage:
+    """一筆快取頁面"""
+
+    def __init__(self, url: str, html: bytes, meta: Dict):
+        self.url = url
+        self.html = html
+        self.etag = meta.get('etag')
+        self.last_modified = meta.get('last_modified')
+        self.fetched_at = meta.get('fetched_at', 0)
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class PageCache:
+    """
+    HTML 快取
+
+    每筆資料存成 <key>.html.gz（原始位元組）與 <key>.json（ETag、Last-Modified、抓取時間）。
+    kind 區分靜態抓取（static）與瀏覽器渲染（dynamic）的內容，兩者分開存放。
+    寫入時每隔 purge_interval 秒刪除一次超過 max_age 的頁面，長時間執行（如監控）時目錄不會無限成長。
+    """
+
+    def __init__(self, cache_dir: str = PAGE_CACHE_DIR, enabled: bool = PAGE_CACHE_ENABLED,
+                 max_age: float = PAGE_CACHE_MAX_AGE, purge_interval: float = PAGE_CACHE_PURGE_INTERVAL):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.max_age = max_age
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def ttl_for(url: str) -> int:
+        """該網站的快取有效秒數"""
+        return PAGE_CACHE_TTL.get(get_site_key(url), DEFAULT_PAGE_CACHE_TTL)
+
+    def _paths(self, url: str, kind: str):
+        key = hashlib.sha256(f"{kind}:{canonicalize_url(url)}".encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.html.gz', base + '.json'
+
+    def load(self, url: str, kind: str = 'static') -> Optional[CachedPage]:
+        """讀取快取（不論是否過期），不存在時回傳 None"""
+        if not self.enabled:
+            return None
+        html_path, meta_path = self._paths(url, kind)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with gzip.open(html_path, 'rb') as f:
+                html = f.read()
+            return CachedPage(url, html, meta)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, url: str, kind: str = 'static') -> Optional[CachedPage]:
+        """讀取未過期的快取"""
+        page = self.load(url, kind)
+        if page and page.age() <= self.ttl_for(url):
+            return page
+        return None
+
+    def put(self, url: str, html: bytes, kind: str = 'static',
+            etag: str = None, last_modified: str = None):
+        """寫入快取（先寫暫存檔再替換，避免讀到寫一半的內容）"""
+        if not self.enabled or not html:
+            return
+        html_path, meta_path = self._paths(url, kind)
+        meta = {
+            'url': canonicalize_url(url),
+            'kind': kind,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time(),
+        }
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with gzip.open(html_path + suffix, 'wb') as f:
+                f.write(html)
+            with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            with self._lock:
+                os.replace(html_path + suffix, html_path)
+                os.replace(meta_path + suffix, meta_path)
+        except OSError as e:
+            print(f"⚠️  頁面快取寫入失敗: {e}")
+            return
+        self._maybe_purge()
+
+    def _maybe_purge(self):
+        """距離上次清理超過 purge_interval 時，刪除超過 max_age 的頁面"""
+        now = time.time()
+        with self._lock:
+            if now - self._last_purge < self.purge_interval:
+                return
+            self._last_purge = now
+        removed = self.purge_expired(self.max_age)
+        if removed:
+            print(f"🧹 已清除 {removed} 筆過期頁面快取")
+
+    def touch(self, page: CachedPage, kind: str = 'static'):
+        """重新驗證成功（304）時更新抓取時間"""
+        self.put(page.url, page.html, kind, page.etag, page.last_modified)
+
+    def purge_expired(self, max_age: float = None) -> int:
+        """刪除抓取時間超過 max_age（省略時為各網站 TTL）的快取，回傳刪除筆數"""
+        if not self.enabled:
+            return 0
+        removed = 0
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            meta_path = os.path.join(self.cache_dir, name)
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                limit = max_age if max_age is not None else self.ttl_for(meta.get('url', ''))
+                if now - meta.get('fetched_at', 0) > limit:
+                    os.remove(meta_path)
+                    os.remove(meta_path[:-len('.json')] + '.html.gz')
+                    removed += 1
+            except (OSError, ValueError):
+                continue
+        return removed
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> PageCache:
+    """取得全域共用的頁面快取"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PageCache()
+        return _cache
+
+
+def fetch_html(url: str, headers: Dict = None, timeout: float = None,
+               slot: Callable[[str], ContextManager] = None) -> bytes:
+    """
+    取得靜態頁面 HTML 位元組（先查快取，過期時以 If-None-Match / If-Modified-Since 重新驗證）
+
+    Args:
+        slot: 實際發出請求前進入的 context manager 工廠（如網站名額與限流），快取命中時不會進入
+
+    Raises:
+        requests.RequestException: 網路錯誤，或非 2xx / 304 回應（含限流、重試後仍失敗的 5xx）時的 HTTPError
+    """
+    cache = get_page_cache()
+    cached = cache.load(url)
+    if cached and cached.age() <= cache.ttl_for(url):
+        print(f"💾 使用頁面快取: {url[:60]}")
+        return cached.html
+
+    request_headers = dict(headers or {})
+    if cached:
+        if cached.etag:
+            request_headers['If-None-Match'] = cached.etag
+        if cached.last_modified:
+            request_headers['If-Modified-Since'] = cached.last_modified
+
+    with slot(url) if slot else nullcontext():
+        response = get_session().get(url, headers=request_headers, timeout=timeout)
+    if response.status_code == 304 and cached:
+        print(f"💾 頁面未變更 (304)，沿用快取: {url[:60]}")
+        cache.touch(cached)
+        return cached.html
+    if not 200 <= response.status_code < 300:
+        # 錯誤頁（限流、5xx 等）不是商品頁，交由呼叫端記錄網站健康狀態
+        raise requests.HTTPError(f"HTTP {response.status_code}: {url}", response=response)
+
+    html = response.content
+    if response.status_code == 200:
+        cache.put(
+            url, html,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+        )
+    return html
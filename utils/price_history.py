@@ -0,0 +1,196 @@
+"""
+價格歷史模組 - 以標準化網址記錄每次爬取的價格、評分與 CP 值（SQLite WAL）
+
+爬取工作執行緒各自使用獨立連線寫入，WAL 模式下讀取（介面查詢）不會被寫入阻擋
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import PRICE_HISTORY_ENABLED, PRICE_HISTORY_PATH, PRICE_DROP_THRESHOLD
+from utils.url_utils import canonicalize_url
+
+
+class PriceHistory:
+    """價格歷史資料庫（每個執行緒使用獨立連線）"""
+
+    def __init__(self, path: str = PRICE_HISTORY_PATH, enabled: bool = PRICE_HISTORY_ENABLED):
+        self.path = path
+        self.enabled = enabled
+        self._local = threading.local()
+        if self.enabled:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS price_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL,
+                    name TEXT,
+                    price REAL NOT NULL,
+                    rating REAL,
+                    cp_value REAL,
+                    recorded_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_price_history_url_time ON price_history (url, recorded_at)"
+            )
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    # ========== 寫入 ==========
+
+    def record(self, product: Dict, cp_value: float = None, recorded_at: float = None):
+        """記錄一筆商品價格（價格無效或同一次取得的價格已記錄時略過）"""
+        self.record_many([product], {product.get('url'): cp_value} if cp_value is not None else None,
+                         recorded_at)
+
+    def record_many(self, products: List[Dict], cp_values: Dict[str, float] = None,
+                    recorded_at: float = None):
+        """
+        批次記錄（單一交易）
+
+        記錄時間使用商品的 fetched_at（價格實際取得時間），同一商品同一時間的記錄只寫入一次，
+        因此快取命中、共用進行中的爬取或沿用的工作結果不會被當成新的觀測值
+
+        Args:
+            products: 商品資訊列表（需含 url、price）
+            cp_values: {url: CP 值}，可省略
+            recorded_at: 記錄時間，預設為商品的 fetched_at，沒有時為現在
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        cp_values = cp_values or {}
+        rows = []
+        for p in products:
+            if not p or not p.get('url') or (p.get('price') or 0) <= 0:
+                continue
+            url = canonicalize_url(p['url'])
+            at = recorded_at if recorded_at is not None else p.get('fetched_at') or now
+            rows.append((url, p.get('name'), float(p['price']), p.get('rating'), cp_values.get(p['url']), at,
+                         url, at))
+        if not rows:
+            return
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO price_history (url, name, price, rating, cp_value, recorded_at) "
+                    "SELECT ?, ?, ?, ?, ?, ? WHERE NOT EXISTS ("
+                    "SELECT 1 FROM price_history WHERE url = ? AND recorded_at = ?)",
+                    rows,
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️  價格歷史寫入失敗: {e}")
+
+    def record_cp_values(self, cp_values: Dict[str, float]):
+        """將 CP 值寫入各商品最新一筆記錄（CP 值在分析後才計算）"""
+        if not self.enabled or not cp_values:
+            return
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "UPDATE price_history SET cp_value = ? WHERE id = ("
+                    "SELECT id FROM price_history WHERE url = ? ORDER BY recorded_at DESC, id DESC LIMIT 1)",
+                    [(cp, canonicalize_url(url)) for url, cp in cp_values.items()],
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️  CP 值寫入失敗: {e}")
+
+    # ========== 查詢 ==========
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        if not self.enabled:
+            return []
+        try:
+            return self._connect().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"⚠️  價格歷史讀取失敗: {e}")
+            return []
+
+    def latest(self, url: str) -> Optional[Dict]:
+        """最新一筆記錄，不存在時回傳 None"""
+        rows = self._query(
+            "SELECT name, price, rating, cp_value, recorded_at FROM price_history "
+            "WHERE url = ? ORDER BY recorded_at DESC, id DESC LIMIT 1",
+            (canonicalize_url(url),),
+        )
+        if not rows:
+            return None
+        name, price, rating, cp_value, recorded_at = rows[0]
+        return {'url': url, 'name': name, 'price': price, 'rating': rating,
+                'cp_value': cp_value, 'recorded_at': recorded_at}
+
+    def history(self, url: str, window: float = None) -> List[Dict]:
+        """依時間排序的記錄（window 為最近幾秒，省略表示全部）"""
+        since = time.time() - window if window else 0
+        rows = self._query(
+            "SELECT price, rating, cp_value, recorded_at FROM price_history "
+            "WHERE url = ? AND recorded_at >= ? ORDER BY recorded_at, id",
+            (canonicalize_url(url), since),
+        )
+        return [{'price': price, 'rating': rating, 'cp_value': cp_value, 'recorded_at': recorded_at}
+                for price, rating, cp_value, recorded_at in rows]
+
+    def price_range(self, url: str, window: float) -> Optional[Tuple[float, float]]:
+        """最近 window 秒內的 (最低價, 最高價)，無記錄時回傳 None"""
+        rows = self._query(
+            "SELECT MIN(price), MAX(price) FROM price_history WHERE url = ? AND recorded_at >= ?",
+            (canonicalize_url(url), time.time() - window),
+        )
+        if not rows or rows[0][0] is None:
+            return None
+        return rows[0]
+
+    def detect_price_drop(self, url: str, window: float,
+                          threshold: float = PRICE_DROP_THRESHOLD) -> Optional[Dict]:
+        """
+        最新價格是否比期間內最高價低 threshold 以上
+
+        Returns:
+            dict: {url, current, previous_high, drop, drop_pct}；未降價時回傳 None
+        """
+        latest = self.latest(url)
+        price_range = self.price_range(url, window)
+        if not latest or not price_range:
+            return None
+        high = price_range[1]
+        drop = high - latest['price']
+        if high <= 0 or drop / high < threshold:
+            return None
+        return {'url': url, 'current': latest['price'], 'previous_high': high,
+                'drop': drop, 'drop_pct': drop / high}
+
+    def price_drops(self, window: float, threshold: float = PRICE_DROP_THRESHOLD) -> List[Dict]:
+        """所有在期間內降價的商品（依降幅排序）"""
+        rows = self._query(
+            "SELECT DISTINCT url FROM price_history WHERE recorded_at >= ?",
+            (time.time() - window,),
+        )
+        drops = [self.detect_price_drop(url, window, threshold) for (url,) in rows]
+        return sorted((d for d in drops if d), key=lambda d: d['drop_pct'], reverse=True)
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_price_history() -> PriceHistory:
+    """取得全域共用的價格歷史"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = PriceHistory()
+        return _history
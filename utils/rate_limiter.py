@@ -0,0 +1,90 @@
+"""
+速率限制模組 - 依網站分別控制請求頻率（Token Bucket）
+"""
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from config.settings import SUPPORTED_SITES, SITE_RATE_LIMITS, DEFAULT_RATE_LIMIT
+
+
+def get_site_key(url: str) -> str:
+    """
+    取得 URL 所屬網站的鍵值
+
+    已知網站回傳 SUPPORTED_SITES 的鍵（如 'momo'），其餘回傳主機名稱
+    """
+    host = (urlparse(url).hostname or '').lower()
+    for key, domain in SUPPORTED_SITES.items():
+        base = domain.lower()
+        if base.startswith('www.'):
+            base = base[4:]
+        if host == base or host.endswith('.' + base):
+            return key
+    return host
+
+
+class TokenBucket:
+    """Token Bucket 限流器：平均每秒 rate 個請求，最多累積 capacity 個"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """取得一個 token（必要時等待），回傳實際等待秒數"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class DomainRateLimiter:
+    """依網站分配獨立的 Token Bucket"""
+
+    def __init__(self, limits: Optional[Dict[str, tuple]] = None, default=DEFAULT_RATE_LIMIT):
+        self.limits = limits if limits is not None else SITE_RATE_LIMITS
+        self.default = default
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        """取得（或建立）該網站的 bucket"""
+        key = get_site_key(url)
+        with self._lock:
+            if key not in self._buckets:
+                rate, capacity = self.limits.get(key, self.default)
+                self._buckets[key] = TokenBucket(rate, capacity)
+            return self._buckets[key]
+
+    def acquire(self, url: str) -> float:
+        """等待直到可以對該網站發出請求"""
+        return self.bucket_for(url).acquire()
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> DomainRateLimiter:
+    """取得全域共用的網站限流器（跨批次共享節奏）"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = DomainRateLimiter()
+        return _limiter
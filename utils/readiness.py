@@ -0,0 +1,115 @@
+"""
+頁面就緒判斷模組 - 以「資料已載入」條件取代固定等待
+"""
+import threading
+import time
+from typing import Dict, List
+
+from selenium.webdriver.support.ui import WebDriverWait
+from config.settings import (
+    SELENIUM_WAIT_TIME,
+    READINESS_MIN_TIMEOUT,
+    READINESS_POLL_INTERVAL,
+    NETWORK_IDLE_WINDOW,
+)
+from utils.site_adapters import get_adapter
+
+
+# 在瀏覽器內一次檢查所有條件，避免多次往返
+_READINESS_SCRIPT = """
+const priceSelectors = arguments[0], specSelectors = arguments[1];
+const hasDigits = (sel) => {
+    const el = document.querySelector(sel);
+    return !!el && /\\d/.test(el.getAttribute('data-price') || el.textContent || '');
+};
+return {
+    price: priceSelectors.some(hasDigits),
+    specs: specSelectors.some((sel) => document.querySelector(sel) !== null),
+    resources: performance.getEntriesByType('resource').length,
+    complete: document.readyState === 'complete'
+};
+"""
+
+
+class AdaptiveTimeout:
+    """依各網站過去的就緒耗時調整逾時（約為平均耗時的 3 倍）"""
+
+    def __init__(self, min_timeout: float = READINESS_MIN_TIMEOUT,
+                 max_timeout: float = SELENIUM_WAIT_TIME, factor: float = 3.0):
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.factor = factor
+        self._averages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def timeout_for(self, site: str) -> float:
+        with self._lock:
+            average = self._averages.get(site)
+        if average is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, average * self.factor))
+
+    def record(self, site: str, elapsed: float, ready: bool):
+        """記錄一次等待結果；逾時視為耗時等於上限"""
+        sample = elapsed if ready else self.max_timeout
+        with self._lock:
+            average = self._averages.get(site)
+            self._averages[site] = sample if average is None else average * 0.7 + sample * 0.3
+
+
+class _ReadinessCondition:
+    """WebDriverWait 使用的條件：價格已填入，且規格容器出現或網路已閒置"""
+
+    def __init__(self, profile: Dict[str, List[str]]):
+        self.profile = profile
+        self._last_resources = -1
+        self._stable_since = time.time()
+
+    def __call__(self, driver):
+        state = driver.execute_script(_READINESS_SCRIPT, self.profile['price'], self.profile['specs'])
+
+        now = time.time()
+        if state['resources'] != self._last_resources:
+            self._last_resources = state['resources']
+            self._stable_since = now
+        network_idle = state['complete'] and now - self._stable_since >= NETWORK_IDLE_WINDOW
+
+        return state['price'] and (state['specs'] or network_idle)
+
+
+_adaptive_timeout = AdaptiveTimeout()
+
+
+def wait_for_page_ready(driver, url: str, timeout: float = None) -> bool:
+    """
+    等待頁面資料就緒，條件成立即返回
+
+    Args:
+        driver: Selenium WebDriver（已呼叫 get）
+        url: 頁面網址，用於選擇網站條件
+        timeout: 最長等待秒數，預設依該網站歷史耗時自動調整
+
+    Returns:
+        bool: 是否在逾時前就緒（逾時仍可使用當下的頁面內容）
+    """
+    adapter = get_adapter(url)
+    site = adapter.key
+    profile = adapter.readiness
+    limit = timeout if timeout is not None else _adaptive_timeout.timeout_for(site)
+
+    start_time = time.time()
+    try:
+        WebDriverWait(driver, limit, poll_frequency=READINESS_POLL_INTERVAL).until(
+            _ReadinessCondition(profile)
+        )
+        ready = True
+    except Exception:
+        ready = False
+
+    elapsed = time.time() - start_time
+    _adaptive_timeout.record(site, elapsed, ready)
+    if ready:
+        print(f"⚡ 頁面就緒 ({elapsed:.2f}s)")
+    else:
+        print(f"⚠️  等待頁面就緒逾時 ({limit:.1f}s)，使用目前內容")
+    return ready
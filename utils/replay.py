@@ -0,0 +1,133 @@
+"""
+錄製 / 重播模組 - 將抓取到的頁面存成測試資料集，之後可在無網路環境重播
+
+資料集結構（SCRAPE_REPLAY_DIR）:
+    index.json          {鍵值: {url, kind, file, recorded_at, size}}
+    <sha256>.html.gz    頁面內容（kind 為 static 的原始 HTML，或 dynamic 的瀏覽器渲染後 DOM）
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config.settings import SCRAPE_REPLAY_MODE, SCRAPE_REPLAY_DIR
+from utils.url_utils import canonicalize_url
+
+OFF = 'off'
+RECORD = 'record'
+REPLAY = 'replay'
+
+
+class ReplayMiss(Exception):
+    """重播模式下資料集中沒有該頁面"""
+
+
+class ReplayCorpus:
+    """頁面資料集（錄製時寫入、重播時讀取）"""
+
+    def __init__(self, root: str = SCRAPE_REPLAY_DIR, mode: str = SCRAPE_REPLAY_MODE):
+        if mode not in (OFF, RECORD, REPLAY):
+            raise ValueError(f"未知的重播模式: {mode}")
+        self.root = root
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict] = {}
+        if self.mode != OFF:
+            os.makedirs(self.root, exist_ok=True)
+            self._index = self._load_index()
+            print(f"🎞️  {'錄製' if self.recording else '重播'}模式：{self.root}（{len(self._index)} 頁）")
+
+    @property
+    def active(self) -> bool:
+        return self.mode != OFF
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.root, 'index.json')
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _key(url: str, kind: str) -> str:
+        return hashlib.sha256(f"{kind}:{canonicalize_url(url)}".encode('utf-8')).hexdigest()
+
+    def save(self, url: str, html, kind: str = 'static'):
+        """錄製一個頁面（同一網址與種類會覆蓋）"""
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        key = self._key(url, kind)
+        filename = f"{key}.html.gz"
+        with open(os.path.join(self.root, filename), 'wb') as f:
+            f.write(gzip.compress(html))
+
+        with self._lock:
+            self._index[key] = {
+                'url': url,
+                'kind': kind,
+                'file': filename,
+                'recorded_at': time.time(),
+                'size': len(html),
+            }
+            tmp_path = f"{self._index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self._index_path)
+        print(f"🎞️  已錄製 ({kind}): {url[:60]}")
+
+    def load(self, url: str, kind: str = 'static') -> bytes:
+        """
+        讀取錄製的頁面
+
+        Raises:
+            ReplayMiss: 資料集中沒有該頁面
+        """
+        entry = self._index.get(self._key(url, kind))
+        if entry is None:
+            raise ReplayMiss(f"資料集中沒有 {kind} 頁面: {url}")
+        with open(os.path.join(self.root, entry['file']), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def has(self, url: str, kind: str = 'static') -> bool:
+        return self._key(url, kind) in self._index
+
+    def urls(self, kind: Optional[str] = None) -> List[str]:
+        """資料集中的網址（依錄製時間排序，同一網址只列一次）"""
+        entries = sorted(self._index.values(), key=lambda e: e['recorded_at'])
+        seen, urls = set(), []
+        for entry in entries:
+            if kind and entry['kind'] != kind:
+                continue
+            key = canonicalize_url(entry['url'])
+            if key not in seen:
+                seen.add(key)
+                urls.append(entry['url'])
+        return urls
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_replay_corpus() -> ReplayCorpus:
+    """取得全域共用的資料集（依 SCRAPE_REPLAY_MODE 決定錄製或重播）"""
+    global _corpus
+    with _corpus_lock:
+        if _corpus is None:
+            _corpus = ReplayCorpus()
+        return _corpus
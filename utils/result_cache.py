@@ -0,0 +1,124 @@
+"""
+商品解析結果快取模組 - 以標準化網址 + 擷取器版本為鍵，存放解析後的商品資訊（SQLite）
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from config.settings import (
+    RESULT_CACHE_ENABLED,
+    RESULT_CACHE_PATH,
+    RESULT_CACHE_PRICE_TTL,
+    RESULT_CACHE_SPECS_TTL,
+)
+from utils.url_utils import canonicalize_url
+
+
+class CachedResult:
+    """一筆快取結果，價格與規格分別判斷是否過期"""
+
+    def __init__(self, product: Dict, price_fetched_at: float, specs_fetched_at: float,
+                 price_ttl: float, specs_ttl: float):
+        now = time.time()
+        self.product = product
+        self.price_fetched_at = price_fetched_at
+        self.specs_fetched_at = specs_fetched_at
+        self.price_fresh = now - price_fetched_at <= price_ttl
+        self.specs_fresh = now - specs_fetched_at <= specs_ttl
+
+    @property
+    def fresh(self) -> bool:
+        """所有欄位皆未過期，可直接使用"""
+        return self.price_fresh and self.specs_fresh
+
+
+class ResultCache:
+    """解析結果快取（每個執行緒使用獨立連線，WAL 模式允許讀寫並行）"""
+
+    def __init__(self, path: str = RESULT_CACHE_PATH, enabled: bool = RESULT_CACHE_ENABLED,
+                 price_ttl: float = RESULT_CACHE_PRICE_TTL, specs_ttl: float = RESULT_CACHE_SPECS_TTL):
+        self.path = path
+        self.enabled = enabled
+        self.price_ttl = price_ttl
+        self.specs_ttl = specs_ttl
+        self._local = threading.local()
+        if self.enabled:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS product_results (
+                    url TEXT NOT NULL,
+                    extractor_version TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    price_fetched_at REAL NOT NULL,
+                    specs_fetched_at REAL NOT NULL,
+                    PRIMARY KEY (url, extractor_version)
+                )
+            """)
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def get(self, url: str, extractor_version: str) -> Optional[CachedResult]:
+        """讀取快取（可能部分過期），不存在時回傳 None"""
+        if not self.enabled:
+            return None
+        try:
+            row = self._connect().execute(
+                "SELECT data, price_fetched_at, specs_fetched_at FROM product_results "
+                "WHERE url = ? AND extractor_version = ?",
+                (canonicalize_url(url), extractor_version),
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️  結果快取讀取失敗: {e}")
+            return None
+        if not row:
+            return None
+
+        product = json.loads(row[0])
+        product['url'] = url
+        return CachedResult(product, row[1], row[2], self.price_ttl, self.specs_ttl)
+
+    def put(self, url: str, extractor_version: str, product: Dict, specs_fetched_at: float = None):
+        """
+        寫入快取
+
+        Args:
+            specs_fetched_at: 穩定欄位的取得時間；沿用舊規格時傳入原本的時間，避免規格永不過期
+        """
+        if not self.enabled or not product:
+            return
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO product_results VALUES (?, ?, ?, ?, ?)",
+                (canonicalize_url(url), extractor_version,
+                 json.dumps(product, ensure_ascii=False), now,
+                 specs_fetched_at if specs_fetched_at is not None else now),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️  結果快取寫入失敗: {e}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """取得全域共用的結果快取"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
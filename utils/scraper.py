@@ -1,13 +1,24 @@
 """
 爬蟲模組 - 使用 BeautifulSoup 與 Selenium
 """
-import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from config.settings import HEADERS, REQUEST_TIMEOUT, SELENIUM_WAIT_TIME
+from selenium.common.exceptions import WebDriverException
+from config.settings import HEADERS, REQUEST_TIMEOUT, SCRAPE_MAX_WORKERS
+from utils.driver_pool import get_driver_pool, DriverPoolError
+from utils.extraction import extract_fields
+from utils.html_parser import make_soup
+from utils.page_cache import get_page_cache, fetch_html
+from utils.result_cache import get_result_cache
+from utils.price_history import get_price_history
+from utils.replay import get_replay_corpus, ReplayMiss
+from utils.structured_data import extract_structured_data, apply_structured_data, is_complete
+from utils.readiness import wait_for_page_ready
+from utils.site_adapters import get_adapter, STATIC, STRUCTURED
+from utils.rate_limiter import get_rate_limiter
+from utils.site_health import get_site_health, is_site_error, CircuitOpenError
+from utils.single_flight import get_single_flight
+from utils.url_utils import canonicalize_url
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 import time
 import json
 
@@ -20,63 +31,155 @@ except ImportError:
     print("⚠️  圖像識別功能未安裝")
 
 
+@contextmanager
+def network_slot(url):
+    """
+    實際連網前取得網站名額（斷路器、退避、並行數）並依 SITE_RATE_LIMITS 等待
+
+    只包住真正的網路請求：解析結果快取、頁面快取與重播命中時不經過這裡，不需等待限流
+    """
+    with get_site_health().slot(url):
+        get_rate_limiter().acquire(url)
+        yield
+
+
 class ProductScraper:
     """商品爬蟲基類"""
     
+    # 擷取邏輯變更時遞增，使舊的解析結果快取失效
+    EXTRACTOR_VERSION = "scraper-8"
+    
     def __init__(self):
         self.headers = HEADERS
         self.timeout = REQUEST_TIMEOUT
     
     def scrape_static(self, url):
         """爬取靜態頁面 (BeautifulSoup)"""
+        html = self._fetch_static_html(url)
+        return make_soup(html) if html is not None else None
+    
+    def _fetch_static_html(self, url):
+        """取得靜態頁面原始 HTML，失敗時回傳 None"""
+        corpus = get_replay_corpus()
+        if corpus.replaying:
+            try:
+                return corpus.load(url, 'static')
+            except ReplayMiss:
+                return None
+        
+        health = get_site_health()
         try:
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.encoding = 'utf-8'
-            return BeautifulSoup(response.content, 'html.parser')
+            html = fetch_html(url, headers=self.headers, timeout=self.timeout, slot=network_slot)
+        except CircuitOpenError:
+            raise
         except Exception as e:
             print(f"❌ 靜態頁面爬取失敗: {e}")
+            if is_site_error(e):
+                health.record_failure(url, e)
             return None
+        health.record_success(url)
+        if corpus.recording:
+            corpus.save(url, html, 'static')
+        return html
     
     def scrape_dynamic(self, url):
-        """爬取動態頁面 (Selenium)"""
-        driver = None
+        """爬取動態頁面 (Selenium，從瀏覽器池借用 headless Chrome)"""
+        corpus = get_replay_corpus()
+        if corpus.replaying:
+            try:
+                return make_soup(corpus.load(url, 'dynamic'))
+            except ReplayMiss as e:
+                print(f"❌ 動態頁面爬取失敗: {e}")
+                return None
+        
+        cache = get_page_cache()
+        cached = cache.get(url, kind='dynamic')
+        if cached:
+            print(f"💾 使用已渲染頁面快取: {url[:60]}")
+            if corpus.recording:
+                corpus.save(url, cached.html, 'dynamic')
+            return make_soup(cached.html.decode('utf-8'))
+        
         try:
-            options = webdriver.ChromeOptions()
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--start-maximized')
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            options.add_experimental_option('useAutomationExtension', False)
-            
-            driver = webdriver.Chrome(options=options)
-            
-            # 添加 User-Agent
-            driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-                "userAgent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            })
+            with network_slot(url), get_driver_pool().borrow() as driver:
+                driver.get(url)
+                
+                # 等待價格等資料載入完成（條件成立即返回）
+                ready = wait_for_page_ready(driver, url)
+                page_source = driver.page_source
             
-            driver.get(url)
-            
-            # 等待頁面加載
-            WebDriverWait(driver, SELENIUM_WAIT_TIME).until(
-                EC.presence_of_all_elements_located((By.TAG_NAME, "body"))
-            )
-            
-            time.sleep(3)  # 額外等待時間確保 JS 執行完成
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            # 逾時的內容可能是驗證頁或載入不完整，只用於本次擷取，不寫入快取
+            if ready:
+                cache.put(url, page_source.encode('utf-8'), kind='dynamic')
+            if corpus.recording:
+                corpus.save(url, page_source, 'dynamic')
+            soup = make_soup(page_source)
+            get_site_health().record_success(url)
             return soup
             
+        except CircuitOpenError:
+            raise
+        except DriverPoolError as e:
+            # 瀏覽器池忙碌或無法啟動是本機資源問題，不計入網站失敗
+            print(f"❌ 動態頁面爬取失敗: {e}")
+            return None
+        except WebDriverException as e:
+            print(f"❌ 動態頁面爬取失敗: {e}")
+            get_site_health().record_failure(url, e)
+            return None
         except Exception as e:
             print(f"❌ 動態頁面爬取失敗: {e}")
             return None
-        finally:
-            if driver:
-                driver.quit()
+    
+    def load_page(self, url, is_dynamic=False):
+        """
+        取得商品頁面
+        
+        依網站轉接器的抓取策略：需要動態渲染時，先以一般 HTTP 取得頁面並嘗試內嵌的
+        結構化資料（JSON-LD 等），資料完整就不啟動瀏覽器；否則再使用 Selenium，
+        失敗時降級為靜態頁面。
+        
+        Returns:
+            tuple: (soup 或 None, 結構化資料 dict)
+        
+        Raises:
+            CircuitOpenError: 需要連網但該網站斷路器開啟中（快取命中時仍可取得頁面）
+        """
+        # 依網站決定抓取策略（如 Momo 價格通過 JS 載入，先嘗試內嵌資料再使用瀏覽器）
+        strategy = get_adapter(url).strategy_for(is_dynamic)
+        
+        html = None
+        structured = {}
+        if strategy != STATIC:
+            if strategy == STRUCTURED:
+                html = self._fetch_static_html(url)
+                if html is not None:
+                    structured = extract_structured_data(html)
+                    if is_complete(structured):
+                        print(f"⚡ 使用內嵌結構化資料 ({structured['source']})，略過瀏覽器")
+                        return make_soup(html), structured
+            
+            soup = self.scrape_dynamic(url)
+            if soup:
+                return soup, structured
+            if get_site_health().is_open(url):
+                # 網站已被判定異常，不再耗費一次靜態請求
+                return None, structured
+            
+            # 如果動態爬取失敗，降級到靜態爬取
+            print(f"⚠️  動態爬取失敗，降級到靜態爬取...")
+        
+        if html is None:
+            html = self._fetch_static_html(url)
+        if html is None:
+            return None, structured
+        if not structured:
+            structured = extract_structured_data(html)
+        return make_soup(html), structured
     
     def extract_product_info(self, url, is_dynamic=False):
         """
-        提取商品資訊
+        提取商品資訊（同一標準化網址同時只爬取一次，其餘呼叫共用結果）
         
         Args:
             url: 商品連結
@@ -85,164 +188,131 @@ class ProductScraper:
         Returns:
             dict: 商品資訊 {name, price, specs, reviews, url}
         """
-        # Momo 商品自動使用動態爬取（因為價格通過 JS 載入）
-        if 'momo.com.tw' in url.lower():
-            is_dynamic = True
+        key = (self.EXTRACTOR_VERSION, canonicalize_url(url))
+        product, shared = get_single_flight().do(key, lambda: self._extract_product_info(url, is_dynamic))
+        if shared and product:
+            print(f"🔗 共用進行中的爬取結果: {url[:60]}")
+            product = dict(product, url=url)
+        return product
+    
+    def _extract_product_info(self, url, is_dynamic=False):
+        """提取商品資訊（實際爬取與解析）"""
+        # 已解析過且未過期：直接使用，不啟動瀏覽器與圖像識別
+        result_cache = get_result_cache()
+        cached = result_cache.get(url, self.EXTRACTOR_VERSION)
+        if cached and cached.fresh:
+            print(f"💾 使用商品解析快取: {url[:60]}")
+            product_info = dict(cached.product)
+            product_info.setdefault('fetched_at', cached.price_fetched_at)
+            return product_info
+        
+        soup, structured = self.load_page(url, is_dynamic)
+        if not soup:
+            return None
         
-        # 先嘗試動態爬取
-        soup = None
-        if is_dynamic:
-            soup = self.scrape_dynamic(url)
+        # 單次走訪 DOM 取得所有欄位（只用該網站的選擇器），內嵌結構化資料優先
+        adapter = get_adapter(url)
+        extraction = extract_fields(soup, adapter.plan)
+        apply_structured_data(extraction.values, structured)
+        
+        # 規格（含 Gemini Vision）仍有效時只更新價格等易變欄位
+        if cached and cached.specs_fresh:
+            print(f"💾 沿用快取規格，只更新價格: {url[:60]}")
+            product_info = dict(cached.product)
+            product_info.update({
+                "price": extraction.values['price'],
+                "rating": extraction.values['rating']
+            })
+            specs_fetched_at = cached.specs_fetched_at
+        else:
+            product_info = {
+                "url": url,
+                "name": extraction.values['name'],
+                "price": extraction.values['price'],
+                "specs": {**structured.get('specs', {}),
+                          **self._extract_specs(soup, extraction, adapter.image_specs)},
+                "reviews": extraction.reviews,
+                "rating": extraction.values['rating']
+            }
+            specs_fetched_at = None
+        # 價格的實際取得時間：價格歷史以此去重，快取或共用的結果不會重複記錄
+        product_info['fetched_at'] = time.time()
+        
+        # 解析不到價格多半是頁面異常，不寫入快取
+        if product_info["price"] > 0:
+            result_cache.put(url, self.EXTRACTOR_VERSION, product_info, specs_fetched_at)
         
-        # 如果動態爬取失敗，降級到靜態爬取
-        if not soup:
-            print(f"⚠️  動態爬取失敗，降級到靜態爬取...")
-            soup = self.scrape_static(url)
+        return product_info
+    
+    def refresh_price(self, url, known=None, is_dynamic=False):
+        """
+        只更新價格、評分與庫存，沿用已知的規格與評論（不解析規格表、不呼叫圖像識別）
+        
+        Args:
+            url: 商品連結
+            known: 先前的商品資訊；未提供時使用解析結果快取，兩者皆無則完整爬取
+            is_dynamic: 是否為動態頁面
         
+        Returns:
+            dict: 更新價格後的商品資訊，失敗（含頁面上沒有價格）時回傳 None
+        """
+        result_cache = get_result_cache()
+        cached = result_cache.get(url, self.EXTRACTOR_VERSION)
+        if known is None:
+            if cached is None:
+                return self.extract_product_info(url, is_dynamic)
+            known = cached.product
+        
+        product_info = dict(known)
+        if cached and cached.price_fresh:
+            print(f"💾 價格仍在有效期內: {url[:60]}")
+            product_info['price'] = cached.product['price']
+            product_info['fetched_at'] = cached.product.get('fetched_at', cached.price_fetched_at)
+            return product_info
+        
+        soup, structured = self.load_page(url, is_dynamic)
         if not soup:
             return None
         
-        # 通用爬取邏輯（簡化版，實際需根據各平台調整）
-        product_info = {
-            "url": url,
-            "name": self._extract_name(soup),
-            "price": self._extract_price(soup),
-            "specs": self._extract_specs(soup),
-            "reviews": self._extract_reviews(soup),
-            "rating": self._extract_rating(soup)
-        }
+        extraction = extract_fields(soup, get_adapter(url).plan)
+        apply_structured_data(extraction.values, structured)
+        if not extraction.values['price'] or extraction.values['price'] <= 0:
+            # 驗證頁或版面變更時頁面上沒有價格，視為更新失敗，保留原本的價格
+            print(f"⚠️  未取得價格，保留原資料: {url[:60]}")
+            return None
+        product_info.update({
+            "price": extraction.values['price'],
+            "rating": extraction.values['rating'] or product_info.get('rating', 0),
+            "fetched_at": time.time(),
+        })
+        if structured.get('availability'):
+            product_info['availability'] = structured['availability']
+        
+        # 只有快取中已有規格時才寫回（保留原本的規格擷取時間）
+        if cached:
+            result_cache.put(url, self.EXTRACTOR_VERSION, product_info, cached.specs_fetched_at)
         
         return product_info
     
     def _extract_name(self, soup):
         """提取商品名稱"""
-        # Momo 特定選擇器
-        momo_selectors = [
-            'h1.title',
-            'h1[class*="title"]',
-            'div.goods-name',
-            'span.goods-title',
-            'div[data-testid*="name"]'
-        ]
-        
-        # 通用選擇器
-        general_selectors = ['h1', '.product-title', '[data-name]', '.title', 'h2']
-        
-        all_selectors = momo_selectors + general_selectors
-        
-        for selector in all_selectors:
-            try:
-                elem = soup.select_one(selector)
-                if elem:
-                    name = elem.get_text(strip=True)
-                    if name and len(name) > 3:  # 確保不是太短的文本
-                        return name
-            except:
-                continue
-        
-        return "未知商品"
+        return extract_fields(soup).values['name']
     
     def _extract_price(self, soup):
         """提取價格 - 支援多個平台，優先提取促銷價"""
-        
-        # === Momo 特定邏輯：優先使用促銷價，否則使用市售價 ===
-        # 促銷價 (紅色顯示的價格)
-        promo_price = soup.find('span', class_='seoPrice')
-        if promo_price:
-            text = promo_price.get_text(strip=True)
-            price_str = ''.join(c for c in text if c.isdigit() or c in '.,')
-            price_str = price_str.replace(',', '')
-            try:
-                price = float(price_str)
-                if price > 0:
-                    return price
-            except:
-                pass
-        
-        # 市售價 (刪除線的價格)
-        sale_price = soup.find('del', class_='seoPrice')
-        if sale_price:
-            text = sale_price.get_text(strip=True)
-            price_str = ''.join(c for c in text if c.isdigit() or c in '.,')
-            price_str = price_str.replace(',', '')
-            try:
-                price = float(price_str)
-                if price > 0:
-                    return price
-            except:
-                pass
-        
-        # === 備用選擇器（其他平台或結構） ===
-        momo_selectors = [
-            'span.money',                      # Momo 主要價格
-            'p.current-price span.money',      # Momo 完整路徑
-            'span[class*="money"]',            # Momo 模糊匹配
-            'div.goods-price',
-            'strong.price',
-            'em.price',
-            'span[class*="salesprice"]',
-            'span[class*="sale-price"]',
-        ]
-        
-        # 通用選擇器（備用）
-        general_selectors = [
-            '.price', '[data-price]', '.product-price', '.sale-price', 
-            '.final-price', '.current-price', '.priceText'
-        ]
-        
-        all_selectors = momo_selectors + general_selectors
-        
-        for selector in all_selectors:
-            try:
-                elem = soup.select_one(selector)
-                if elem:
-                    # 嘗試從 data 屬性中獲取
-                    if elem.get('data-price'):
-                        try:
-                            return float(elem.get('data-price'))
-                        except:
-                            pass
-                    
-                    # 從文本內容中提取
-                    text = elem.get_text(strip=True)
-                    if text:
-                        # 移除非數字字元（保留小數點和逗號）
-                        price_str = ''.join(c for c in text if c.isdigit() or c in '.,')
-                        
-                        # 移除逗號（千位分隔符）
-                        price_str = price_str.replace(',', '')
-                        
-                        # 移除多個小數點，只保留最後一個
-                        if price_str.count('.') > 1:
-                            parts = price_str.split('.')
-                            price_str = '.'.join([parts[0], parts[-1]])
-                        
-                        if price_str and price_str != '.':
-                            try:
-                                price = float(price_str)
-                                if price > 0:  # 確保價格有效
-                                    return price
-                            except ValueError:
-                                continue
-            except:
-                continue
-        
-        return 0
+        return extract_fields(soup).values['price']
     
-    def _extract_specs(self, soup):
-        """提取規格資訊 - 支援 Momo 結構並使用圖像識別"""
+    def _extract_specs(self, soup, extraction=None, image_specs=True):
+        """提取規格資訊 - 支援 Momo 結構並使用圖像識別（image_specs 為 False 時略過）"""
+        if extraction is None:
+            extraction = extract_fields(soup)
         specs = {}
         
         # === Momo 規格表結構 ===
-        # 嘗試找到規格容器
-        spec_containers = soup.find_all(['dl', 'table', 'div'], class_=lambda x: x and any(
-            keyword in x.lower() for keyword in ['spec', 'attribute', 'property', 'info', 'detail', '規格']
-        ))
-        
-        # 嘗試 DL/DT/DD 結構
-        for container in spec_containers:
-            dts = container.find_all('dt') if container.find_all('dt') else []
-            dds = container.find_all('dd') if container.find_all('dd') else []
+        # 嘗試 DL/DT/DD 結構（class 含規格關鍵字的容器）
+        for container in extraction.spec_containers:
+            dts = container.find_all('dt')
+            dds = container.find_all('dd')
             
             for dt, dd in zip(dts, dds):
                 key = dt.get_text(strip=True)
@@ -251,8 +321,7 @@ class ProductScraper:
                     specs[key] = value
         
         # 嘗試表格結構
-        tables = soup.find_all('table')
-        for table in tables:
+        for table in extraction.tables:
             rows = table.find_all('tr')
             for row in rows:
                 cells = row.find_all(['td', 'th'])
@@ -265,24 +334,21 @@ class ProductScraper:
         # 嘗試 Div 結構（Momo 常用）
         if not specs:
             # 尋找包含「規格」或「特性」的 div
-            spec_divs = soup.find_all('div', class_=lambda x: x and any(
-                kw in x.lower() for kw in ['spec', 'detail', 'property', 'info']
-            ))
-            
-            for div in spec_divs:
+            for div in extraction.spec_divs:
                 # 尋找標籤和數值對
                 labels = div.find_all(['label', 'strong', 'b'], limit=10)
                 for label in labels:
                     label_text = label.get_text(strip=True)
                     # 找到緊鄰的值
-                    next_elem = label.find_next('span', 'div', 'td', 'dd')
+                    next_elem = label.find_next(['span', 'div', 'td', 'dd'])
                     if next_elem:
                         value_text = next_elem.get_text(strip=True)
                         if label_text and value_text:
                             specs[label_text] = value_text
         
         # === MOMO 特定：使用圖像識別補充規格 ===
-        if IMAGE_RECOGNITION_AVAILABLE:
+        # 錄製 / 重播時略過需呼叫 Gemini Vision 的圖像識別（重播不連網，兩者結果才能比對）
+        if IMAGE_RECOGNITION_AVAILABLE and image_specs and not get_replay_corpus().active:
             print("🖼️  嘗試從規格圖像中提取資訊...")
             try:
                 image_specs = extract_momo_specs_from_images(soup)
@@ -296,78 +362,112 @@ class ProductScraper:
     
     def _extract_reviews(self, soup):
         """提取評論與評價"""
-        reviews = []
-        review_elements = soup.find_all(['div', 'li'], class_=lambda x: x and 'review' in x.lower())
-        
-        for elem in review_elements[:5]:  # 限制5則評論
-            review_text = elem.get_text(strip=True)
-            if review_text:
-                reviews.append(review_text)
-        
-        return reviews
+        return extract_fields(soup).reviews
     
     def _extract_rating(self, soup):
         """提取評分"""
-        # Momo 特定選擇器
-        momo_selectors = [
-            'span.rating-score',
-            'div[class*="rating"]',
-            'span[class*="score"]',
-            'div.star-score',
-            'span[class*="mrate"]',        # Momo 評分
-            'div[data-testid*="rating"]'
-        ]
-        
-        # 通用選擇器
-        general_selectors = ['.rating', '[data-rating]', '.star', '.score', '.rate']
-        
-        all_selectors = momo_selectors + general_selectors
-        
-        for selector in all_selectors:
-            try:
-                elem = soup.select_one(selector)
-                if elem:
-                    text = elem.get_text(strip=True)
-                    # 提取數字部分
-                    numbers = [c for c in text if c.isdigit() or c == '.']
-                    if numbers:
-                        rating_str = ''.join(numbers)
-                        try:
-                            rating = float(rating_str)
-                            if 0 <= rating <= 5.0:  # 確保評分在有效範圍
-                                return rating
-                        except ValueError:
-                            continue
-            except:
-                continue
-        
-        return 0
+        return extract_fields(soup).values['rating']
+
+
+def _scrape_one(scraper, url, is_dynamic, known=None):
+    """爬取單一商品（網站健康狀態與限流只在實際連網時套用，見 network_slot），回傳 (商品資訊, 耗時秒數)"""
+    start_time = time.time()
+    try:
+        if known is not None:
+            product = scraper.refresh_price(url, known, is_dynamic)
+        else:
+            product = scraper.extract_product_info(url, is_dynamic)
+    except CircuitOpenError as e:
+        print(f"⛔ 略過 {url[:60]}: {e}")
+        product = None
+    elapsed = time.time() - start_time
+    
+    if product:
+        product['scrape_time'] = round(elapsed, 2)
+        get_price_history().record(product)
+    return product, elapsed
 
 
-def scrape_products(urls, is_dynamic=False):
+def iter_scrape_products(urls, is_dynamic=False, max_workers=None, known=None):
     """
-    批次爬取多個商品
+    批次爬取多個商品，每完成一個就立即產出（依完成順序，而非輸入順序）
     
     Args:
         urls: 商品連結列表
         is_dynamic: 是否為動態頁面
+        max_workers: 同時爬取數量，預設 SCRAPE_MAX_WORKERS；設為 1 即依序爬取
+        known: {url: 已知商品資訊}，有列出的商品只更新價格（見 ProductScraper.refresh_price）
     
-    Returns:
-        list: 商品資訊列表
+    Yields:
+        tuple: (輸入序號, url, 商品資訊或 None, 耗時秒數)
     """
+    if not urls:
+        return
+    
     scraper = ProductScraper()
-    products = []
+    workers = max(1, min(max_workers or SCRAPE_MAX_WORKERS, len(urls)))
     
-    for i, url in enumerate(urls, 1):
-        print(f"⏳ 正在爬取第 {i}/{len(urls)} 個商品...")
-        product = scraper.extract_product_info(url, is_dynamic)
+    print(f"⏳ 開始爬取 {len(urls)} 個商品（並行數 {workers}）...")
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            executor.submit(_scrape_one, scraper, url, is_dynamic, (known or {}).get(url)): (index, url)
+            for index, url in enumerate(urls)
+        }
         
+        for done, future in enumerate(as_completed(futures), 1):
+            index, url = futures[future]
+            try:
+                product, elapsed = future.result()
+            except Exception as e:
+                print(f"❌ 爬取例外 ({url}): {e}")
+                product, elapsed = None, 0.0
+            
+            if product:
+                print(f"✅ [{done}/{len(urls)}] 成功爬取 ({elapsed:.2f}s): {product['name'][:50]}")
+            else:
+                print(f"⚠️  [{done}/{len(urls)}] 爬取失敗 ({elapsed:.2f}s): {url}")
+            yield index, url, product, elapsed
+    finally:
+        # 呼叫端提前停止迭代時，取消尚未開始的工作
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def scrape_products(urls, is_dynamic=False, max_workers=None):
+    """
+    批次爬取多個商品（不同網站並行，同一網站依 SITE_RATE_LIMITS 限流）
+    
+    Args:
+        urls: 商品連結列表
+        is_dynamic: 是否為動態頁面
+        max_workers: 同時爬取數量，預設 SCRAPE_MAX_WORKERS；設為 1 即依序爬取
+    
+    Returns:
+        list: 商品資訊列表（依輸入順序，每筆含 scrape_time 秒數）
+    """
+    results = {}
+    for index, _, product, _ in iter_scrape_products(urls, is_dynamic, max_workers):
         if product:
-            products.append(product)
-            print(f"✅ 成功爬取: {product['name'][:50]}")
-        else:
-            print(f"⚠️  爬取失敗: {url}")
-        
-        time.sleep(1)  # 避免過於頻繁的請求
+            results[index] = product
+    return [results[index] for index in sorted(results)]
+
+
+def refresh_prices(products, is_dynamic=False, max_workers=None):
+    """
+    批次更新已知商品的價格（沿用規格與評論，適合定期重新比價）
     
-    return products
+    Args:
+        products: 先前爬取的商品資訊列表（需含 url）
+        is_dynamic: 是否為動態頁面
+        max_workers: 同時更新數量，預設 SCRAPE_MAX_WORKERS
+    
+    Returns:
+        list: 商品資訊列表（依輸入順序；更新失敗的商品保留原資料）
+    """
+    known = {product['url']: product for product in products}
+    urls = list(known)
+    results = {}
+    for index, _, product, _ in iter_scrape_products(urls, is_dynamic, max_workers, known=known):
+        if product:
+            results[index] = product
+    return [results.get(index, known[url]) for index, url in enumerate(urls)]
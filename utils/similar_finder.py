@@ -1,9 +1,14 @@
 """
 相似商品搜尋模組 - 自動找出相似商品
 """
-import requests
-from bs4 import BeautifulSoup
 from config.settings import HEADERS, REQUEST_TIMEOUT
+from utils.extraction import extract_fields
+from utils.result_cache import get_result_cache
+from utils.scraper import ProductScraper
+from utils.site_adapters import get_adapter
+from utils.single_flight import get_single_flight
+from utils.url_utils import canonicalize_url
+from utils.structured_data import apply_structured_data
 import re
 from typing import List, Dict
 
@@ -11,6 +16,9 @@ from typing import List, Dict
 class SimilarProductFinder:
     """尋找相似商品"""
     
+    # 擷取邏輯變更時遞增，使舊的解析結果快取失效
+    EXTRACTOR_VERSION = "finder-8"
+    
     def __init__(self):
         self.headers = HEADERS
         self.timeout = REQUEST_TIMEOUT
@@ -28,187 +36,57 @@ class SimilarProductFinder:
                 'url': str
             }
         """
+        key = (self.EXTRACTOR_VERSION, canonicalize_url(url))
+        product_info, shared = get_single_flight().do(key, lambda: self._extract_product_info(url))
+        if shared and product_info:
+            print(f"🔗 共用進行中的爬取結果: {url[:60]}")
+            product_info = dict(product_info, url=url)
+        return product_info
+    
+    def _extract_product_info(self, url: str) -> Dict:
+        """提取商品資訊（實際爬取與解析，同一網址的並行呼叫由 single-flight 合併）"""
         try:
-            # Momo 商品自動使用動態爬取
-            is_dynamic = 'momo.com.tw' in url.lower()
+            result_cache = get_result_cache()
+            cached = result_cache.get(url, self.EXTRACTOR_VERSION)
+            if cached and cached.fresh:
+                print(f"💾 使用商品解析快取: {url[:60]}")
+                return cached.product
             
-            if is_dynamic:
-                from selenium import webdriver
-                from selenium.webdriver.common.by import By
-                from selenium.webdriver.support.ui import WebDriverWait
-                from selenium.webdriver.support import expected_conditions as EC
-                import time
-                
-                driver = None
-                try:
-                    options = webdriver.ChromeOptions()
-                    options.add_argument('--no-sandbox')
-                    options.add_argument('--disable-dev-shm-usage')
-                    options.add_argument('--start-maximized')
-                    
-                    driver = webdriver.Chrome(options=options)
-                    driver.get(url)
-                    
-                    # 等待價格元素載入
-                    WebDriverWait(driver, 10).until(
-                        EC.presence_of_all_elements_located((By.CLASS_NAME, "money"))
-                    )
-                    time.sleep(2)
-                    
-                    soup = BeautifulSoup(driver.page_source, 'html.parser')
-                except:
-                    # Selenium 失敗，回退到靜態爬取
-                    response = requests.get(url, headers=self.headers, timeout=self.timeout)
-                    response.encoding = 'utf-8'
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                finally:
-                    if driver:
-                        driver.quit()
-            else:
-                response = requests.get(url, headers=self.headers, timeout=self.timeout)
-                response.encoding = 'utf-8'
-                soup = BeautifulSoup(response.content, 'html.parser')
+            # 依網站轉接器決定抓取策略；與 ProductScraper 共用結構化資料快速路徑、瀏覽器池、頁面快取與限流
+            soup, structured = ProductScraper().load_page(url)
+            if soup is None:
+                return None
             
-            # 提取基本資訊
+            # 提取基本資訊（單次走訪 DOM），內嵌結構化資料優先
+            extraction = extract_fields(soup, get_adapter(url).plan)
+            apply_structured_data(extraction.values, structured)
             product_info = {
-                'name': self._extract_name(soup),
-                'price': self._extract_price(soup),
-                'category': self._extract_category(soup, url),
-                'specs': self._extract_specs(soup),
+                'name': extraction.values['name'],
+                'price': extraction.values['price'],
+                'category': self._extract_category(soup, url, extraction),
+                'specs': {**structured.get('specs', {}), **self._extract_specs(soup, extraction)},
                 'url': url,
-                'reviews': self._extract_reviews(soup),
-                'rating': self._extract_rating(soup)
+                'reviews': extraction.reviews,
+                'rating': extraction.values['rating']
             }
             
+            if product_info['price'] > 0:
+                result_cache.put(url, self.EXTRACTOR_VERSION, product_info)
+            
             return product_info
             
         except Exception as e:
             print(f"❌ 提取失敗: {e}")
             return None
     
-    def _extract_name(self, soup):
-        """提取商品名稱"""
-        # Momo 特定選擇器
-        momo_selectors = [
-            'h1.title',
-            'h1[class*="title"]',
-            'div.goods-name',
-            'span.goods-title',
-            'div[data-testid*="name"]'
-        ]
-        
-        # 通用選擇器
-        general_selectors = ['h1', '.product-title', '[data-name]', '.title', 'h2']
-        
-        all_selectors = momo_selectors + general_selectors
-        
-        for selector in all_selectors:
-            try:
-                elem = soup.select_one(selector)
-                if elem:
-                    name = elem.get_text(strip=True)
-                    if name and len(name) > 3:  # 確保不是太短的文本
-                        return name
-            except:
-                continue
-        
-        return "未知商品"
-    
-    def _extract_price(self, soup):
-        """提取價格 - 支援多個平台，優先提取促銷價"""
-        
-        # === Momo 特定邏輯：優先使用促銷價，否則使用市售價 ===
-        # 促銷價 (紅色顯示的價格)
-        promo_price = soup.find('span', class_='seoPrice')
-        if promo_price:
-            text = promo_price.get_text(strip=True)
-            price_str = ''.join(c for c in text if c.isdigit() or c in '.,')
-            price_str = price_str.replace(',', '')
-            try:
-                price = float(price_str)
-                if price > 0:
-                    return price
-            except:
-                pass
-        
-        # 市售價 (刪除線的價格)
-        sale_price = soup.find('del', class_='seoPrice')
-        if sale_price:
-            text = sale_price.get_text(strip=True)
-            price_str = ''.join(c for c in text if c.isdigit() or c in '.,')
-            price_str = price_str.replace(',', '')
-            try:
-                price = float(price_str)
-                if price > 0:
-                    return price
-            except:
-                pass
-        
-        # === 備用選擇器（其他平台或結構） ===
-        momo_selectors = [
-            'span.money',                      # Momo 主要價格
-            'p.current-price span.money',      # Momo 完整路徑
-            'span[class*="money"]',            # Momo 模糊匹配
-            'div.goods-price',
-            'strong.price',
-            'em.price',
-            'span[class*="salesprice"]',
-            'span[class*="sale-price"]',
-        ]
-        
-        # 通用選擇器（備用）
-        general_selectors = [
-            '.price', '[data-price]', '.product-price', '.sale-price', 
-            '.final-price', '.current-price', '.priceText'
-        ]
-        
-        all_selectors = momo_selectors + general_selectors
-        
-        for selector in all_selectors:
-            try:
-                elem = soup.select_one(selector)
-                if elem:
-                    # 嘗試從 data 屬性中獲取
-                    if elem.get('data-price'):
-                        try:
-                            return float(elem.get('data-price'))
-                        except:
-                            pass
-                    
-                    # 從文本內容中提取
-                    text = elem.get_text(strip=True)
-                    if text:
-                        # 移除非數字字元（保留小數點和逗號）
-                        price_str = ''.join(c for c in text if c.isdigit() or c in '.,')
-                        
-                        # 移除逗號（千位分隔符）
-                        price_str = price_str.replace(',', '')
-                        
-                        # 移除多個小數點，只保留最後一個
-                        if price_str.count('.') > 1:
-                            parts = price_str.split('.')
-                            price_str = '.'.join([parts[0], parts[-1]])
-                        
-                        if price_str and price_str != '.':
-                            try:
-                                price = float(price_str)
-                                if price > 0:  # 確保價格有效
-                                    return price
-                            except ValueError:
-                                continue
-            except:
-                continue
-        
-        return 0
-    
-    def _extract_category(self, soup, url: str) -> str:
+    def _extract_category(self, soup, url: str, extraction=None) -> str:
         """提取商品類別"""
+        if extraction is None:
+            extraction = extract_fields(soup)
+        
         # 嘗試從麵包屑導航提取
-        breadcrumb = soup.select_one('.breadcrumb, .breadcrumbs')
-        if breadcrumb:
-            items = breadcrumb.find_all(['li', 'a'])
-            if len(items) >= 2:
-                return items[-2].get_text(strip=True)
+        if extraction.values['category']:
+            return extraction.values['category']
         
         # 從URL提取
         if 'phone' in url or 'iphone' in url or 'samsung' in url:
@@ -224,14 +102,14 @@ class SimilarProductFinder:
         
         return '電子產品'
     
-    def _extract_specs(self, soup) -> dict:
+    def _extract_specs(self, soup, extraction=None) -> dict:
         """提取規格"""
+        if extraction is None:
+            extraction = extract_fields(soup)
         specs = {}
         
         # 尋找規格表
-        spec_sections = soup.find_all(['dl', '.specs', '[data-specs]'])
-        
-        for section in spec_sections:
+        for section in extraction.dls:
             dts = section.find_all('dt')
             dds = section.find_all('dd')
             
@@ -243,55 +121,6 @@ class SimilarProductFinder:
         
         return specs
     
-    def _extract_reviews(self, soup) -> list:
-        """提取評論"""
-        reviews = []
-        review_elements = soup.find_all(['div', 'li'], class_=lambda x: x and 'review' in x.lower())
-        
-        for elem in review_elements[:5]:
-            review_text = elem.get_text(strip=True)
-            if review_text:
-                reviews.append(review_text)
-        
-        return reviews
-    
-    def _extract_rating(self, soup) -> float:
-        """提取評分"""
-        # Momo 特定選擇器
-        momo_selectors = [
-            'span.rating-score',
-            'div[class*="rating"]',
-            'span[class*="score"]',
-            'div.star-score',
-            'span[class*="mrate"]',        # Momo 評分
-            'div[data-testid*="rating"]'
-        ]
-        
-        # 通用選擇器
-        general_selectors = ['.rating', '[data-rating]', '.star', '.score', '.rate']
-        
-        all_selectors = momo_selectors + general_selectors
-        
-        for selector in all_selectors:
-            try:
-                elem = soup.select_one(selector)
-                if elem:
-                    text = elem.get_text(strip=True)
-                    # 提取數字部分
-                    numbers = [c for c in text if c.isdigit() or c == '.']
-                    if numbers:
-                        rating_str = ''.join(numbers)
-                        try:
-                            rating = float(rating_str)
-                            if 0 <= rating <= 5.0:  # 確保評分在有效範圍
-                                return rating
-                        except ValueError:
-                            continue
-            except:
-                continue
-        
-        return 0
-    
     def generate_search_queries(self, product_info: Dict) -> List[str]:
         """
         生成搜尋查詢
@@ -360,13 +189,8 @@ class SimilarProductFinder:
             return []
         
         # 判斷平台
-        if 'momo.com.tw' in product_url:
-            platform = 'momo'
-        elif 'pchome' in product_url:
-            platform = 'pchome'
-        elif 'shopee' in product_url:
-            platform = 'shopee'
-        else:
+        platform = get_adapter(product_url).key
+        if platform not in ('momo', 'pchome', 'shopee'):
             platform = 'momo'  # 預設
         
         print(f"\n{'='*60}")
@@ -0,0 +1,75 @@
+"""
+Single-flight 模組 - 同一鍵值同時只執行一次，其他呼叫等待並共用結果
+
+兩位使用者比較重疊的商品清單時，同一商品只會被爬取一次
+"""
+import threading
+from typing import Callable, Dict, Hashable
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """合併同一鍵值的並行呼叫"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable):
+        """
+        執行 fn()；若相同 key 的呼叫進行中，則等待其結果
+
+        Returns:
+            tuple: (結果, 是否共用了其他呼叫的結果)
+
+        Raises:
+            進行中的呼叫拋出的例外也會傳給所有等待者
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """取得全域共用的 single-flight（跨批次與跨使用者）"""
+    global _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+        return _single_flight
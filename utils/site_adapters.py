@@ -0,0 +1,155 @@
+"""
+網站轉接器模組 - 依主機名稱選出各網站專用的選擇器、抓取策略與就緒條件
+
+每個網站只嘗試自己的選擇器（加上少量通用備用），不必對每頁逐一嘗試所有網站的選擇器
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from config.settings import STRUCTURED_DATA_FAST_PATH
+from utils.extraction import (
+    GENERIC_NAME_SELECTORS,
+    GENERIC_PRICE_SELECTORS,
+    GENERIC_RATING_SELECTORS,
+    NAME_SELECTORS,
+    PRICE_SELECTORS,
+    RATING_SELECTORS,
+    ExtractionPlan,
+    build_product_plan,
+)
+from utils.rate_limiter import get_site_key
+
+# 抓取策略
+STATIC = 'static'          # 一般 HTTP 即可取得價格
+DYNAMIC = 'dynamic'        # 需要瀏覽器執行 JavaScript
+STRUCTURED = 'structured'  # 先讀內嵌結構化資料，不完整時再使用瀏覽器
+
+DEFAULT_READINESS = {
+    'price': ['.price', '[data-price]', '.product-price', '.sale-price', '.current-price'],
+    'specs': ['dl', 'table', 'div[class*="spec"]'],
+}
+
+
+class SiteAdapter:
+    """單一網站的擷取設定"""
+
+    def __init__(self, key: str, name_selectors: List[str], price_selectors: List[str],
+                 rating_selectors: List[str], fetch_strategy: str = STATIC,
+                 readiness: Optional[Dict[str, List[str]]] = None, image_specs: bool = False):
+        """
+        Args:
+            key: 網站鍵值（對應 SUPPORTED_SITES）
+            name_selectors / price_selectors / rating_selectors: 依優先順序的選擇器
+            fetch_strategy: STATIC、DYNAMIC 或 STRUCTURED
+            readiness: 瀏覽器就緒條件 {'price': [...], 'specs': [...]}
+            image_specs: 是否從規格圖片辨識規格
+        """
+        self.key = key
+        self.plan: ExtractionPlan = build_product_plan(name_selectors, price_selectors, rating_selectors)
+        self.fetch_strategy = fetch_strategy
+        self.readiness = readiness or DEFAULT_READINESS
+        self.image_specs = image_specs
+
+    def strategy_for(self, is_dynamic: bool = False) -> str:
+        """實際使用的抓取策略（使用者指定動態時，靜態網站也改為先讀內嵌資料再使用瀏覽器）"""
+        strategy = self.fetch_strategy
+        if is_dynamic and strategy == STATIC:
+            strategy = STRUCTURED
+        if strategy == STRUCTURED and not STRUCTURED_DATA_FAST_PATH:
+            strategy = DYNAMIC
+        return strategy
+
+    def __repr__(self):
+        return f"SiteAdapter({self.key!r}, {self.fetch_strategy})"
+
+
+ADAPTERS: Dict[str, SiteAdapter] = {
+    # 價格由 JavaScript 載入，但頁面常內嵌 JSON-LD
+    'momo': SiteAdapter(
+        'momo',
+        name_selectors=['h1.title', 'h1[class*="title"]', 'div.goods-name', 'span.goods-title',
+                        'div[data-testid*="name"]', *GENERIC_NAME_SELECTORS],
+        price_selectors=['span.seoPrice', 'del.seoPrice', 'span.money', 'p.current-price span.money',
+                         'span[class*="money"]', 'div.goods-price', *GENERIC_PRICE_SELECTORS],
+        rating_selectors=['span.rating-score', 'div[class*="rating"]', 'span[class*="score"]',
+                          'div.star-score', 'span[class*="mrate"]', 'div[data-testid*="rating"]',
+                          *GENERIC_RATING_SELECTORS],
+        fetch_strategy=STRUCTURED,
+        readiness={
+            'price': ['span.seoPrice', 'p.current-price span.money', 'span.money', 'span[class*="money"]'],
+            'specs': ['div[class*="spec"]', 'div[class*="attribute"]', 'table'],
+        },
+        image_specs=True,
+    ),
+    # 24h 購物商品頁由前端渲染
+    'pchome': SiteAdapter(
+        'pchome',
+        name_selectors=['h1[class*="prodMainName"]', '[id="NickContainer"]', *GENERIC_NAME_SELECTORS],
+        price_selectors=['[id="PriceTotal"]', 'div[class*="prodPrice"] span[class*="price"]',
+                         'span[class*="prodPrice"]', *GENERIC_PRICE_SELECTORS],
+        rating_selectors=['div[class*="ratingStar"]', *GENERIC_RATING_SELECTORS],
+        fetch_strategy=STRUCTURED,
+        readiness={
+            'price': ['[id="PriceTotal"]', '[class*="prodPrice"]', '.price'],
+            'specs': ['[class*="spec"]', 'table', 'dl'],
+        },
+    ),
+    'yahoo': SiteAdapter(
+        'yahoo',
+        name_selectors=['h1[class*="HeroInfo__title"]', 'h1[class*="title"]', *GENERIC_NAME_SELECTORS],
+        price_selectors=['div[class*="HeroInfo__mainPrice"]', 'span[class*="price"]', *GENERIC_PRICE_SELECTORS],
+        rating_selectors=['span[class*="ratingValue"]', 'div[class*="rating"]', *GENERIC_RATING_SELECTORS],
+        fetch_strategy=STATIC,
+        readiness={
+            'price': ['div[class*="HeroInfo__mainPrice"]', 'span[class*="price"]'],
+            'specs': ['table', 'dl', '[class*="spec"]'],
+        },
+    ),
+    # 單頁應用，DOM 幾乎都由前端產生
+    'shopee': SiteAdapter(
+        'shopee',
+        name_selectors=['div[class*="product-briefing"] h1', 'div[class*="product-briefing"] span',
+                        *GENERIC_NAME_SELECTORS],
+        price_selectors=['div[class*="product-briefing"] div[class*="price"]', 'div[class*="price"]',
+                         *GENERIC_PRICE_SELECTORS],
+        rating_selectors=['div[class*="product-rating"]', 'div[class*="rating"]', *GENERIC_RATING_SELECTORS],
+        fetch_strategy=STRUCTURED,
+        readiness={
+            'price': ['div[class*="product-briefing"] div[class*="price"]', 'div[class*="price"]'],
+            'specs': ['div[class*="product-detail"]', 'div[class*="spec"]'],
+        },
+    ),
+    'ruten': SiteAdapter(
+        'ruten',
+        name_selectors=['h1.item-title', 'h1[class*="item-title"]', *GENERIC_NAME_SELECTORS],
+        price_selectors=['strong.rt-text-price', 'span[class*="item-purchase-price"]',
+                         'span[class*="price"]', *GENERIC_PRICE_SELECTORS],
+        rating_selectors=['span[class*="rating"]', *GENERIC_RATING_SELECTORS],
+        fetch_strategy=STATIC,
+        readiness={
+            'price': ['strong.rt-text-price', 'span[class*="price"]'],
+            'specs': ['table', 'dl', '[class*="spec"]'],
+        },
+    ),
+}
+
+# 未知網站：使用合併的完整選擇器清單並維持原本行為（含規格圖片辨識）
+DEFAULT_ADAPTER = SiteAdapter(
+    'default',
+    name_selectors=NAME_SELECTORS,
+    price_selectors=PRICE_SELECTORS,
+    rating_selectors=RATING_SELECTORS,
+    fetch_strategy=STATIC,
+    image_specs=True,
+)
+
+
+@lru_cache(maxsize=256)
+def _adapter_for_host(host: str) -> SiteAdapter:
+    return ADAPTERS.get(get_site_key(f"//{host}"), DEFAULT_ADAPTER)
+
+
+def get_adapter(url: str) -> SiteAdapter:
+    """依 URL 主機名稱取得網站轉接器（同一主機只比對一次）"""
+    return _adapter_for_host((urlparse(url).hostname or '').lower())
@@ -0,0 +1,185 @@
+"""
+網站健康狀態模組 - 斷路器、指數退避與自動降低並行數
+
+網站開始限流時快速失敗，避免每個網址都耗盡動態與靜態兩次逾時
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from config.settings import (
+    SCRAPE_MAX_WORKERS,
+    THROTTLE_STATUS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    BACKOFF_BASE,
+    BACKOFF_MAX,
+)
+from utils.rate_limiter import get_site_key
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """網站斷路器開啟中，暫不發出請求"""
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """例外是否代表被網站限流（THROTTLE_STATUS）"""
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code in THROTTLE_STATUS
+
+
+def is_site_error(error: Exception) -> bool:
+    """例外是否應計入網站失敗（商品不存在的 404 / 410 不代表網站異常）"""
+    response = getattr(error, 'response', None)
+    return response is None or response.status_code not in (404, 410)
+
+
+class HostHealth:
+    """單一網站的健康狀態"""
+
+    def __init__(self, max_concurrency: int, failure_threshold: int, reset_timeout: float):
+        self.max_concurrency = max(1, max_concurrency)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0           # 連續失敗分數（限流計 2）
+        self.opened_at = 0.0
+        self.concurrency = self.max_concurrency
+        self.in_flight = 0
+        self._trial_running = False
+        self._cond = threading.Condition()
+
+    def backoff(self) -> float:
+        """目前應退避的秒數（指數成長，0.5~1.5 倍隨機抖動）"""
+        if self.failures <= 0:
+            return 0.0
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.failures - 1))
+        return delay * random.uniform(0.5, 1.5)
+
+    def check(self):
+        """斷路器開啟時拋出 CircuitOpenError；冷卻期滿後放行一次試探請求"""
+        with self._cond:
+            if self.state == OPEN:
+                if time.time() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"網站暫停中，{self.reset_timeout - (time.time() - self.opened_at):.0f}s 後重試")
+                self.state = HALF_OPEN
+                self._trial_running = False
+            if self.state == HALF_OPEN:
+                if self._trial_running:
+                    raise CircuitOpenError("網站試探請求進行中")
+                self._trial_running = True
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= self.concurrency:
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            # 試探請求未碰到網路（例如命中快取）時，讓下一個請求再試探
+            if self.state == HALF_OPEN:
+                self._trial_running = False
+            self._cond.notify_all()
+
+    def record_success(self):
+        with self._cond:
+            self.failures = 0
+            self.state = CLOSED
+            self._trial_running = False
+            # 加法增加：逐步恢復並行數
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+            self._cond.notify_all()
+
+    def record_failure(self, throttled: bool = False) -> bool:
+        """記錄一次失敗，回傳斷路器是否因此開啟"""
+        with self._cond:
+            self.failures += 2 if throttled else 1
+            # 乘法減少：失敗時並行數減半
+            self.concurrency = max(1, self.concurrency // 2)
+            self._trial_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                opened = self.state != OPEN
+                self.state = OPEN
+                self.opened_at = time.time()
+                return opened
+            return False
+
+
+class SiteHealthRegistry:
+    """依網站分別追蹤健康狀態"""
+
+    def __init__(self, max_concurrency: int = SCRAPE_MAX_WORKERS,
+                 failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts: Dict[str, HostHealth] = {}
+        self._lock = threading.Lock()
+
+    def host_for(self, url: str) -> HostHealth:
+        key = get_site_key(url)
+        with self._lock:
+            if key not in self._hosts:
+                self._hosts[key] = HostHealth(self.max_concurrency, self.failure_threshold, self.reset_timeout)
+            return self._hosts[key]
+
+    def is_open(self, url: str) -> bool:
+        """斷路器是否開啟中（用於跳過同一網址的降級重試）"""
+        return self.host_for(url).state == OPEN
+
+    @contextmanager
+    def slot(self, url: str):
+        """
+        取得對該網站發出請求的名額
+
+        依序：檢查斷路器 → 依連續失敗次數退避 → 等待並行名額
+        """
+        host = self.host_for(url)
+        host.check()
+        delay = host.backoff()
+        if delay > 0:
+            print(f"⏸️  {get_site_key(url)} 最近失敗 {host.failures} 次，退避 {delay:.1f}s")
+            time.sleep(delay)
+        host.acquire()
+        try:
+            yield host
+        finally:
+            host.release()
+
+    def record_success(self, url: str):
+        self.host_for(url).record_success()
+
+    def record_failure(self, url: str, error: Exception = None):
+        throttled = error is not None and is_throttle_error(error)
+        if self.host_for(url).record_failure(throttled):
+            print(f"⛔ {get_site_key(url)} 連續失敗，暫停請求 {self.reset_timeout:.0f}s")
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                key: {'state': host.state, 'failures': host.failures,
+                      'concurrency': host.concurrency, 'in_flight': host.in_flight}
+                for key, host in self._hosts.items()
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_site_health() -> SiteHealthRegistry:
+    """取得全域共用的網站健康狀態"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SiteHealthRegistry()
+        return _registry
@@ -0,0 +1,338 @@
+"""
+結構化資料擷取模組 - 從頁面內嵌的 JSON-LD、__NEXT_DATA__、腳本狀態與 meta 標籤取得商品資訊
+
+價格等資料若已內嵌在 HTML 中，就不需要啟動瀏覽器執行 JavaScript。
+頁面常同時內嵌推薦或相關商品，有多個候選時採用網址或名稱與本頁（canonical / og:url、h1、標題）最相符者，
+無法判斷時放棄該來源，改用 DOM 擷取
+"""
+import json
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+from utils.url_utils import canonicalize_url
+
+_JSON_LD_RE = re.compile(
+    r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL,
+)
+_NEXT_DATA_RE = re.compile(
+    r'<script[^>]*id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL,
+)
+# window.__INITIAL_STATE__ = {...} 之類的內嵌狀態
+_INLINE_STATE_RE = re.compile(
+    r'(?:window\.)?__(?:INITIAL_STATE|PRELOADED_STATE|APOLLO_STATE|NUXT)__\s*=\s*',
+)
+_META_RE = re.compile(r'<meta\s+[^>]*>', re.IGNORECASE)
+_META_ATTR_RE = re.compile(r'(property|name|content|itemprop)=["\']([^"\']*)["\']', re.IGNORECASE)
+_CANONICAL_RE = re.compile(r'<link\s+[^>]*rel=["\']canonical["\'][^>]*>', re.IGNORECASE)
+_HREF_RE = re.compile(r'href=["\']([^"\']+)["\']', re.IGNORECASE)
+_H1_RE = re.compile(r'<h1[^>]*>(.*?)</h1>', re.IGNORECASE | re.DOTALL)
+_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+_NON_WORD_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+PRICE_KEYS = ('price', 'salePrice', 'goodsPrice', 'finalPrice', 'promoPrice', 'lowPrice')
+NAME_KEYS = ('name', 'goodsName', 'productName', 'title')
+RATING_KEYS = ('ratingValue', 'rating', 'avgScore', 'score')
+URL_KEYS = ('url', '@id', 'link', 'goodsUrl', 'productUrl')
+MAX_CANDIDATES = 50
+MIN_NAME_COVERAGE = 0.6  # 名稱只部分相符時，至少需涵蓋本頁標題的比例
+
+
+def _to_float(value) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    digits = ''.join(c for c in str(value) if c.isdigit() or c == '.')
+    try:
+        return float(digits) if digits else None
+    except ValueError:
+        return None
+
+
+def _valid_rating(value) -> Optional[float]:
+    rating = _to_float(value)
+    if rating is not None and 0 <= rating <= 5.0:
+        return rating
+    return None
+
+
+# ========== 本頁商品判斷 ==========
+
+def _meta_tags(html: str) -> Dict[str, str]:
+    meta = {}
+    for tag in _META_RE.findall(html):
+        attrs = {k.lower(): v for k, v in _META_ATTR_RE.findall(tag)}
+        key = attrs.get('property') or attrs.get('name') or attrs.get('itemprop')
+        if key and 'content' in attrs:
+            meta.setdefault(key.lower(), attrs['content'])
+    return meta
+
+
+def _normalize_name(text: str) -> str:
+    return _NON_WORD_RE.sub('', _TAG_RE.sub('', text or '')).lower()
+
+
+class _PageIdentity:
+    """本頁的網址（canonical / og:url）與標題（og:title、h1、title），用來辨認主商品"""
+
+    def __init__(self, html: str):
+        meta = _meta_tags(html)
+        self.base = None
+        self.urls = set()
+        canonical = _CANONICAL_RE.search(html)
+        href = _HREF_RE.search(canonical.group(0)) if canonical else None
+        for url in (href.group(1) if href else None, meta.get('og:url')):
+            if url and url.startswith('http'):
+                self.base = self.base or url
+                self.urls.add(canonicalize_url(url))
+
+        names = [meta.get('og:title')] + _H1_RE.findall(html)[:3] + _TITLE_RE.findall(html)[:1]
+        self.names = [n for n in (_normalize_name(name) for name in names if name) if len(n) >= 4]
+
+    def score(self, name: Optional[str], url: Optional[str]) -> Optional[tuple]:
+        """
+        候選商品與本頁的相符程度，越大越可能是主商品；完全不相符時回傳 None
+
+        網址相符 > 名稱（正規化後）完全相同 > 名稱互為子字串，依涵蓋本頁標題的比例排序
+        （相關商品名稱常是主商品名稱的一部分，如「iPhone 15」之於「Apple iPhone 15 Pro Max」）
+        """
+        if url and self.urls and isinstance(url, str):
+            if canonicalize_url(urljoin(self.base or '', url)) in self.urls:
+                return (3, 1.0)
+        candidate = _normalize_name(name) if isinstance(name, str) else ''
+        if len(candidate) < 4:
+            return None
+        if candidate in self.names:
+            return (2, 1.0)
+        coverage = max((min(len(candidate), len(page_name)) / max(len(candidate), len(page_name))
+                        for page_name in self.names if candidate in page_name or page_name in candidate),
+                       default=0.0)
+        if coverage < MIN_NAME_COVERAGE:
+            return None
+        return (1, coverage)
+
+
+def _choose(candidates: List[Dict], page: _PageIdentity) -> Optional[Dict]:
+    """
+    從候選商品中選出本頁主商品
+
+    只有一個候選時直接採用；多個時取與本頁最相符者（見 _PageIdentity.score），
+    都不相符或最佳的兩個候選內容不同卻同分時無法判斷，回傳 None
+    """
+    if len(candidates) == 1:
+        return candidates[0]
+    scored = []
+    for candidate in candidates:
+        score = page.score(candidate.get('name'), candidate.get('_url'))
+        if score is not None:
+            scored.append((score, candidate))
+    if not scored:
+        return None
+    scored.sort(key=lambda item: item[0], reverse=True)
+    best_score, best = scored[0]
+    for score, other in scored[1:]:
+        if score != best_score:
+            break
+        # 同一商品重複內嵌（名稱與價格相同）不算平手
+        if (other.get('name'), other.get('price')) != (best.get('name'), best.get('price')):
+            return None
+    return best
+
+
+# ========== JSON-LD ==========
+
+def _iter_json_ld_nodes(data):
+    """攤平 JSON-LD（可能是 list 或含 @graph）"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_json_ld_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        if '@graph' in data:
+            yield from _iter_json_ld_nodes(data['@graph'])
+
+
+def _json_ld_product(node: Dict) -> Dict:
+    result = {'name': node.get('name')}
+    offers = node.get('offers') or {}
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+    result['price'] = _to_float(offers.get('price') or offers.get('lowPrice'))
+    if offers.get('availability'):
+        result['availability'] = str(offers['availability']).rsplit('/', 1)[-1]
+
+    rating = node.get('aggregateRating') or {}
+    result['rating'] = _valid_rating(rating.get('ratingValue'))
+    result['review_count'] = _to_float(rating.get('reviewCount') or rating.get('ratingCount'))
+
+    specs = {}
+    for prop in node.get('additionalProperty') or []:
+        if isinstance(prop, dict) and prop.get('name') and prop.get('value'):
+            specs[str(prop['name'])] = str(prop['value'])
+    for key in ('brand', 'model', 'color', 'weight', 'material'):
+        value = node.get(key)
+        if isinstance(value, dict):
+            value = value.get('name')
+        if value:
+            specs[key] = str(value)
+    if specs:
+        result['specs'] = specs
+    result['_url'] = node.get('url') or node.get('@id') or offers.get('url')
+    return result
+
+
+def _from_json_ld(html: str, page: _PageIdentity) -> Dict:
+    candidates = []
+    for block in _JSON_LD_RE.findall(html):
+        try:
+            data = json.loads(block.strip())
+        except ValueError:
+            continue
+        for node in _iter_json_ld_nodes(data):
+            node_type = node.get('@type')
+            types = node_type if isinstance(node_type, list) else [node_type]
+            if 'Product' in types:
+                candidates.append(_json_ld_product(node))
+    return _choose(candidates, page) or {}
+
+
+# ========== 內嵌 JSON 狀態 ==========
+
+def _find_product_nodes(data, found: List[Dict], depth: int = 0) -> List[Dict]:
+    """在任意 JSON 中找出所有同時有名稱與價格的物件（含巢狀的推薦商品）"""
+    if depth > 12 or len(found) >= MAX_CANDIDATES:
+        return found
+    if isinstance(data, dict):
+        has_name = any(isinstance(data.get(k), str) and data.get(k) for k in NAME_KEYS)
+        has_price = any(_to_float(data.get(k)) for k in PRICE_KEYS)
+        if has_name and has_price:
+            found.append(data)
+        children = data.values()
+    elif isinstance(data, list):
+        children = data
+    else:
+        return found
+    for child in children:
+        _find_product_nodes(child, found, depth + 1)
+    return found
+
+
+def _node_to_result(node: Dict) -> Dict:
+    result = {}
+    for key in NAME_KEYS:
+        if isinstance(node.get(key), str) and node[key]:
+            result['name'] = node[key]
+            break
+    for key in PRICE_KEYS:
+        price = _to_float(node.get(key))
+        if price:
+            result['price'] = price
+            break
+    for key in RATING_KEYS:
+        rating = _valid_rating(node.get(key))
+        if rating is not None:
+            result['rating'] = rating
+            break
+    result['_url'] = next((node[key] for key in URL_KEYS if isinstance(node.get(key), str)), None)
+    return result
+
+
+def _choose_node(data, page: _PageIdentity) -> Dict:
+    candidates = [_node_to_result(node) for node in _find_product_nodes(data, [])]
+    return _choose(candidates, page) or {}
+
+
+def _from_next_data(html: str, page: _PageIdentity) -> Dict:
+    match = _NEXT_DATA_RE.search(html)
+    if not match:
+        return {}
+    try:
+        data = json.loads(match.group(1))
+    except ValueError:
+        return {}
+    return _choose_node(data, page)
+
+
+def _from_inline_state(html: str, page: _PageIdentity) -> Dict:
+    decoder = json.JSONDecoder()
+    for match in _INLINE_STATE_RE.finditer(html):
+        try:
+            data, _ = decoder.raw_decode(html, match.end())
+        except ValueError:
+            continue
+        found = _choose_node(data, page)
+        if found:
+            return found
+    return {}
+
+
+# ========== meta 標籤 ==========
+
+def _from_meta(html: str, page: _PageIdentity) -> Dict:
+    meta = _meta_tags(html)
+    result = {}
+    price = _to_float(meta.get('product:price:amount') or meta.get('og:price:amount') or meta.get('price'))
+    if price:
+        result['price'] = price
+    name = meta.get('og:title')
+    if name:
+        result['name'] = name
+    return result
+
+
+def extract_structured_data(html) -> Dict:
+    """
+    從原始 HTML 擷取內嵌的商品資料
+
+    依序嘗試 JSON-LD、__NEXT_DATA__、內嵌狀態、meta 標籤，先取得的欄位優先
+
+    Returns:
+        dict: 可能包含 name, price, rating, review_count, availability, specs, source
+    """
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+
+    page = _PageIdentity(html)
+    result = {}
+    sources = []
+    for source, extractor in (('json-ld', _from_json_ld), ('next-data', _from_next_data),
+                              ('inline-state', _from_inline_state), ('meta', _from_meta)):
+        try:
+            found = extractor(html, page)
+        except Exception:
+            continue
+        added = False
+        for key, value in found.items():
+            if key == '_url':
+                continue
+            if value not in (None, '', {}) and key not in result:
+                result[key] = value
+                added = True
+        if added:
+            sources.append(source)
+        if result.get('name') and result.get('price'):
+            break
+
+    if sources:
+        result['source'] = '+'.join(sources)
+    return result
+
+
+def is_complete(data: Dict) -> bool:
+    """結構化資料是否足以取代瀏覽器渲染（至少有名稱與有效價格）"""
+    return bool(data.get('name')) and (data.get('price') or 0) > 0
+
+
+def apply_structured_data(values: Dict, structured: Dict) -> Dict:
+    """以結構化資料覆蓋 DOM 擷取的名稱、價格與評分（結構化資料較不受版面影響）"""
+    if structured.get('name'):
+        values['name'] = structured['name']
+    if (structured.get('price') or 0) > 0:
+        values['price'] = structured['price']
+    if structured.get('rating') is not None:
+        values['rating'] = structured['rating']
+    return values
@@ -0,0 +1,52 @@
+"""
+URL 工具模組 - 網址標準化
+"""
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+from config.settings import SUPPORTED_SITES
+from utils.rate_limiter import get_site_key
+
+# 各網站識別商品所需的查詢參數（其餘如 Area、mdiv、oid 等來源代碼一律移除）
+# 未列出的網站只移除常見的追蹤參數
+SITE_QUERY_PARAMS = {
+    'momo': ('i_code',),
+    'pchome': (),
+    'yahoo': ('gdid',),
+    'shopee': (),
+}
+
+TRACKING_PARAMS = {'gclid', 'fbclid', 'yclid', 'msclkid', '_gl', 'mc_cid', 'mc_eid', 'ref', 'spm'}
+TRACKING_PREFIXES = ('utm_',)
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    標準化網址（小寫 scheme/host、支援的網站一律 https、依網站移除追蹤與來源參數、排序查詢參數、移除 fragment）
+
+    同一商品的不同寫法會得到相同結果，用於快取鍵值與去重
+    """
+    parsed = urlparse(url.strip())
+    scheme = (parsed.scheme or 'https').lower()
+    host = (parsed.hostname or '').lower()
+    site = get_site_key(url)
+    if site in SUPPORTED_SITES:
+        # 支援的網站全站 HTTPS，http:// 與 https:// 連結是同一商品
+        scheme = 'https'
+    if parsed.port and parsed.port not in (80, 443):
+        host = f"{host}:{parsed.port}"
+
+    params = parse_qsl(parsed.query, keep_blank_values=True)
+    keep = SITE_QUERY_PARAMS.get(site)
+    if keep is not None:
+        params = [(k, v) for k, v in params if k in keep]
+    else:
+        params = [(k, v) for k, v in params if not _is_tracking_param(k)]
+
+    query = urlencode(sorted(params))
+    path = parsed.path or '/'
+    return urlunparse((scheme, host, path, '', query, ''))
@@ -0,0 +1,164 @@
+"""
+圖像識別結果快取模組 - 同一張規格圖不重複下載與呼叫 Vision API（SQLite）
+
+鍵值:
+    圖片內容 SHA-256 + 模型名稱 + 提示詞版本 -> 解析後的規格
+    圖片網址 -> 圖片內容 SHA-256（命中時連下載都可略過）
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from config.settings import VISION_CACHE_ENABLED, VISION_CACHE_PATH, VISION_CACHE_MAX_ENTRIES
+
+
+def image_digest(image_data: bytes) -> str:
+    """圖片內容的 SHA-256"""
+    return hashlib.sha256(image_data).hexdigest()
+
+
+class VisionCache:
+    """圖像識別結果快取（每個執行緒使用獨立連線，超過 max_entries 時依最後使用時間淘汰）"""
+
+    def __init__(self, path: str = VISION_CACHE_PATH, enabled: bool = VISION_CACHE_ENABLED,
+                 max_entries: int = VISION_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._local = threading.local()
+        if self.enabled:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS vision_results (
+                    digest TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    specs TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (digest, model, prompt_version)
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_vision_results_last_used ON vision_results (last_used)"
+            )
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS vision_urls (
+                    url TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def digest_for_url(self, url: str) -> Optional[str]:
+        """先前下載過的圖片內容 SHA-256，不存在時回傳 None"""
+        if not self.enabled:
+            return None
+        try:
+            row = self._connect().execute(
+                "SELECT digest FROM vision_urls WHERE url = ?", (url,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️  圖像識別快取讀取失敗: {e}")
+            return None
+        return row[0] if row else None
+
+    def get(self, digest: str, model: str, prompt_version: str, url: str = None) -> Optional[Dict[str, str]]:
+        """
+        讀取識別結果並更新最後使用時間，不存在時回傳 None
+
+        Args:
+            url: 圖片網址；命中時一併記錄網址對應，之後同網址可略過下載
+        """
+        if not self.enabled or not digest:
+            return None
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT specs FROM vision_results WHERE digest = ? AND model = ? AND prompt_version = ?",
+                (digest, model, prompt_version),
+            ).fetchone()
+            if not row:
+                return None
+            with conn:
+                conn.execute(
+                    "UPDATE vision_results SET last_used = ? WHERE digest = ? AND model = ? AND prompt_version = ?",
+                    (now, digest, model, prompt_version),
+                )
+                if url:
+                    conn.execute("INSERT OR REPLACE INTO vision_urls VALUES (?, ?, ?)", (url, digest, now))
+        except sqlite3.Error as e:
+            print(f"⚠️  圖像識別快取讀取失敗: {e}")
+            return None
+        return json.loads(row[0])
+
+    def get_by_url(self, url: str, model: str, prompt_version: str) -> Optional[Dict[str, str]]:
+        """以圖片網址查詢識別結果（不需下載圖片）"""
+        return self.get(self.digest_for_url(url), model, prompt_version, url)
+
+    def put(self, digest: str, model: str, prompt_version: str, specs: Dict[str, str], url: str = None):
+        """寫入識別結果（超過上限時淘汰最久未使用的項目）"""
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO vision_results VALUES (?, ?, ?, ?, ?, ?)",
+                    (digest, model, prompt_version, json.dumps(specs, ensure_ascii=False), now, now),
+                )
+                if url:
+                    conn.execute("INSERT OR REPLACE INTO vision_urls VALUES (?, ?, ?)", (url, digest, now))
+                self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"⚠️  圖像識別快取寫入失敗: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """淘汰超過上限的最久未使用項目，並清除不再被任何結果引用的網址對應"""
+        excess = conn.execute("SELECT COUNT(*) FROM vision_results").fetchone()[0] - self.max_entries
+        if excess <= 0:
+            return
+        conn.execute(
+            "DELETE FROM vision_results WHERE rowid IN ("
+            "SELECT rowid FROM vision_results ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        conn.execute("DELETE FROM vision_urls WHERE digest NOT IN (SELECT digest FROM vision_results)")
+
+    def stats(self) -> Dict[str, int]:
+        if not self.enabled:
+            return {'results': 0, 'urls': 0}
+        conn = self._connect()
+        return {
+            'results': conn.execute("SELECT COUNT(*) FROM vision_results").fetchone()[0],
+            'urls': conn.execute("SELECT COUNT(*) FROM vision_urls").fetchone()[0],
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_vision_cache() -> VisionCache:
+    """取得全域共用的圖像識別結果快取"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = VisionCache()
+        return _cache